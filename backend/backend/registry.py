@@ -0,0 +1,162 @@
+"""
+Registry of heavy resources (ML models, API clients, plotting) loaded on first use.
+
+Importing a module that needs one of these resources only costs a name lookup; the
+resource is built the first time it is actually used, once per process, even when
+several threads ask for it at the same time. To share the memory of loaded models
+between worker processes, warm them up before the server forks (see `warm_up`).
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+SENTENCE_MODEL = "all-MiniLM-L6-v2"
+TRANSLATION_MODEL = "Helsinki-NLP/opus-mt-fr-en"
+
+
+class ModelRegistry:
+    """
+    Thread-safe registry of lazily built resources.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """
+        Register the factory building a resource.
+
+        Args:
+            name (str): The resource name.
+            factory (Callable[[], Any]): A function without arguments returning the resource.
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """
+        Return a resource, building it on first use.
+
+        Args:
+            name (str): The resource name.
+
+        Returns:
+            Any: The resource.
+        """
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        if name not in self._factories:
+            raise KeyError(f"No resource registered under '{name}'.")
+        with self._locks[name]:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+        return self._instances[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def loaded(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The names of the resources built so far.
+        """
+        return sorted(self._instances)
+
+    def names(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The names of all registered resources.
+        """
+        return sorted(self._factories)
+
+    def lazy(self, name: str) -> "LazyResource":
+        """
+        Return a proxy that builds the resource when it is first called or an attribute is read.
+
+        Args:
+            name (str): The resource name.
+
+        Returns:
+            LazyResource: The proxy.
+        """
+        return LazyResource(self, name)
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Build resources ahead of time.
+
+        Args:
+            names (Iterable[str], optional): The resources to build. Defaults to all registered resources.
+
+        Returns:
+            List[str]: The names of the resources that were built.
+        """
+        names = list(names) if names is not None else self.names()
+        for name in names:
+            self.get(name)
+        return names
+
+
+class LazyResource:
+    """
+    Stand-in for a registry resource, usable wherever the resource itself is used.
+    """
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def __call__(self, *args, **kwargs):
+        return self._registry.get(self._name)(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._registry.is_loaded(self._name) else "not loaded"
+        return f"<LazyResource '{self._name}' ({state})>"
+
+
+def load_sentence_transformer():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SENTENCE_MODEL)
+
+
+def load_translator():
+    from transformers import pipeline
+    return pipeline("translation", model=TRANSLATION_MODEL)
+
+
+def load_gemini():
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file
+    load_dotenv()
+    api_key = os.getenv("API_KEY")
+    if not api_key:
+        raise ValueError("API key must be set in the environment variable API_KEY.")
+
+    # Configure the Google Generative AI client with the API key
+    genai.configure(api_key=api_key)
+    return genai
+
+
+def load_pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+registry = ModelRegistry()
+registry.register("sentence_transformer", load_sentence_transformer)
+registry.register("translator", load_translator)
+registry.register("gemini", load_gemini)
+registry.register("pyplot", load_pyplot)
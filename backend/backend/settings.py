@@ -137,3 +137,116 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+REST_FRAMEWORK = {
+    # Every list is paginated with a cursor on the primary key (see database/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'database.pagination.IdCursorPagination',
+    'PAGE_SIZE': 100,
+}
+
+# Expert matching
+# Local data (embedding indexes, caches) produced at runtime.
+
+# Models from backend.registry loaded when the WSGI application starts, e.g.
+# ['sentence_transformer', 'translator']. They are otherwise loaded on first use.
+WARM_UP_MODELS = []
+
+DATA_DIR = BASE_DIR / 'var'
+
+# The tests keep their caches and memos in a temporary directory (see backend/test_runner.py)
+TEST_RUNNER = 'backend.test_runner.IsolatedDataRunner'
+
+EXPERT_INDEX_PATH = DATA_DIR / 'expert_index.npz'
+
+# Seconds during which model changes are batched before the changed experts are re-encoded
+EXPERT_INDEX_UPDATE_DELAY = 2.0
+
+# On-disk cache of sentence embeddings (number of rows kept, 0 disables the cache)
+EMBEDDING_CACHE_DIR = DATA_DIR / 'embeddings'
+EMBEDDING_CACHE_SIZE = 100_000
+
+# Persistent memo of French to English title translations (None disables it)
+TRANSLATION_MEMO_PATH = DATA_DIR / 'translations.sqlite3'
+TRANSLATION_BATCH_SIZE = 16
+
+# Raw responses of the data sources (None disables the store)
+COLLECTOR_CACHE_PATH = DATA_DIR / 'responses.sqlite3'
+# Seconds during which a stored response is used without any request (None: forever).
+# Older DBLP records are revalidated with a conditional request.
+COLLECTOR_CACHE_TTL = 30 * 24 * 3600
+# Replay stored responses only, without network access (see import_experts --offline)
+COLLECTOR_OFFLINE = False
+
+# Classification of publication titles into research areas: 'gemini', 'embedding' (local nearest
+# terms of data_classification/vocabulary.py) or 'stub' (canned answers, for tests)
+CLASSIFIER_BACKEND = 'gemini'
+CLASSIFIER_EMBEDDING_TOP_K = 3  # vocabulary terms kept per title
+CLASSIFIER_EMBEDDING_THRESHOLD = 0.35  # minimum cosine similarity between a title and a term
+CLASSIFIER_CHUNK_TOKENS = 1500  # estimated tokens of the titles sent in one prompt
+CLASSIFIER_CHUNK_SIZE = 40  # titles sent in one prompt
+CLASSIFIER_CONCURRENCY = 4  # prompts sent at the same time
+CLASSIFIER_RATE_LIMIT = 15  # prompts per minute
+# Persistent memo of the areas of each title (None disables it)
+CLASSIFICATION_MEMO_PATH = DATA_DIR / 'classifications.sqlite3'
+
+# Cosine similarity above which two keywords are merged by the merge_mots_cles command
+KEYWORD_MERGE_THRESHOLD = 0.9
+
+# Batch assignment of reviewers to theses (assign_experts command)
+ASSIGNMENT_REVIEWERS = 2  # reviewers per thesis, 2 or 3 (the slots of an Expertise)
+ASSIGNMENT_CAPACITY = 3  # theses given to one expert in one batch
+ASSIGNMENT_MAX_EXPERTISES = None  # highest nombre_expertises of an assigned expert (None: no cap)
+
+# Conflicts of interest excluding an expert from a thesis, besides supervising it: 'coauthor'
+# (shares a publication with a supervisor) and 'establishment' (same establishment as a
+# supervisor or as the doctorant)
+CONFLICT_RULES = ['coauthor', 'establishment']
+# File touched when the establishment of an expert changes, so that every process rebuilds its conflict graph
+CONFLICT_VERSION_PATH = DATA_DIR / 'conflicts.version'
+
+# Maximum number of simultaneous requests per data source while importing experts
+FETCH_SOURCE_CONCURRENCY = {
+    'dblp': 4,
+    'scholar': 2,
+    'researchgate': 2,
+}
+
+# Seconds after which a source is given up for one researcher (its results are then missing)
+FETCH_SOURCE_TIMEOUT = {
+    'dblp': 60.0,
+    'scholar': 120.0,
+    'researchgate': 180.0,
+}
+
+# Shared headless browser used to scrape ResearchGate
+GATE_BROWSER_MAX_PAGES = 2  # pages loading at the same time
+GATE_BROWSER_RECYCLE_AFTER = 100  # page loads before the browser is restarted
+GATE_BROWSER_TIMEOUT = 30.0  # seconds
+GATE_BROWSER_BLOCKED_RESOURCES = ['image', 'font', 'stylesheet', 'media']
+
+# Cache of the REST API responses (database/cache.py). The file cache is shared by the
+# processes of one host (server workers, management commands); set REDIS_URL to use Redis.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': DATA_DIR / 'cache',
+            'OPTIONS': {'MAX_ENTRIES': 10_000},
+        }
+    }
+# Seconds a response is kept; it is dropped earlier if one of its models changes
+API_CACHE_TIMEOUT = 24 * 3600
+
+# Rows read from the database and encoded at once by the exports (database/export.py)
+EXPORT_CHUNK_SIZE = 2000
+
+# Largest batch accepted by the bulk endpoints (database/bulk.py)
+BULK_MAX_ITEMS = 10000
@@ -0,0 +1,46 @@
+import tempfile
+from pathlib import Path
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Settings pointing at runtime data files, moved to a temporary directory during the tests
+# (relative to it), so that the tests never read nor write the data of real runs
+ISOLATED_DATA_SETTINGS = {
+    'EXPERT_INDEX_PATH': 'expert_index.npz',
+    'EMBEDDING_CACHE_DIR': 'embeddings',
+    'COLLECTOR_CACHE_PATH': 'responses.sqlite3',
+    'CONFLICT_VERSION_PATH': 'conflicts.version',
+}
+
+# Django cache used during the tests (API responses, model versions), private to the test process
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Shared caches and memos disabled during the tests: stub models must not fill them
+DISABLED_CACHE_SETTINGS = {
+    'EMBEDDING_CACHE_SIZE': 0,
+    'TRANSLATION_MEMO_PATH': None,
+    'CLASSIFICATION_MEMO_PATH': None,
+}
+
+
+class IsolatedDataRunner(DiscoverRunner):
+    """
+    Test runner keeping the runtime data (caches, memos) of the tests in a temporary directory.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._data_dir = tempfile.TemporaryDirectory(prefix='expertmatch-tests-')
+        root = Path(self._data_dir.name)
+        self._data_settings = override_settings(
+            DATA_DIR=root,
+            CACHES=TEST_CACHES,
+            **{name: root / path for name, path in ISOLATED_DATA_SETTINGS.items()},
+            **DISABLED_CACHE_SETTINGS,
+        )
+        self._data_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._data_settings.disable()
+        self._data_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,75 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.test import SimpleTestCase
+from .registry import ModelRegistry
+
+# Slow-to-import libraries that the project modules must only import on first use
+LAZY_MODULES = (
+    "torch", "transformers", "sentence_transformers", "scipy", "sklearn",
+    "pandas", "pyarrow", "playwright", "google.generativeai",
+)
+
+IMPORT_SCRIPT = """
+import json, sys
+import django
+django.setup()
+import data_cleaning.clean, data_cleaning.translate
+import data_classification.classify, data_classification.match
+import database.urls, doctorants_stats.urls
+from backend.registry import registry
+print(json.dumps({"modules": sorted(sys.modules), "loaded": registry.loaded()}))
+"""
+
+
+class ModelRegistryTests(SimpleTestCase):
+
+    def test_resource_is_built_once_across_threads(self):
+        """Test that concurrent first uses build the resource a single time."""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        registry = ModelRegistry()
+        registry.register("model", factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("model"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_lazy_proxy_defers_loading(self):
+        """Test that the proxy only builds the resource when used."""
+        registry = ModelRegistry()
+        registry.register("upper", lambda: str.upper)
+        proxy = registry.lazy("upper")
+        self.assertEqual(registry.loaded(), [])
+        self.assertEqual(proxy("abc"), "ABC")
+        self.assertEqual(proxy.__name__, "upper")
+        self.assertEqual(registry.loaded(), ["upper"])
+
+    def test_unknown_resource(self):
+        with self.assertRaises(KeyError):
+            ModelRegistry().get("missing")
+
+    def test_import_loads_no_heavy_module(self):
+        """Test that importing the project loads no model and none of the slow-to-import libraries."""
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT],
+            cwd=Path(settings.BASE_DIR), capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        self.assertEqual(result["loaded"], [])
+        self.assertEqual([module for module in LAZY_MODULES if module in result["modules"]], [])
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Optionally load the models before the server forks its workers (e.g. gunicorn --preload),
+# so that every worker shares them instead of loading its own copy
+from django.conf import settings
+from backend.registry import registry
+
+registry.warm_up(settings.WARM_UP_MODELS)
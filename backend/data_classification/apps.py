@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class DataClassificationConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'data_classification'
+
+    def ready(self):
+        # Keep the expert index in sync with the database
+        from . import signals  # noqa: F401
+        from .conflicts import update_conflict_graph
+        from .index import index_updater
+        from .lexical import update_lexical_index
+        index_updater.add_listener(update_lexical_index)
+        index_updater.add_listener(update_conflict_graph)
@@ -0,0 +1,248 @@
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from database.cache import bump_model_versions
+from database.models import Doctorant, Expert, Expertise
+from data_cleaning.clean import encode_sentences
+from .conflicts import get_conflict_graph
+from .index import ExpertIndex, get_expert_index
+
+# The reviewer fields of an Expertise, in order
+EXPERT_SLOTS = ("expert_1", "expert_2", "expert_3")
+
+# Cost of a forbidden (thesis, expert) pair; an allowed pair costs at most 1
+FORBIDDEN = 1e6
+
+# Number of best allowed experts per thesis kept as columns of the assignment problem
+ASSIGNMENT_DEPTH = 50
+
+
+class AssignmentResult(NamedTuple):
+    """
+    Reviewers proposed for a cohort of theses.
+
+    Attributes:
+        drafts (List[Expertise]): Unsaved expertises, one per thesis that received all its reviewers.
+        scores (List[List[float]]): The similarity of each draft's reviewers to the thesis title.
+        unassigned (List[Doctorant]): The doctorants without a title or without enough eligible experts.
+    """
+    drafts: List[Expertise]
+    scores: List[List[float]]
+    unassigned: List[Doctorant]
+
+
+class UnknownDoctorants(LookupError):
+    """
+    Raised by `find_doctorants` when ids are not valid ids or no doctorant has them.
+
+    Attributes:
+        ids (List[str]): The invalid or unknown ids, as given.
+    """
+
+    def __init__(self, ids: List[str]):
+        super().__init__(f"Unknown doctorant ids: {', '.join(ids)}")
+        self.ids = ids
+
+
+def find_doctorants(ids: Iterable) -> List[Doctorant]:
+    """
+    Fetch the doctorants of a cohort given by id, in one query.
+
+    Args:
+        ids (Iterable): Their ids.
+
+    Returns:
+        List[Doctorant]: The doctorants, in the order given and without repetition.
+
+    Raises:
+        UnknownDoctorants: If some ids are not valid ids or no doctorant has them.
+    """
+    pks, invalid = {}, []
+    for doctorant_id in ids:
+        try:
+            pks[str(doctorant_id)] = Doctorant._meta.pk.to_python(doctorant_id)
+        except ValidationError:
+            invalid.append(str(doctorant_id))
+    found = Doctorant.objects.in_bulk(pks.values())
+    missing = invalid + [doctorant_id for doctorant_id, pk in pks.items() if pk not in found]
+    if missing:
+        raise UnknownDoctorants(missing)
+    return [found[pk] for pk in dict.fromkeys(pks.values())]
+
+
+def pending_doctorants():
+    """
+    Returns:
+        QuerySet: The enrolled doctorants with a thesis title and no expertise yet.
+    """
+    return (
+        Doctorant.objects.filter(situation="Inscrit", expertises__isnull=True)
+        .exclude(titre_these__isnull=True)
+        .exclude(titre_these="")
+    )
+
+
+def expert_capacities(expert_ids: List[str], capacity: int, max_expertises: Optional[int],
+                      grades: Optional[Tuple[str, ...]]) -> np.ndarray:
+    """
+    Compute how many theses each expert can still receive in this batch.
+
+    Args:
+        expert_ids (List[str]): The experts, in index order.
+        capacity (int): The theses given to one expert in one batch.
+        max_expertises (int, optional): The highest accepted `nombre_expertises`, None for no cap.
+        grades (Tuple[str, ...], optional): The accepted grades, None to accept any grade.
+
+    Returns:
+        np.ndarray: The remaining capacity of each expert (0 for ineligible experts).
+    """
+    positions = {expert_id: i for i, expert_id in enumerate(expert_ids)}
+    remaining = np.zeros(len(expert_ids), dtype=np.int64)
+    for expert_id, grade, load in Expert.objects.values_list("id", "grade", "nombre_expertises"):
+        i = positions.get(str(expert_id))
+        if i is None or (grades is not None and grade not in grades):
+            continue
+        remaining[i] = capacity if max_expertises is None else max(0, min(capacity, max_expertises - load))
+    return remaining
+
+
+def solve_rounds(scores: np.ndarray, allowed: np.ndarray, remaining: np.ndarray, reviewers: int,
+                 depth: int = ASSIGNMENT_DEPTH) -> np.ndarray:
+    """
+    Give each thesis `reviewers` distinct experts, maximizing the total similarity under the expert capacities.
+
+    Each round gives every thesis still in the running one more reviewer by solving a linear assignment
+    (Hungarian algorithm) whose columns are the candidate experts repeated once per remaining capacity.
+    Each round is optimal; together they approximate the joint optimum.
+
+    Args:
+        scores (np.ndarray): The (theses, experts) similarity matrix.
+        allowed (np.ndarray): A boolean mask of the allowed pairs, updated in place.
+        remaining (np.ndarray): The remaining capacity of each expert, updated in place.
+        reviewers (int): The reviewers per thesis.
+        depth (int, optional): The best allowed experts per thesis kept as candidates. Defaults to ASSIGNMENT_DEPTH.
+
+    Returns:
+        np.ndarray: A (theses, reviewers) array of expert positions, -1 where no expert could be given.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    chosen = np.full((scores.shape[0], reviewers), -1, dtype=np.int64)
+    rows = np.arange(scores.shape[0])
+    # Only start the theses the capacities can complete, the best matched first
+    limit = int(np.minimum(remaining, len(rows)).sum()) // reviewers
+    if len(rows) > limit:
+        strength = np.sort(np.where(allowed, scores, -np.inf), axis=1)[:, -reviewers:].sum(axis=1)
+        rows = np.sort(np.argsort(-strength, kind="stable")[:limit])
+
+    for slot in range(reviewers):
+        pool = np.flatnonzero(remaining > 0)
+        if not len(rows) or not len(pool):
+            break
+        # Keep the experts that are among the best allowed ones of at least one thesis
+        masked = np.where(allowed[np.ix_(rows, pool)], scores[np.ix_(rows, pool)], -np.inf)
+        width = min(depth, len(pool))
+        best = np.argpartition(-masked, width - 1, axis=1)[:, :width]
+        candidates = pool[np.unique(best)]
+        columns = np.repeat(candidates, remaining[candidates])
+
+        cost = np.where(allowed[np.ix_(rows, columns)], -scores[np.ix_(rows, columns)], FORBIDDEN)
+        for i, j in zip(*linear_sum_assignment(cost)):
+            if cost[i, j] < FORBIDDEN:
+                row, expert = rows[i], columns[j]
+                chosen[row, slot] = expert
+                remaining[expert] -= 1
+                allowed[row, expert] = False
+        # A thesis missing a reviewer cannot be completed: give its reviewers back
+        for row in rows[chosen[rows, slot] < 0]:
+            remaining[chosen[row, :slot]] += 1
+        rows = rows[chosen[rows, slot] >= 0]
+    return chosen
+
+
+def assign_experts(doctorants: Optional[Iterable[Doctorant]] = None, reviewers: Optional[int] = None,
+                   capacity: Optional[int] = None, max_expertises: Optional[int] = None,
+                   grades: Optional[Tuple[str, ...]] = ("MCA", "PR"),
+                   expert_index: Optional[ExpertIndex] = None) -> AssignmentResult:
+    """
+    Propose reviewers for a whole cohort of theses at once.
+
+    All thesis titles are encoded in one batch and scored against every expert with one matrix product.
+    An expert never reviews a thesis they are in conflict of interest with (see `conflicts.py`).
+
+    Args:
+        doctorants (Iterable[Doctorant], optional): The doctorants. Defaults to `pending_doctorants()`.
+        reviewers (int, optional): The reviewers per thesis, 2 or 3. Defaults to ASSIGNMENT_REVIEWERS.
+        capacity (int, optional): The theses given to one expert. Defaults to ASSIGNMENT_CAPACITY.
+        max_expertises (int, optional): The highest `nombre_expertises` of an assigned expert.
+            Defaults to ASSIGNMENT_MAX_EXPERTISES.
+        grades (Tuple[str, ...], optional): The accepted grades, None to accept any grade. Defaults to MCA and PR.
+        expert_index (ExpertIndex, optional): The vector index. Defaults to the shared index.
+
+    Returns:
+        AssignmentResult: The unsaved expertises, their scores and the doctorants left without reviewers.
+    """
+    reviewers = reviewers or settings.ASSIGNMENT_REVIEWERS
+    if not 2 <= reviewers <= len(EXPERT_SLOTS):
+        raise ValueError(f"An expertise has between 2 and {len(EXPERT_SLOTS)} reviewers, not {reviewers}.")
+    capacity = capacity or settings.ASSIGNMENT_CAPACITY
+    if max_expertises is None:
+        max_expertises = settings.ASSIGNMENT_MAX_EXPERTISES
+    expert_index = expert_index if expert_index is not None else get_expert_index()
+
+    doctorants = list(pending_doctorants() if doctorants is None else doctorants)
+    theses = [doctorant for doctorant in doctorants if doctorant.titre_these and doctorant.titre_these.strip()]
+    unassigned = [doctorant for doctorant in doctorants if not (doctorant.titre_these and doctorant.titre_these.strip())]
+    if not theses or not len(expert_index):
+        return AssignmentResult([], [], doctorants)
+
+    expert_ids, scores = expert_index.score_many(encode_sentences([doctorant.titre_these for doctorant in theses]))
+    remaining = expert_capacities(expert_ids, capacity, max_expertises, grades)
+    allowed = np.repeat((remaining > 0)[np.newaxis, :], len(theses), axis=0)
+    allowed &= ~get_conflict_graph().mask(theses, expert_ids)
+
+    chosen = solve_rounds(scores, allowed, remaining, reviewers)
+
+    experts = Expert.objects.in_bulk([expert_ids[i] for i in np.unique(chosen[chosen >= 0])])
+    experts = {str(pk): expert for pk, expert in experts.items()}
+    drafts, draft_scores = [], []
+    today = date.today()
+    for row, doctorant in enumerate(theses):
+        if (chosen[row] < 0).any():
+            unassigned.append(doctorant)
+            continue
+        slots = {slot: experts[expert_ids[i]] for slot, i in zip(EXPERT_SLOTS, chosen[row])}
+        drafts.append(Expertise(doctorant=doctorant, date_expertise=today, **slots))
+        draft_scores.append([round(float(scores[row, i]), 4) for i in chosen[row]])
+    return AssignmentResult(drafts, draft_scores, unassigned)
+
+
+def save_assignment(drafts: List[Expertise]) -> List[Expertise]:
+    """
+    Save expertise drafts and add them to the workload (`nombre_expertises`) of their experts.
+
+    Args:
+        drafts (List[Expertise]): The drafts returned by `assign_experts`.
+
+    Returns:
+        List[Expertise]: The saved expertises.
+    """
+    load = Counter(
+        getattr(draft, f"{slot}_id") for draft in drafts for slot in EXPERT_SLOTS
+        if getattr(draft, f"{slot}_id") is not None
+    )
+    by_increment = defaultdict(list)
+    for expert_id, count in load.items():
+        by_increment[count].append(expert_id)
+
+    with transaction.atomic():
+        saved = Expertise.objects.bulk_create(drafts)
+        for count, expert_ids in by_increment.items():
+            Expert.objects.filter(pk__in=expert_ids).update(nombre_expertises=F("nombre_expertises") + count)
+        bump_model_versions(Expertise, Expert)
+    return saved
@@ -1,17 +1,25 @@
-import google.generativeai as genai
-import os, re
-from dotenv import load_dotenv
-from typing import List, Tuple
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from django.conf import settings
+from backend.registry import registry
+from data_cleaning.cache import TextMemo, normalize_text
+from data_cleaning.clean import MODEL_NAME, encode_sentences, normalize_embeddings
+from data_collection.cache import is_offline
+from .vocabulary import RESEARCH_AREAS
 
-# Load environment variables from .env file
-load_dotenv()
+# Configured on first use
+genai = registry.lazy("gemini")
 
-api_key = os.getenv("API_KEY")
-if not api_key:
-    raise ValueError("API key must be set in the environment variable API_KEY.")
+GEMINI_MODEL = "gemini-1.5-flash"
 
-# Configure the Google Generative AI client with the API key
-genai.configure(api_key=api_key)
+# "1. **area, other area**" items of the model answers
+AREA_PATTERN = re.compile(r'(\d+)\.\s+\*\*(.*?)\*\*')
 
 def clean_area(area: str) -> str:
     """
@@ -46,7 +54,7 @@ def classify_article(article_text: str) -> List[str]:
     )
 
     # Use the model to generate a classification response
-    model = genai.GenerativeModel("gemini-1.5-flash")
+    model = genai.GenerativeModel(GEMINI_MODEL)
     response = model.generate_content(prompt)
 
     # Clean the response
@@ -63,6 +71,282 @@ def classify_article(article_text: str) -> List[str]:
 
     return interests
 
+def parse_numbered_areas(text: str) -> Dict[int, List[str]]:
+    """
+    Parses an answer listing the areas of each numbered title ("3. **area, other area**").
+
+    Args:
+    - text (str): The model answer.
+
+    Returns:
+    - dict: The cleaned areas of each title, keyed by the title number.
+    """
+    areas = {}
+    for number, items in AREA_PATTERN.findall(text):
+        cleaned = (clean_area(area) for area in items.split(', '))
+        areas.setdefault(int(number), []).extend(area for area in cleaned if area)
+    return areas
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text
+    return len(text) // 4 + 1
+
+
+def chunk_titles(titles: Sequence[str], max_tokens: int, max_titles: int) -> List[List[str]]:
+    """
+    Splits titles into chunks small enough for one prompt.
+
+    Args:
+    - titles (Sequence[str]): The titles to split, in order.
+    - max_tokens (int): The estimated number of tokens of the titles of one chunk.
+    - max_titles (int): The number of titles of one chunk.
+
+    Returns:
+    - list: The chunks; a title longer than max_tokens gets a chunk of its own.
+    """
+    chunks, chunk, tokens = [], [], 0
+    for title in titles:
+        cost = estimate_tokens(title)
+        if chunk and (tokens + cost > max_tokens or len(chunk) >= max_titles):
+            chunks.append(chunk)
+            chunk, tokens = [], 0
+        chunk.append(title)
+        tokens += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class RateLimiter:
+    """
+    Spaces calls out evenly so that at most `rate` of them start in any `period` seconds,
+    whichever thread makes them.
+    """
+
+    def __init__(self, rate: float, period: float = 60.0):
+        self.interval = period / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class GeminiBackend:
+    """
+    Classifies titles with Gemini, one prompt per chunk of titles.
+    """
+    name = "gemini"
+    # Titles are sent in prompt-sized chunks, under the rate limit
+    chunked = True
+    # Calls a web API, so it is not used in offline mode (see data_collection.cache.set_offline)
+    remote = True
+
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        self.model_name = model_name
+        self.namespace = f"{self.name}:{model_name}"
+
+    def classify_chunk(self, titles: List[str]) -> Dict[int, List[str]]:
+        """
+        Args:
+        - titles (list): The titles of one chunk.
+
+        Returns:
+        - dict: The areas of each title answered by the model, keyed by its position in the chunk.
+        """
+        prompt = (
+            "You are an expert in classifying articles into academic domains. "
+            "Classify each of the following articles into academic domains. Answer with one line per article, "
+            "using the article number followed by its **specific areas only**, in bold and separated by commas "
+            "(for example: 1. **machine learning, computer vision**), without additional context:\n\n"
+        )
+        for index, title in enumerate(titles, start=1):
+            prompt += f"{index}. {title}\n"
+
+        model = genai.GenerativeModel(self.model_name)
+        response = model.generate_content(prompt)
+        areas = parse_numbered_areas(response.text.strip().lower())
+        return {number - 1: items for number, items in areas.items() if 1 <= number <= len(titles)}
+
+
+class StubBackend:
+    """
+    Offline backend answering canned areas, for tests and development without an API key.
+    It is chunked like GeminiBackend, which it stands in for.
+    """
+    name = "stub"
+    namespace = "stub"
+    chunked = True
+
+    def __init__(self, areas: Optional[Dict[str, List[str]]] = None, default: Sequence[str] = ()):
+        self.areas = {normalize_text(title): list(items) for title, items in (areas or {}).items()}
+        self.default = list(default)
+        self.calls: List[List[str]] = []
+
+    def classify_chunk(self, titles: List[str]) -> Dict[int, List[str]]:
+        self.calls.append(list(titles))
+        return {i: list(self.areas.get(normalize_text(title), self.default)) for i, title in enumerate(titles)}
+
+
+class EmbeddingBackend:
+    """
+    Local backend mapping each title to the nearest terms of a controlled vocabulary, using the
+    sentence embedding model of data_cleaning. It runs on CPU, without network, for any number of titles.
+    """
+    name = "embedding"
+    chunked = False
+
+    def __init__(self, vocabulary: Optional[Sequence[str]] = None, top_k: Optional[int] = None,
+                 threshold: Optional[float] = None):
+        self.vocabulary = list(vocabulary or RESEARCH_AREAS)
+        self.top_k = top_k or settings.CLASSIFIER_EMBEDDING_TOP_K
+        self.threshold = settings.CLASSIFIER_EMBEDDING_THRESHOLD if threshold is None else threshold
+        # Remembered areas are only valid for this exact configuration
+        digest = hashlib.sha1("\n".join(self.vocabulary).encode("utf-8")).hexdigest()[:12]
+        self.namespace = f"{self.name}:{MODEL_NAME}:{digest}:{self.top_k}:{self.threshold}"
+        self._terms = None
+        self._lock = threading.Lock()
+
+    def _term_embeddings(self) -> np.ndarray:
+        if self._terms is None:
+            with self._lock:
+                if self._terms is None:
+                    self._terms = normalize_embeddings(encode_sentences(self.vocabulary))
+        return self._terms
+
+    def classify_chunk(self, titles: List[str]) -> Dict[int, List[str]]:
+        """
+        Args:
+        - titles (list): The titles to classify.
+
+        Returns:
+        - dict: Up to top_k vocabulary terms per title, most similar first, keyed by the title position.
+            Terms less similar than the threshold are left out.
+        """
+        if not titles:
+            return {}
+        scores = normalize_embeddings(encode_sentences(titles)) @ self._term_embeddings().T
+        k = min(self.top_k, scores.shape[1])
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        areas = {}
+        for i, candidates in enumerate(best):
+            ranked = candidates[np.argsort(-scores[i, candidates])]
+            areas[i] = [self.vocabulary[j] for j in ranked if scores[i, j] >= self.threshold]
+        return areas
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "stub": StubBackend,
+    "embedding": EmbeddingBackend,
+}
+
+
+class ClassificationService:
+    """
+    Classifies titles in token-bounded chunks sent concurrently under a rate limit.
+    The areas of each normalized title are remembered, so a title is only sent once.
+    In offline mode, a remote backend is not called: only the remembered titles are classified.
+    """
+
+    def __init__(self, backend, memo: Optional[TextMemo] = None, max_tokens: int = 1500, max_titles: int = 40,
+                 concurrency: int = 4, rate_limiter: Optional[RateLimiter] = None):
+        self.backend = backend
+        self.memo = memo
+        self.max_tokens = max_tokens
+        self.max_titles = max_titles
+        self.rate_limiter = rate_limiter or RateLimiter(0)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="classify")
+
+    def classify_titles(self, titles: List[str]) -> List[List[str]]:
+        """
+        Args:
+        - titles (list): The titles to classify.
+
+        Returns:
+        - list: The areas of each title, in order (empty for titles the backend gave no answer for).
+        """
+        keys = [normalize_text(title) for title in titles]
+        # The backend gets the first original spelling of each normalized title
+        originals = {}
+        for key, title in zip(keys, titles):
+            if key:
+                originals.setdefault(key, title.strip())
+        unique = list(originals)
+        known = {key: json.loads(value) for key, value in self.memo.get_many(unique).items()} if self.memo and unique else {}
+
+        missing = [key for key in unique if key not in known]
+        if missing and getattr(self.backend, "remote", False) and is_offline():
+            print(f"Classification : {len(missing)} titles left unclassified in offline mode")
+            missing = []
+        if missing:
+            found = {}
+            missing = [originals[key] for key in missing]
+            if getattr(self.backend, "chunked", True):
+                chunks = chunk_titles(missing, self.max_tokens, self.max_titles)
+                for result in self._executor.map(self._classify_chunk, chunks):
+                    found.update(result)
+            else:
+                # Local backends take every title in one call
+                found = self._classify_chunk(missing, rate_limited=False)
+            if self.memo and found:
+                self.memo.set_many({key: json.dumps(areas) for key, areas in found.items()})
+            known.update(found)
+
+        return [known.get(key, []) for key in keys]
+
+    def _classify_chunk(self, chunk: List[str], rate_limited: bool = True) -> Dict[str, List[str]]:
+        if rate_limited:
+            self.rate_limiter.acquire()
+        try:
+            areas = self.backend.classify_chunk(chunk)
+        except Exception as e:
+            # Nothing is remembered, so these titles are sent again next time
+            print(f"Classification : a chunk of {len(chunk)} titles failed: {e}")
+            return {}
+        return {normalize_text(chunk[i]): items for i, items in areas.items()}
+
+
+_service = None
+_service_settings = None
+_service_lock = threading.Lock()
+
+
+def get_classification_service() -> ClassificationService:
+    """
+    Return the shared classification service, configured from the CLASSIFIER_* settings.
+
+    Returns:
+        ClassificationService: The service.
+    """
+    global _service, _service_settings
+    # Rebuilt when the settings change (e.g. override_settings in the tests)
+    current = (settings.CLASSIFIER_BACKEND, settings.CLASSIFICATION_MEMO_PATH)
+    if _service is None or _service_settings != current:
+        with _service_lock:
+            if _service is None or _service_settings != current:
+                backend = BACKENDS[settings.CLASSIFIER_BACKEND]()
+                memo = None
+                if settings.CLASSIFICATION_MEMO_PATH:
+                    memo = TextMemo(str(settings.CLASSIFICATION_MEMO_PATH), backend.namespace)
+                _service_settings = current
+                _service = ClassificationService(
+                    backend,
+                    memo,
+                    max_tokens=settings.CLASSIFIER_CHUNK_TOKENS,
+                    max_titles=settings.CLASSIFIER_CHUNK_SIZE,
+                    concurrency=settings.CLASSIFIER_CONCURRENCY,
+                    rate_limiter=RateLimiter(settings.CLASSIFIER_RATE_LIMIT),
+                )
+    return _service
+
+
 def classify_articles(articles: List[str]) -> List[str]:
     """
     Classifies multiple articles and returns a list of areas related to each article.
@@ -73,30 +357,11 @@ def classify_articles(articles: List[str]) -> List[str]:
     Returns:
     - list: A list of specific areas related to the article.
     """
-    # Create a prompt focused on specific areas for all articles
-    prompt = (
-        "You are an expert in classifying articles into academic domains. "
-        "Classify the following articles into academic domains and provide a **numbered list of specific areas only** without additional context:\n\n"
-    )
-    
-    for index, article in enumerate(articles, start=1):
-        prompt += f"{index}. {article}\n"
-
-    # Use the model to generate a classification response
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    response = model.generate_content(prompt)
-
-    # Clean the response
-    specific_areas_text = response.text.strip().lower()
-    # Use regex to extract the list items into a Python list
-    specific_areas_list = re.findall(r'\d+\.\s+\*\*(.*?)\*\*', specific_areas_text)
-    
-    # Clean and extend the interests list with cleaned areas
     interests = []
-    for area in specific_areas_list:
-        area_list = area.split(', ')
-        interests.extend(clean_area(area) for area in area_list)
-    return interests
+    for areas in get_classification_service().classify_titles(articles):
+        interests.extend(areas)
+    # Keep the first occurrence of each area
+    return list(dict.fromkeys(interests))
 
 # Example usage
 # article_text = (
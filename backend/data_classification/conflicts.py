@@ -0,0 +1,327 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from django.conf import settings
+from database.models import Expert, Publication
+from data_cleaning.cache import normalize_text
+from .index import _index_file_mtime
+
+# Shorter titles (e.g. "Introduction") are too common to reveal a co-authorship
+MIN_TITLE_WORDS = 4
+
+# Establishment code of experts without establishment
+NO_ESTABLISHMENT = -1
+
+
+def title_key(title: str) -> Optional[str]:
+    """
+    Normalize a publication title so that the copies of one paper found for its different authors match.
+
+    Args:
+        title (str): The publication title.
+
+    Returns:
+        str: The normalized title, or None when it is too short to identify a paper.
+    """
+    key = normalize_text(title or "")
+    return key if len(key.split()) >= MIN_TITLE_WORDS else None
+
+
+class ConflictGraph:
+    """
+    Conflicts of interest between experts, precomputed for reviewer selection.
+
+    Each expert has a position; its establishment is stored as an integer code in one list and its
+    co-authors (experts sharing a publication title) as a sorted array of positions, assembled on demand
+    into CSR arrays (`indptr`, `indices`). Changed experts are refreshed individually (`mark_dirty`).
+    """
+
+    def __init__(self):
+        self.expert_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._establishments: List[int] = []
+        self._establishment_array = None
+        self._establishment_codes: Dict[str, int] = {}
+        self._titles: Dict[int, Set[str]] = {}
+        self._authors: Dict[str, Set[int]] = defaultdict(set)
+        self._coauthors: Dict[int, np.ndarray] = {}
+        self._csr = None
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.expert_ids)
+
+    @classmethod
+    def build(cls) -> "ConflictGraph":
+        """
+        Build the graph of every expert from the database, in two queries.
+
+        Returns:
+            ConflictGraph: The populated graph.
+        """
+        graph = cls()
+        graph.refresh(None)
+        return graph
+
+    def _position(self, expert_id: str) -> int:
+        position = self._positions.get(expert_id)
+        if position is None:
+            position = self._positions[expert_id] = len(self.expert_ids)
+            self.expert_ids.append(expert_id)
+            self._establishments.append(NO_ESTABLISHMENT)
+        return position
+
+    @property
+    def establishments(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The establishment code of each expert, by position.
+        """
+        with self._lock:
+            if self._establishment_array is None:
+                self._establishment_array = np.array(self._establishments, dtype=np.int64)
+            return self._establishment_array
+
+    def _establishment_code(self, establishment_id) -> int:
+        if establishment_id is None:
+            return NO_ESTABLISHMENT
+        return self._establishment_codes.setdefault(str(establishment_id), len(self._establishment_codes))
+
+    def refresh(self, expert_ids: Optional[Iterable] = None) -> None:
+        """
+        Reload the establishment and publications of some experts and update their conflicts.
+
+        Args:
+            expert_ids (Iterable, optional): The experts to reload. Defaults to all experts.
+        """
+        experts = Expert.objects.values_list("id", "etablissement_id")
+        titles = Publication.objects.values_list("expert_id", "titre")
+        if expert_ids is not None:
+            expert_ids = [str(expert_id) for expert_id in expert_ids]
+            experts = experts.filter(id__in=expert_ids)
+            titles = titles.filter(expert_id__in=expert_ids)
+
+        keys = defaultdict(set)
+        for expert_id, title in titles:
+            key = title_key(title)
+            if key is not None:
+                keys[str(expert_id)].add(key)
+        found = {str(expert_id): establishment_id for expert_id, establishment_id in experts}
+
+        with self._lock:
+            # Unknown or deleted experts keep a position, without establishment nor publication
+            changed = set()
+            for expert_id in (found if expert_ids is None else expert_ids):
+                position = self._position(expert_id)
+                self._establishments[position] = self._establishment_code(found.get(expert_id))
+                old, new = self._titles.get(position, set()), keys.get(expert_id, set())
+                for key in old - new:
+                    self._authors[key].discard(position)
+                    changed.update(self._authors[key])
+                    if not self._authors[key]:
+                        del self._authors[key]
+                for key in new - old:
+                    changed.update(self._authors[key])
+                    self._authors[key].add(position)
+                self._titles[position] = new
+                changed.add(position)
+                self._dirty.discard(expert_id)
+
+            for position in changed:
+                coauthors = set().union(*(self._authors[key] for key in self._titles.get(position, ())))
+                coauthors.discard(position)
+                self._coauthors[position] = np.array(sorted(coauthors), dtype=np.int64)
+            self._establishment_array = None
+            self._csr = None
+
+    def mark_dirty(self, expert_ids: Iterable) -> None:
+        """
+        Queue experts for a refresh before the next use of the graph.
+
+        Args:
+            expert_ids (Iterable): The ids of the experts that changed.
+        """
+        with self._lock:
+            self._dirty.update(str(expert_id) for expert_id in expert_ids)
+
+    def adjacency(self):
+        """
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The co-authorship graph in CSR form: the co-authors of the expert
+                at position i are `indices[indptr[i]:indptr[i + 1]]`.
+        """
+        with self._lock:
+            if self._csr is None:
+                rows = [self._coauthors.get(i, np.zeros(0, dtype=np.int64)) for i in range(len(self.expert_ids))]
+                indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+                indptr[1:] = np.cumsum([len(row) for row in rows])
+                indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+                self._csr = (indptr, indices)
+            return self._csr
+
+    def mask(self, doctorants: Sequence, expert_ids: Sequence[str], rules: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Compute which experts are in conflict of interest with the thesis of each doctorant:
+        its director and co-director, and depending on `rules`, their co-authors ('coauthor') and
+        the experts of their establishments or of the doctorant's ('establishment').
+
+        Args:
+            doctorants (Sequence[Doctorant]): The doctorants.
+            expert_ids (Sequence[str]): The candidate experts, e.g. in vector index order.
+            rules (Iterable[str], optional): The conflicts checked besides supervision. Defaults to CONFLICT_RULES.
+
+        Returns:
+            np.ndarray: A (doctorants, experts) boolean array, True where the expert must not review the thesis.
+        """
+        rules = set(settings.CONFLICT_RULES if rules is None else rules)
+        supervisors = np.array([
+            [str(doctorant.directeur_these_id or ""), str(doctorant.co_directeur_these_id or "")]
+            for doctorant in doctorants
+        ], dtype=object).reshape(len(doctorants), 2)
+        candidates = np.array([str(expert_id) for expert_id in expert_ids], dtype=object)
+        conflicts = (candidates[np.newaxis, :, np.newaxis] == supervisors[:, np.newaxis, :]).any(axis=2)
+        if not rules & {"coauthor", "establishment"} or not len(doctorants) or not len(candidates):
+            return conflicts
+
+        # Experts not seen yet are loaded on first use
+        pending = {expert_id for expert_id in supervisors.ravel() if expert_id} | set(candidates)
+        with self._lock:
+            pending = (pending - set(self._positions)) | self._dirty
+        if pending:
+            self.refresh(pending)
+
+        with self._lock:
+            columns = np.array([self._positions[expert_id] for expert_id in candidates])
+            supervisor_positions = np.array([
+                [self._positions.get(expert_id, -1) if expert_id else -1 for expert_id in row] for row in supervisors
+            ]).reshape(len(doctorants), 2)
+
+            # Conflicts in graph positions, then reordered as the candidates
+            graph_conflicts = np.zeros((len(doctorants), len(self.expert_ids)), dtype=bool)
+            if "coauthor" in rules:
+                indptr, indices = self.adjacency()
+                rows, slots = np.nonzero(supervisor_positions >= 0)
+                sources = supervisor_positions[rows, slots]
+                counts = indptr[sources + 1] - indptr[sources]
+                # Gather the co-authors of every supervisor at once from the CSR arrays
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                neighbors = indices[np.repeat(indptr[sources], counts) + offsets]
+                graph_conflicts[np.repeat(rows, counts), neighbors] = True
+            if "establishment" in rules:
+                codes = np.where(supervisor_positions >= 0, self.establishments[supervisor_positions], NO_ESTABLISHMENT)
+                own = np.array([
+                    self._establishment_codes.get(str(doctorant.etablissement_exercice_id), NO_ESTABLISHMENT)
+                    for doctorant in doctorants
+                ]).reshape(len(doctorants), 1)
+                codes = np.concatenate([codes, own], axis=1)
+                shared = self.establishments[np.newaxis, :, np.newaxis] == codes[:, np.newaxis, :]
+                graph_conflicts |= (shared & (codes[:, np.newaxis, :] != NO_ESTABLISHMENT)).any(axis=2)
+        return conflicts | graph_conflicts[:, columns]
+
+
+_conflict_graph: Optional[ConflictGraph] = None
+# Versions (mtimes) of the expert index file and of the establishment version file the graph reflects
+_conflict_version: Tuple[Optional[float], Optional[float]] = (None, None)
+_conflict_lock = threading.Lock()
+
+
+def conflict_version() -> Tuple[Optional[float], Optional[float]]:
+    """
+    Returns:
+        Tuple[Optional[float], Optional[float]]: The versions of the files written when publications change
+            (EXPERT_INDEX_PATH) and when establishments change (CONFLICT_VERSION_PATH), shared by all processes.
+    """
+    return (_index_file_mtime(str(settings.EXPERT_INDEX_PATH)),
+            _index_file_mtime(str(settings.CONFLICT_VERSION_PATH)))
+
+
+def touch_establishment_version() -> Tuple[Optional[float], float]:
+    """
+    Advance the establishment version file, so that the other processes rebuild their graph.
+
+    Returns:
+        Tuple[Optional[float], float]: The version of the file before (None if there was none) and after.
+    """
+    path = str(settings.CONFLICT_VERSION_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _conflict_lock:
+        previous = _index_file_mtime(path)
+        # Strictly increasing, even for two changes within the resolution of the clock
+        now = time.time_ns()
+        if previous is not None:
+            now = max(now, int(previous * 1e9) + 1000)
+        with open(path, "a"):
+            os.utime(path, ns=(now, now))
+        return previous, _index_file_mtime(path)
+
+
+def get_conflict_graph() -> ConflictGraph:
+    """
+    Return the process-wide conflict graph, built from the database on first use.
+    It follows the changes applied by this process (see `mark_conflicts_dirty`), and is rebuilt
+    when another process changed publications (e.g. `import_experts`) or establishments.
+
+    Returns:
+        ConflictGraph: The shared graph.
+    """
+    global _conflict_graph, _conflict_version
+    version = conflict_version()
+    if _conflict_graph is None or version != _conflict_version:
+        with _conflict_lock:
+            version = conflict_version()
+            if _conflict_graph is None or version != _conflict_version:
+                _conflict_graph = ConflictGraph.build()
+                _conflict_version = version
+    return _conflict_graph
+
+
+def _apply_changes(slot: int, versions: Tuple, expert_ids: Iterable) -> None:
+    """
+    Refresh experts changed by this process in the shared graph on its next use, if it is loaded.
+    If another process changed the same file since the graph was built, its changes are missing
+    too: the graph is dropped and rebuilt from the database on next use.
+
+    Args:
+        slot (int): The version changed, 0 for the expert index file and 1 for the establishment file.
+        versions (Tuple): The versions of that file before and after the changes.
+        expert_ids (Iterable): The ids of the experts that changed.
+    """
+    global _conflict_graph, _conflict_version
+    previous, current = versions
+    with _conflict_lock:
+        if _conflict_graph is None:
+            return
+        if _conflict_version[slot] != previous:
+            _conflict_graph = None
+            return
+        _conflict_graph.mark_dirty(expert_ids)
+        _conflict_version = tuple(current if i == slot else version for i, version in enumerate(_conflict_version))
+
+
+def mark_conflicts_dirty(expert_ids: Iterable) -> None:
+    """
+    Record that the establishment of experts changed: they are refreshed in this process,
+    and the other processes rebuild their graph.
+
+    Args:
+        expert_ids (Iterable): The ids of the experts that changed.
+    """
+    _apply_changes(1, touch_establishment_version(), expert_ids)
+
+
+def update_conflict_graph(texts: Dict[str, List[str]], removed: Iterable[str],
+                          versions: Tuple[Optional[float], Optional[float]] = (None, None)) -> None:
+    """
+    Listener of the expert index updater: the experts whose publications changed are refreshed.
+
+    Args:
+        texts (Dict[str, List[str]]): The new texts of the changed experts.
+        removed (Iterable[str]): The ids of the experts that no longer exist or have no text.
+        versions (Tuple[Optional[float], Optional[float]]): The versions of the expert index file before
+            and after this update (see `save_expert_index`).
+    """
+    _apply_changes(0, versions, list(texts) + list(removed))
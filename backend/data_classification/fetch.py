@@ -1,75 +1,307 @@
+import asyncio
+import queue
+import threading
+import weakref
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from django.conf import settings
 from data_collection.gate import get_gate_articles_interests
 from data_collection.scholar import get_scholar_articles_interests
 from data_collection.dblp import get_dblp_articles
-from data_cleaning.clean import remove_duplicates
-from data_cleaning.translate import translate_texts
+from data_cleaning.provenance import collect_records, deduplicate_records, translate_records
 from data_classification.classify import classify_articles
 
-def fetch_researcher_data(first_name: str, last_name: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+SOURCES = ("dblp", "scholar", "researchgate")
+SOURCE_LABELS = {"dblp": "DBLP", "scholar": "Google Scholar", "researchgate": "ResearchGate"}
+
+
+class SourceResult(NamedTuple):
+    source: str
+    articles: List[str]
+    interests: List[str]
+    # Why the source gave nothing: "timeout", an exception message, or None on success
+    error: Optional[str] = None
+
+
+def collect_source(source: str, first_name: str, last_name: str) -> SourceResult:
     """
-    Retrieve researcher data (articles, interests) from DBLP, Google Scholar, and ResearchGate in parallel.
+    Call the collector of one source (blocking).
 
     Args:
+        source (str): One of SOURCES.
         first_name (str): The researcher's first name.
         last_name (str): The researcher's last name.
 
     Returns:
-        Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]: A tuple containing two lists:
-            - A list of unique article titles (strings) with their sources.
-            - A list of unique research interests (strings) with their sources.
+        SourceResult: The articles and interests found on the source.
+    """
+    if source == "dblp":
+        return SourceResult(source, get_dblp_articles(f"{first_name} {last_name}"), [])
+    if source == "scholar":
+        interests, articles = get_scholar_articles_interests(f"{first_name} {last_name}")
+        return SourceResult(source, articles, interests)
+    if source == "researchgate":
+        interests, articles = get_gate_articles_interests(first_name, last_name)
+        return SourceResult(source, articles, interests)
+    raise ValueError(f"Unknown source: {source}")
+
+
+class FetchOrchestrator:
+    """
+    Fetch many researchers at once, overlapping the work of the three sources.
+
+    Collectors are blocking, so each source runs on its own thread pool sized to its limit
+    (FETCH_SOURCE_CONCURRENCY): the limit holds for every caller and event loop of the process.
+    A source that exceeds its timeout (FETCH_SOURCE_TIMEOUT) is reported as failed and the
+    researcher is processed with the other sources; its thread is only given back once the call
+    really returns, so a hanging source can never be hit by more requests than its limit.
+    """
+
+    def __init__(self, concurrency: Optional[Dict[str, int]] = None, timeouts: Optional[Dict[str, float]] = None,
+                 process_workers: int = 2):
+        self.concurrency = dict(concurrency or settings.FETCH_SOURCE_CONCURRENCY)
+        self.timeouts = dict(timeouts or settings.FETCH_SOURCE_TIMEOUT)
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"fetch-{name}")
+            for name, limit in self.concurrency.items()
+        }
+        # Translation, deduplication and classification of the collected titles
+        self._process_executor = ThreadPoolExecutor(max_workers=process_workers, thread_name_prefix="fetch-process")
+        # Slots are also awaited on the event loop, so that the timeout starts with the call.
+        # Semaphores belong to one event loop: each loop has its own.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._semaphores_lock = threading.Lock()
+
+    def _semaphore(self, source: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._semaphores_lock:
+            semaphores = self._semaphores.get(loop)
+            if semaphores is None:
+                semaphores = self._semaphores[loop] = {
+                    name: asyncio.Semaphore(limit) for name, limit in self.concurrency.items()
+                }
+        return semaphores[source]
+
+    async def fetch_source(self, source: str, first_name: str, last_name: str) -> SourceResult:
+        """
+        Query one source, waiting for a free slot and giving up after the source timeout.
+
+        Args:
+            source (str): One of SOURCES.
+            first_name (str): The researcher's first name.
+            last_name (str): The researcher's last name.
+
+        Returns:
+            SourceResult: The result, empty with an error when the source failed or timed out.
+        """
+        semaphore = self._semaphore(source)
+        await semaphore.acquire()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executors[source], collect_source, source, first_name, last_name
+        )
+        future.add_done_callback(lambda _: semaphore.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeouts.get(source))
+        except asyncio.TimeoutError:
+            print(f"Fetch : {source} timed out for {first_name} {last_name}")
+            return SourceResult(source, [], [], "timeout")
+        except Exception as e:
+            print(f"Fetch : {source} failed for {first_name} {last_name}: {e}")
+            return SourceResult(source, [], [], str(e))
+
+    async def stream_sources(self, first_name: str, last_name: str) -> AsyncIterator[SourceResult]:
+        """
+        Query every source concurrently and yield each result as soon as its source completes.
+
+        Args:
+            first_name (str): The researcher's first name.
+            last_name (str): The researcher's last name.
+
+        Yields:
+            SourceResult: The result of one source.
+        """
+        tasks = [asyncio.ensure_future(self.fetch_source(source, first_name, last_name)) for source in SOURCES]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def collect(self, first_name: str, last_name: str) -> Dict[str, SourceResult]:
+        """
+        Query every source concurrently.
+
+        Returns:
+            Dict[str, SourceResult]: The result of each source, keyed by source name.
+        """
+        return {result.source: result async for result in self.stream_sources(first_name, last_name)}
+
+    async def fetch(self, first_name: str, last_name: str) -> Tuple[List[Tuple[str, str, List[str]]], List[Tuple[str, str, List[str]]]]:
+        """
+        Collect a researcher from every source then process the results (see `process_researcher_data`).
+
+        Returns:
+            Tuple[List[Tuple[str, str, List[str]]], List[Tuple[str, str, List[str]]]]: The articles and interests with their sources.
+        """
+        results = await self.collect(first_name, last_name)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._process_executor, process_researcher_data, results
+        )
+
+    async def fetch_many(self, researchers: Iterable[Tuple[Any, str, str]],
+                         max_researchers: int = 4) -> AsyncIterator[Tuple[Any, Any]]:
+        """
+        Fetch many researchers, keeping up to `max_researchers` of them in flight.
+
+        Args:
+            researchers (Iterable[Tuple[Any, str, str]]): (key, first_name, last_name) triples.
+            max_researchers (int): The number of researchers fetched at the same time.
+
+        Yields:
+            Tuple[Any, Any]: (key, result) in completion order, where result is the
+                (articles, interests) tuple or the exception that interrupted the researcher.
+        """
+        pending = {}
+        researchers = iter(researchers)
+
+        def start_next() -> bool:
+            for key, first_name, last_name in researchers:
+                pending[asyncio.ensure_future(self.fetch(first_name, last_name))] = key
+                return True
+            return False
+
+        while len(pending) < max(1, max_researchers) and start_next():
+            pass
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key = pending.pop(task)
+                    exception = task.exception()
+                    yield key, exception if exception is not None else task.result()
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._process_executor.shutdown(wait=False, cancel_futures=True)
+
+
+_orchestrator: Optional[FetchOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator() -> FetchOrchestrator:
+    """
+    Returns:
+        FetchOrchestrator: The orchestrator shared by the process.
+    """
+    global _orchestrator
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                _orchestrator = FetchOrchestrator()
+    return _orchestrator
+
+
+def iter_researcher_data(researchers: Iterable[Tuple[Any, str, str]], max_researchers: int = 4) -> Iterator[Tuple[Any, Any]]:
+    """
+    Synchronous front of `FetchOrchestrator.fetch_many`, for code that must stay out of an
+    event loop (e.g. Django ORM writes). The loop runs on a background thread.
+
+    Args:
+        researchers (Iterable[Tuple[Any, str, str]]): (key, first_name, last_name) triples.
+        max_researchers (int): The number of researchers fetched at the same time.
+
+    Yields:
+        Tuple[Any, Any]: (key, (articles, interests) or exception), in completion order.
     """
-    with ThreadPoolExecutor() as executor:
-        # Submit tasks to the executor
-        dblp_future = executor.submit(get_dblp_articles, f"{first_name} {last_name}")
-        gs_future = executor.submit(get_scholar_articles_interests, f"{first_name} {last_name}")
-        rg_future = executor.submit(get_gate_articles_interests, first_name, last_name)
-
-        # Retrieve results
-        dblp_articles = dblp_future.result()
-        gs_interests, gs_articles = gs_future.result()
-        rg_interests, rg_articles = rg_future.result()
-
-    # Combine all articles and translate them
-    all_articles = dblp_articles + gs_articles + rg_articles
-    translated_articles = translate_texts(all_articles)
-    unique_articles = remove_duplicates(translated_articles)
-    
-    articles = []  # Initialize articles list
-    for article in unique_articles:
-        article_source = 'Autre'
-        if article in gs_articles:
-            article_source = 'Google Scholar'
-        elif article in rg_articles:
-            article_source = 'ResearchGate'
-        elif article in dblp_articles:
-            article_source = 'DBLP'
-        
-        if article_source:  # Append only if a source was found
-            articles.append((article.capitalize(), article_source))
-    
+    results = queue.Queue()
+    done = object()
+    stop = threading.Event()
+
+    async def produce():
+        async for item in get_orchestrator().fetch_many(researchers, max_researchers):
+            results.put(item)
+            if stop.is_set():
+                break
+
+    def run():
+        try:
+            asyncio.run(produce())
+        except BaseException as e:
+            results.put((done, e))
+        else:
+            results.put((done, None))
+
+    thread = threading.Thread(target=run, name="fetch-loop", daemon=True)
+    thread.start()
+    try:
+        while True:
+            key, value = results.get()
+            if key is done:
+                if value is not None:
+                    raise value
+                return
+            yield key, value
+    finally:
+        stop.set()
+
+
+def process_researcher_data(results: Dict[str, SourceResult]) -> Tuple[List[Tuple[str, str, List[str]]], List[Tuple[str, str, List[str]]]]:
+    """
+    Merge the results of the sources: translate and deduplicate the articles, classify them
+    and compile the interests. Each title keeps track of its sources through translation and
+    deduplication, so attributing it costs nothing and no title is left without a source.
+
+    Args:
+        results (Dict[str, SourceResult]): The result of each source, keyed by source name.
+
+    Returns:
+        Tuple[List[Tuple[str, str, List[str]]], List[Tuple[str, str, List[str]]]]: A tuple containing two lists:
+            - A list of unique article titles (strings) with their main source and all their sources.
+            - A list of unique research interests (strings) with their main source and all their sources.
+    """
+    articles_by_source = {
+        SOURCE_LABELS[source]: results[source].articles for source in SOURCES if source in results
+    }
+    records = deduplicate_records(translate_records(collect_records(articles_by_source)))
+    articles = [(record.text.capitalize(), record.source, record.sources) for record in records]
+
     # Classify interests and compile unique interests
-    cls_interests = classify_articles(unique_articles)
-    all_interests = gs_interests + rg_interests + cls_interests
-    unique_interests = list(set(all_interests))
-
-    # Sort interests alphabetically based on the interest string
-    unique_interests.sort()  # Sort by the first element of the tuple (interest string)
-    
-    interests = []
-    for interest in unique_interests:
-        interest_source = 'Classified'
-        if interest in gs_interests:
-            interest_source = 'Google Scholar'
-        elif interest in rg_interests:
-            interest_source = 'ResearchGate'
-        
-        interests.append((interest.title(), interest_source))
-    
+    cls_interests = classify_articles([record.text for record in records])
+    interests_by_source = {
+        SOURCE_LABELS[source]: results[source].interests for source in ("scholar", "researchgate") if source in results
+    }
+    interests_by_source["Classified"] = cls_interests
+    interest_records = sorted(collect_records(interests_by_source), key=lambda record: record.text)
+    interests = [(record.text.title(), record.source, record.sources) for record in interest_records]
+
     return articles, interests
 
 
+def fetch_researcher_data(first_name: str, last_name: str) -> Tuple[List[Tuple[str, str, List[str]]], List[Tuple[str, str, List[str]]]]:
+    """
+    Retrieve researcher data (articles, interests) from DBLP, Google Scholar, and ResearchGate in parallel.
+
+    Args:
+        first_name (str): The researcher's first name.
+        last_name (str): The researcher's last name.
+
+    Returns:
+        Tuple[List[Tuple[str, str, List[str]]], List[Tuple[str, str, List[str]]]]: A tuple containing two lists:
+            - A list of unique article titles (strings) with their main source and all their sources.
+            - A list of unique research interests (strings) with their main source and all their sources.
+    """
+    return asyncio.run(get_orchestrator().fetch(first_name, last_name))
+
+
 # Example usage
 # first_name = "John"
 # last_name = "Doe"
@@ -0,0 +1,392 @@
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from django.conf import settings
+from database.models import Expert, Publication
+from data_cleaning.clean import encode_sentences
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale each row of a matrix to unit length so that dot products are cosine similarities.
+
+    Args:
+        vectors (np.ndarray): A 2D array of embeddings.
+
+    Returns:
+        np.ndarray: The row-normalized float32 array (zero rows are left as zeros).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def collect_expert_texts(expert_ids: Optional[Iterable] = None) -> Dict[str, List[str]]:
+    """
+    Collect the keywords and publication titles describing each expert, in two queries.
+
+    Args:
+        expert_ids (Iterable, optional): Restrict the collection to these experts. Defaults to all experts.
+
+    Returns:
+        Dict[str, List[str]]: A mapping of expert id (as a string) to its keywords followed by its titles.
+    """
+    through = Expert.mots_cles.through
+    keywords = through.objects.values_list("expert_id", "motcle__mot_cle")
+    titles = Publication.objects.values_list("expert_id", "titre")
+    experts = Expert.objects.values_list("id", flat=True)
+    if expert_ids is not None:
+        expert_ids = list(expert_ids)
+        keywords = keywords.filter(expert_id__in=expert_ids)
+        titles = titles.filter(expert_id__in=expert_ids)
+        experts = experts.filter(id__in=expert_ids)
+
+    grouped = defaultdict(list)
+    for expert_id, text in list(keywords) + list(titles):
+        if text and text.strip():
+            grouped[str(expert_id)].append(text.strip())
+    return {str(expert_id): grouped.get(str(expert_id), []) for expert_id in experts}
+
+
+def encode_experts(texts: Dict[str, List[str]]) -> Dict[str, np.ndarray]:
+    """
+    Compute one embedding per expert as the normalized mean of its keyword and title embeddings.
+    All texts of all experts are encoded in a single batch.
+
+    Args:
+        texts (Dict[str, List[str]]): A mapping of expert id to the texts describing the expert.
+
+    Returns:
+        Dict[str, np.ndarray]: A mapping of expert id to its unit-length embedding.
+            Experts without any text are omitted.
+    """
+    expert_ids = [expert_id for expert_id, expert_texts in texts.items() if expert_texts]
+    owners = []
+    sentences = []
+    for position, expert_id in enumerate(expert_ids):
+        owners.extend([position] * len(texts[expert_id]))
+        sentences.extend(texts[expert_id])
+
+    if not sentences:
+        return {}
+
+    embeddings = normalize_rows(encode_sentences(sentences))
+    sums = np.zeros((len(expert_ids), embeddings.shape[1]), dtype=np.float32)
+    np.add.at(sums, np.array(owners), embeddings)
+    means = normalize_rows(sums)
+    vectors = {expert_id: means[position] for position, expert_id in enumerate(expert_ids)}
+    return vectors
+
+
+class ExpertIndex:
+    """
+    In-memory vector index of experts supporting top-k cosine search.
+    """
+
+    def __init__(self, expert_ids: Optional[List[str]] = None, vectors: Optional[np.ndarray] = None):
+        self.expert_ids = list(expert_ids or [])
+        self.vectors = normalize_rows(vectors) if vectors is not None and len(vectors) else None
+        self._positions = {expert_id: i for i, expert_id in enumerate(self.expert_ids)}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.expert_ids)
+
+    @classmethod
+    def build(cls, expert_ids: Optional[Iterable] = None) -> "ExpertIndex":
+        """
+        Build an index from the keywords and publications stored in the database.
+
+        Args:
+            expert_ids (Iterable, optional): Only index these experts. Defaults to all experts.
+
+        Returns:
+            ExpertIndex: The populated index.
+        """
+        vectors = encode_experts(collect_expert_texts(expert_ids))
+        if not vectors:
+            return cls()
+        ids = list(vectors)
+        return cls(ids, np.stack([vectors[expert_id] for expert_id in ids]))
+
+    @classmethod
+    def load(cls, path: str) -> "ExpertIndex":
+        """
+        Load an index previously written with `save`.
+
+        Args:
+            path (str): The path of the .npz file.
+
+        Returns:
+            ExpertIndex: The loaded index.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["expert_ids"].tolist(), data["vectors"])
+
+    def save(self, path: str) -> None:
+        """
+        Write the index atomically to an .npz file.
+
+        Args:
+            path (str): The destination path.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        vectors = self.vectors if self.vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        np.savez(tmp_path, expert_ids=np.array(self.expert_ids, dtype=str), vectors=vectors)
+        os.replace(tmp_path, path)
+
+    def upsert(self, vectors: Dict[str, np.ndarray]) -> None:
+        """
+        Insert or replace the embeddings of some experts.
+
+        Args:
+            vectors (Dict[str, np.ndarray]): A mapping of expert id to embedding.
+        """
+        if not vectors:
+            return
+        with self._lock:
+            new_ids = [expert_id for expert_id in vectors if expert_id not in self._positions]
+            if self.vectors is None:
+                dim = len(next(iter(vectors.values())))
+                self.vectors = np.zeros((0, dim), dtype=np.float32)
+            if new_ids:
+                self.vectors = np.vstack([self.vectors, np.zeros((len(new_ids), self.vectors.shape[1]), dtype=np.float32)])
+                for expert_id in new_ids:
+                    self._positions[expert_id] = len(self.expert_ids)
+                    self.expert_ids.append(expert_id)
+            for expert_id, vector in vectors.items():
+                self.vectors[self._positions[expert_id]] = normalize_rows(np.atleast_2d(vector))[0]
+
+    def remove(self, expert_ids: Iterable[str]) -> None:
+        """
+        Drop experts from the index.
+
+        Args:
+            expert_ids (Iterable[str]): The ids of the experts to remove.
+        """
+        with self._lock:
+            drop = {self._positions[expert_id] for expert_id in expert_ids if expert_id in self._positions}
+            if not drop:
+                return
+            keep = [i for i in range(len(self.expert_ids)) if i not in drop]
+            self.expert_ids = [self.expert_ids[i] for i in keep]
+            self.vectors = self.vectors[keep]
+            self._positions = {expert_id: i for i, expert_id in enumerate(self.expert_ids)}
+
+    def score_all(self, query: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Compute the cosine similarity of every expert to an embedding.
+
+        Args:
+            query (np.ndarray): The query embedding.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: The expert ids and their similarities, in the same order.
+        """
+        expert_ids, scores = self.score_many(np.atleast_2d(query))
+        return expert_ids, scores[0] if len(expert_ids) else np.zeros(0, dtype=np.float32)
+
+    def score_many(self, queries: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Compute the cosine similarity of every expert to several embeddings in one matrix product.
+
+        Args:
+            queries (np.ndarray): The query embeddings, one row per query.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: The expert ids and a (queries, experts) similarity matrix.
+        """
+        with self._lock:
+            if not self.expert_ids:
+                return [], np.zeros((len(queries), 0), dtype=np.float32)
+            return list(self.expert_ids), normalize_rows(queries) @ self.vectors.T
+
+    def search_vector(self, query: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Return the k experts closest to an embedding.
+
+        Args:
+            query (np.ndarray): The query embedding.
+            k (int): The number of experts to return. Defaults to 10.
+
+        Returns:
+            List[Tuple[str, float]]: (expert id, cosine similarity) pairs, best first.
+        """
+        with self._lock:
+            if not self.expert_ids or k <= 0:
+                return []
+            scores = self.vectors @ normalize_rows(np.atleast_2d(query))[0]
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.expert_ids[i], float(scores[i])) for i in top]
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Return the k experts closest to a text, such as a thesis title.
+
+        Args:
+            text (str): The query text.
+            k (int): The number of experts to return. Defaults to 10.
+
+        Returns:
+            List[Tuple[str, float]]: (expert id, cosine similarity) pairs, best first.
+        """
+        if not self.expert_ids:
+            return []
+        return self.search_vector(encode_sentences([text])[0], k)
+
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def _index_file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def get_expert_index() -> ExpertIndex:
+    """
+    Return the process-wide expert index, loading it from disk or building it on first use.
+    The index is reloaded when another process (e.g. `import_experts`) has written a newer file.
+
+    Returns:
+        ExpertIndex: The shared index.
+    """
+    global _index, _index_mtime
+    path = str(settings.EXPERT_INDEX_PATH)
+    mtime = _index_file_mtime(path)
+    if _index is None or (mtime is not None and mtime != _index_mtime):
+        with _index_lock:
+            mtime = _index_file_mtime(path)
+            if _index is None or (mtime is not None and mtime != _index_mtime):
+                if mtime is not None:
+                    _index = ExpertIndex.load(path)
+                else:
+                    _index = ExpertIndex.build()
+                    _index.save(path)
+                _index_mtime = _index_file_mtime(path)
+    return _index
+
+
+def save_expert_index(index: ExpertIndex) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Persist the shared expert index, remembering the file version so this process does not reload it.
+
+    Args:
+        index (ExpertIndex): The index to write.
+
+    Returns:
+        Tuple[Optional[float], Optional[float]]: The version (mtime) of the file replaced, None if there
+            was none, and the version of the written file.
+    """
+    global _index, _index_mtime
+    path = str(settings.EXPERT_INDEX_PATH)
+    with _index_lock:
+        previous = _index_file_mtime(path)
+        index.save(path)
+        _index = index
+        _index_mtime = _index_file_mtime(path)
+        return previous, _index_mtime
+
+
+def rebuild_expert_index() -> ExpertIndex:
+    """
+    Rebuild the shared expert index from the database and persist it.
+
+    Returns:
+        ExpertIndex: The rebuilt index.
+    """
+    index = ExpertIndex.build()
+    save_expert_index(index)
+    return index
+
+
+class ExpertIndexUpdater:
+    """
+    Collects the experts whose keywords or publications changed and re-encodes them in one batch.
+    The first change starts a timer; every change arriving before it fires joins the same batch.
+    """
+
+    def __init__(self, delay: Optional[float] = None):
+        self.delay = delay
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._listeners: List[Callable[[Dict[str, List[str]], Set[str], Tuple], None]] = []
+
+    def add_listener(self, listener: Callable[[Dict[str, List[str]], Set[str], Tuple], None]) -> None:
+        """
+        Register a function called after each flush with the new texts of the changed experts,
+        the ids of the experts removed from the index and the file versions returned by
+        `save_expert_index`, e.g. to update another index.
+
+        Args:
+            listener (Callable): The function to call.
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def mark_dirty(self, expert_ids: Iterable) -> None:
+        """
+        Schedule experts for re-encoding.
+
+        Args:
+            expert_ids (Iterable): The ids of the experts that changed.
+        """
+        expert_ids = {str(expert_id) for expert_id in expert_ids if expert_id is not None}
+        if not expert_ids:
+            return
+        with self._lock:
+            self._dirty |= expert_ids
+            if self._timer is None:
+                delay = self.delay if self.delay is not None else settings.EXPERT_INDEX_UPDATE_DELAY
+                self._timer = threading.Timer(delay, self._flush_in_thread)
+                self._timer.start()
+
+    def _flush_in_thread(self) -> None:
+        from django.db import connection
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"INDEX : Failed to update the expert index: {e}")
+        finally:
+            connection.close()
+
+    def flush(self) -> List[str]:
+        """
+        Re-encode the pending experts now and persist the index.
+        Experts that were deleted or no longer have any text are removed from the index.
+
+        Returns:
+            List[str]: The ids of the experts that were processed.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            expert_ids, self._dirty = self._dirty, set()
+        if not expert_ids:
+            return []
+
+        texts = collect_expert_texts(expert_ids)
+        vectors = encode_experts(texts)
+        removed = expert_ids - set(vectors)
+        index = get_expert_index()
+        index.upsert(vectors)
+        index.remove(removed)
+        versions = save_expert_index(index)
+        for listener in self._listeners:
+            listener({expert_id: texts[expert_id] for expert_id in vectors}, removed, versions)
+        return sorted(expert_ids)
+
+
+index_updater = ExpertIndexUpdater()
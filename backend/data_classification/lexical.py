@@ -0,0 +1,195 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from data_cleaning.keywords import lemmatize_word
+from .index import collect_expert_texts, _index_file_mtime
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# English and French words carrying no topic
+STOPWORDS = frozenset("""
+a an and are as at be by for from in into is it of on or over the their this to toward towards under using
+via vs with without based new study approach case towards
+au aux avec ce ces dans de des du en et la le les leur par pour sur un une vers
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text into index terms: lowercase, accents removed, stopwords dropped, words singularized.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        List[str]: The terms, in order.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [lemmatize_word(token) for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS and len(token) > 1]
+
+
+class BM25Index:
+    """
+    In-process inverted index of the experts' keywords and publication titles, ranked with Okapi BM25.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @classmethod
+    def build(cls, expert_ids: Optional[Iterable] = None) -> "BM25Index":
+        """
+        Index the experts of the database.
+
+        Args:
+            expert_ids (Iterable, optional): Restrict the index to these experts. Defaults to all experts.
+
+        Returns:
+            BM25Index: The index.
+        """
+        index = cls()
+        index.upsert(collect_expert_texts(expert_ids))
+        return index
+
+    def upsert(self, texts: Dict[str, List[str]]) -> None:
+        """
+        Add or replace experts.
+
+        Args:
+            texts (Dict[str, List[str]]): The keywords and titles of each expert, keyed by expert id.
+        """
+        with self._lock:
+            self.remove(texts)
+            for expert_id, expert_texts in texts.items():
+                terms = Counter(term for text in expert_texts for term in tokenize(text))
+                if not terms:
+                    continue
+                self._terms[expert_id] = terms
+                self._lengths[expert_id] = sum(terms.values())
+                self._total_length += self._lengths[expert_id]
+                for term, frequency in terms.items():
+                    self._postings[term][expert_id] = frequency
+
+    def remove(self, expert_ids: Iterable[str]) -> None:
+        """
+        Remove experts; unknown ids are ignored.
+
+        Args:
+            expert_ids (Iterable[str]): The ids of the experts to remove.
+        """
+        with self._lock:
+            for expert_id in list(expert_ids):
+                terms = self._terms.pop(expert_id, None)
+                if terms is None:
+                    continue
+                self._total_length -= self._lengths.pop(expert_id)
+                for term in terms:
+                    postings = self._postings[term]
+                    postings.pop(expert_id, None)
+                    if not postings:
+                        del self._postings[term]
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """
+        Score every expert sharing at least one term with a query.
+
+        Args:
+            query (str): The query text.
+
+        Returns:
+            Dict[str, float]: The BM25 score of each matching expert, keyed by expert id.
+        """
+        with self._lock:
+            count = len(self._terms)
+            if not count:
+                return {}
+            average_length = self._total_length / count
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for expert_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[expert_id] / average_length)
+                    scores[expert_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return dict(scores)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the experts best matching a query, such as a thesis title.
+
+        Args:
+            query (str): The query text.
+            k (int, optional): The number of experts to return. Defaults to 10.
+
+        Returns:
+            List[Tuple[str, float]]: (expert id, BM25 score) pairs, best match first.
+        """
+        return heapq.nlargest(k, self.scores(query).items(), key=lambda item: item[1])
+
+
+_lexical_index: Optional[BM25Index] = None
+_lexical_version = None
+_lexical_lock = threading.Lock()
+
+
+def get_lexical_index() -> BM25Index:
+    """
+    Return the process-wide BM25 index, built from the database on first use.
+    It follows the changes applied by this process (see `update_lexical_index`), and is rebuilt
+    when another process (e.g. `import_experts`) has written a newer expert index file.
+
+    Returns:
+        BM25Index: The shared index.
+    """
+    global _lexical_index, _lexical_version
+    version = _index_file_mtime(str(settings.EXPERT_INDEX_PATH))
+    if _lexical_index is None or version != _lexical_version:
+        with _lexical_lock:
+            version = _index_file_mtime(str(settings.EXPERT_INDEX_PATH))
+            if _lexical_index is None or version != _lexical_version:
+                _lexical_index = BM25Index.build()
+                _lexical_version = version
+    return _lexical_index
+
+
+def update_lexical_index(texts: Dict[str, List[str]], removed: Iterable[str],
+                         versions: Tuple[Optional[float], Optional[float]] = (None, None)) -> None:
+    """
+    Listener of the expert index updater: apply the same changes to the BM25 index, if it is loaded.
+    If another process wrote the expert index file since the BM25 index was built, the changes of
+    that process are missing too: the index is dropped and rebuilt from the database on next use.
+
+    Args:
+        texts (Dict[str, List[str]]): The new texts of the changed experts.
+        removed (Iterable[str]): The ids of the experts that no longer exist or have no text.
+        versions (Tuple[Optional[float], Optional[float]]): The versions of the expert index file before
+            and after this update (see `save_expert_index`).
+    """
+    global _lexical_index, _lexical_version
+    previous, current = versions
+    with _lexical_lock:
+        if _lexical_index is None:
+            return
+        if _lexical_version != previous:
+            _lexical_index = None
+            return
+        _lexical_index.upsert(texts)
+        _lexical_index.remove(removed)
+        _lexical_version = current
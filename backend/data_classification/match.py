@@ -1,38 +1,52 @@
-import os
 import json
-from dotenv import load_dotenv
-from django.core.wsgi import get_wsgi_application
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
-application = get_wsgi_application()
-from database.models import Expert
-import google.generativeai as genai
+from typing import Optional
+from backend.registry import registry
+from data_classification.ranking import MatchConstraints, rank_experts
 
-load_dotenv()
-api_key = os.getenv("API_KEY")
-if not api_key:
-    raise ValueError("API key must be set in the environment variable API_KEY.")
+# Configured on first use
+genai = registry.lazy("gemini")
 
-genai.configure(api_key=api_key)
+def propose_experts(thesis_title: str, num_experts: int = 3, constraints: Optional[MatchConstraints] = None) -> list[dict]:
+    """
+    Propose experts for a thesis by fusing the lexical and embedding rankings, without calling the AI model.
+
+    Args:
+        thesis_title (str): The title of the thesis for which experts are being proposed.
+        num_experts (int): The number of experts to propose (default is 3).
+        constraints (MatchConstraints, optional): The rules the experts must satisfy (default: grade MCA or PR).
 
-def propose_experts_using_ai(thesis_title: str, num_experts: int = 3) -> list[dict]:
+    Returns:
+        list[dict]: A list of dictionaries, each containing 'id', 'name', 'keywords', the fused 'score' and the
+            per-component 'vector_score', 'vector_rank', 'lexical_score' and 'lexical_rank' of an expert,
+            best match first.
     """
-    Use the generative AI model to propose experts based on their keywords (mot_cles).
-    
+    return rank_experts(thesis_title, k=num_experts, constraints=constraints)
+
+
+def propose_experts_using_ai(thesis_title: str, num_experts: int = 3, num_candidates: int = 20,
+                             constraints: Optional[MatchConstraints] = None) -> list[dict]:
+    """
+    Use the generative AI model to re-rank the best experts found by the hybrid ranking.
+    Only the short candidate list is sent to the model, so the prompt size does not grow with the expert base.
+
     Args:
         thesis_title (str): The title of the thesis for which experts are being proposed.
         num_experts (int): The number of experts to propose (default is 3).
+        num_candidates (int): The number of index candidates the model chooses from (default is 20).
+        constraints (MatchConstraints, optional): The rules the candidates must satisfy (default: grade MCA or PR).
 
     Returns:
         list[dict]: A list of dictionaries, each containing 'name', 'keywords', and 'explanation' of an expert.
     """
-    # Fetch all experts with their keywords
-    experts = Expert.objects.all()
+    candidates = propose_experts(thesis_title, num_experts=max(num_candidates, num_experts), constraints=constraints)
+    if not candidates:
+        return []
 
     # Prepare prompt asking for the response as a list of dictionaries
-    expert_entries = []
-    for expert in experts:
-        keywords = ', '.join([keyword.mot_cle for keyword in expert.mots_cles.all()])
-        expert_entries.append(f"Expert: {expert.nom} {expert.prenom}, Keywords: {keywords}")
+    expert_entries = [
+        f"Expert: {candidate['name']}, Keywords: {', '.join(candidate['keywords'])}"
+        for candidate in candidates
+    ]
 
     prompt = (
         f"Given the thesis title: '{thesis_title}', propose {num_experts} experts from the list below. "
@@ -0,0 +1,202 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+import numpy as np
+from database.models import Doctorant, Expert
+from data_cleaning.clean import encode_sentences
+from .conflicts import get_conflict_graph
+from .index import ExpertIndex, get_expert_index
+from .lexical import BM25Index, get_lexical_index
+
+# Reciprocal rank fusion constant: a retriever's result at rank r contributes 1 / (RRF_K + r)
+RRF_K = 60
+
+# Number of eligible experts each retriever ranks before fusion
+RANKING_DEPTH = 100
+
+
+@dataclass(frozen=True)
+class MatchConstraints:
+    """
+    Business rules an expert must satisfy to be proposed.
+
+    Attributes:
+        grades (Tuple[str, ...], optional): The accepted grades, None to accept any grade.
+        exclude (FrozenSet[str]): The ids of experts that cannot be proposed.
+        max_expertises (int, optional): The highest accepted `nombre_expertises`, None for no cap.
+        doctorant (Doctorant, optional): The doctorant whose thesis is reviewed: the experts in conflict
+            of interest with it (see `conflicts.py`) cannot be proposed.
+    """
+    grades: Optional[Tuple[str, ...]] = ("MCA", "PR")
+    exclude: FrozenSet[str] = frozenset()
+    max_expertises: Optional[int] = None
+    doctorant: Optional[Doctorant] = None
+
+    @classmethod
+    def for_doctorant(cls, doctorant, exclude: Iterable = (), **kwargs) -> "MatchConstraints":
+        """
+        Build the constraints of a doctorant's thesis: its supervisors and the experts in conflict
+        of interest with them are excluded.
+
+        Args:
+            doctorant (Doctorant): The doctorant.
+            exclude (Iterable, optional): Other experts to exclude.
+            **kwargs: The other constraints.
+
+        Returns:
+            MatchConstraints: The constraints.
+        """
+        return cls(exclude=frozenset(str(expert_id) for expert_id in exclude), doctorant=doctorant, **kwargs)
+
+
+def reciprocal_ranks(scores: np.ndarray, retrieved: np.ndarray, depth: int, rrf_k: int = RRF_K) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank the retrieved experts by score and compute their reciprocal rank fusion contribution.
+
+    Args:
+        scores (np.ndarray): The score of every expert.
+        retrieved (np.ndarray): A boolean mask of the experts the retriever may return.
+        depth (int): The number of experts ranked; the others get no contribution.
+        rrf_k (int, optional): The fusion constant. Defaults to RRF_K.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The 1-based rank of every expert (0 when not ranked) and its contribution.
+    """
+    ranks = np.zeros(len(scores), dtype=np.int64)
+    candidates = np.flatnonzero(retrieved)
+    if len(candidates) and depth > 0:
+        depth = min(depth, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], depth - 1)[:depth]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        ranks[top] = np.arange(1, len(top) + 1)
+    contributions = np.where(ranks > 0, 1.0 / (rrf_k + ranks), 0.0)
+    return ranks, contributions
+
+
+def top_mask(scores: np.ndarray, allowed: np.ndarray, depth: int) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: A boolean mask of the `depth` best allowed experts by score.
+    """
+    mask = np.zeros(len(scores), dtype=bool)
+    candidates = np.flatnonzero(allowed)
+    if len(candidates) and depth > 0:
+        depth = min(depth, len(candidates))
+        mask[candidates[np.argpartition(-scores[candidates], depth - 1)[:depth]]] = True
+    return mask
+
+
+def check_database_constraints(ids: List[str], eligible: np.ndarray, constraints: MatchConstraints, depth: int,
+                               retrievers: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+    """
+    Apply the constraints stored in the database (existence, grade, current load) to the experts
+    that could be among the `depth` best of a retriever, reading only these experts.
+
+    The best experts not checked yet are read in one query; those rejected leave room for the
+    next ones, read in the following round, with a window doubling each round.
+
+    Args:
+        ids (List[str]): The expert ids.
+        eligible (np.ndarray): The eligibility mask, aligned with ids, updated in place.
+        constraints (MatchConstraints): The rules experts must satisfy.
+        depth (int): The number of experts each retriever ranks.
+        retrievers (List[Tuple[np.ndarray, np.ndarray]]): The scores of each retriever and the mask
+            of the experts it retrieved.
+    """
+    checked = np.zeros(len(ids), dtype=bool)
+    window = depth
+    while True:
+        best = np.zeros(len(ids), dtype=bool)
+        for scores, retrieved in retrievers:
+            best |= top_mask(scores, eligible & retrieved, depth)
+        if not (best & ~checked).any():
+            return
+        pending = np.zeros(len(ids), dtype=bool)
+        for scores, retrieved in retrievers:
+            pending |= top_mask(scores, eligible & retrieved & ~checked, window)
+        positions = np.flatnonzero(pending)
+        rows = {
+            str(expert_id): (grade, load)
+            for expert_id, grade, load in Expert.objects.filter(pk__in=[ids[i] for i in positions])
+            .values_list("id", "grade", "nombre_expertises")
+        }
+        for i in positions:
+            row = rows.get(ids[i])
+            eligible[i] = row is not None \
+                and (constraints.grades is None or row[0] in constraints.grades) \
+                and (constraints.max_expertises is None or row[1] <= constraints.max_expertises)
+        checked |= pending
+        window *= 2
+
+
+def rank_experts(query: str, k: int = 10, constraints: Optional[MatchConstraints] = None, depth: int = RANKING_DEPTH,
+                 expert_index: Optional[ExpertIndex] = None, lexical_index: Optional[BM25Index] = None) -> List[dict]:
+    """
+    Rank experts for a query, such as a thesis title, by fusing the BM25 and the embedding rankings.
+    The business constraints are applied as a mask before ranking, so every returned expert is eligible;
+    the database is only read for the experts the retrievers could rank (see `check_database_constraints`).
+
+    Args:
+        query (str): The query text.
+        k (int, optional): The number of experts to return. Defaults to 10.
+        constraints (MatchConstraints, optional): The rules experts must satisfy. Defaults to MatchConstraints().
+        depth (int, optional): The number of experts each retriever ranks. Defaults to RANKING_DEPTH.
+        expert_index (ExpertIndex, optional): The vector index. Defaults to the shared index.
+        lexical_index (BM25Index, optional): The lexical index. Defaults to the shared index.
+
+    Returns:
+        List[dict]: Best match first, one dictionary per expert with 'id', 'name', 'keywords', 'score'
+            (the fused score) and the per-component 'vector_score', 'vector_rank', 'lexical_score'
+            and 'lexical_rank' (ranks are None when the retriever did not rank the expert).
+    """
+    constraints = constraints or MatchConstraints()
+    expert_index = expert_index if expert_index is not None else get_expert_index()
+    lexical_index = lexical_index if lexical_index is not None else get_lexical_index()
+
+    ids, vector_scores = expert_index.score_all(encode_sentences([query])[0]) if len(expert_index) else ([], np.zeros(0))
+    lexical = lexical_index.scores(query)
+    known = set(ids)
+    ids = ids + [expert_id for expert_id in lexical if expert_id not in known]
+    if not ids:
+        return []
+    has_vector = np.arange(len(ids)) < len(vector_scores)
+    vector_scores = np.concatenate([vector_scores, np.full(len(ids) - len(vector_scores), -np.inf)])
+    lexical_scores = np.array([lexical.get(expert_id, 0.0) for expert_id in ids])
+
+    eligible = np.ones(len(ids), dtype=bool)
+    if constraints.exclude:
+        eligible &= ~np.isin(np.array(ids, dtype=object), list(constraints.exclude))
+    if constraints.doctorant is not None:
+        eligible &= ~get_conflict_graph().mask([constraints.doctorant], ids)[0]
+    check_database_constraints(ids, eligible, constraints, depth, [
+        (vector_scores, has_vector), (lexical_scores, lexical_scores > 0),
+    ])
+
+    vector_ranks, vector_rrf = reciprocal_ranks(vector_scores, eligible & has_vector, depth)
+    lexical_ranks, lexical_rrf = reciprocal_ranks(lexical_scores, eligible & (lexical_scores > 0), depth)
+    fused = vector_rrf + lexical_rrf
+
+    candidates = np.flatnonzero(fused > 0)
+    if not len(candidates):
+        return []
+    # Best fused score first, ties broken by embedding similarity
+    order = np.lexsort((-vector_scores[candidates], -fused[candidates]))
+    top = candidates[order[:k]]
+
+    experts = Expert.objects.prefetch_related("mots_cles").in_bulk([ids[i] for i in top])
+    experts = {str(pk): expert for pk, expert in experts.items()}
+    results = []
+    for i in top:
+        expert = experts.get(ids[i])
+        if expert is None:
+            continue
+        results.append({
+            "id": ids[i],
+            "name": f"{expert.nom} {expert.prenom}",
+            "keywords": [keyword.mot_cle for keyword in expert.mots_cles.all()],
+            "score": float(fused[i]),
+            "vector_score": float(vector_scores[i]) if has_vector[i] else None,
+            "vector_rank": int(vector_ranks[i]) or None,
+            "lexical_score": float(lexical_scores[i]),
+            "lexical_rank": int(lexical_ranks[i]) or None,
+        })
+    return results
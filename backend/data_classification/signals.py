@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from database.models import Expert, MotCle, Publication
+from data_classification.conflicts import mark_conflicts_dirty
+from data_classification.index import index_updater
+
+
+def schedule_update(expert_ids) -> None:
+    """
+    Queue experts for re-encoding once the current transaction commits.
+
+    Args:
+        expert_ids (Iterable): The ids of the experts that changed.
+    """
+    expert_ids = [expert_id for expert_id in expert_ids if expert_id is not None]
+    if expert_ids:
+        transaction.on_commit(lambda: index_updater.mark_dirty(expert_ids))
+
+
+@receiver(post_save, sender=Expert)
+def expert_saved(sender, instance, created, **kwargs):
+    # Only keywords and publications feed the embedding, so plain field edits are ignored
+    if created:
+        schedule_update([instance.pk])
+
+
+@receiver(post_init, sender=Expert)
+def expert_loaded(sender, instance, **kwargs):
+    # Remember the establishment read (unless deferred) to notice when a save changes it
+    instance._conflict_etablissement_id = instance.__dict__.get("etablissement_id")
+
+
+@receiver(post_save, sender=Expert)
+def expert_establishment_changed(sender, instance, created, **kwargs):
+    # The establishment feeds the conflict graph; new experts are added to it on first use
+    previous = instance._conflict_etablissement_id
+    current = instance.__dict__.get("etablissement_id", previous)
+    if not created and current != previous:
+        transaction.on_commit(lambda: mark_conflicts_dirty([instance.pk]))
+    instance._conflict_etablissement_id = current
+
+
+@receiver(post_delete, sender=Expert)
+def expert_deleted(sender, instance, **kwargs):
+    schedule_update([instance.pk])
+
+
+@receiver(post_save, sender=Publication)
+@receiver(post_delete, sender=Publication)
+def publication_changed(sender, instance, **kwargs):
+    schedule_update([instance.expert_id])
+
+
+@receiver(post_save, sender=MotCle)
+def mot_cle_saved(sender, instance, created, **kwargs):
+    if not created:
+        schedule_update(instance.experts_mots_cles.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=MotCle)
+def mot_cle_deleting(sender, instance, **kwargs):
+    # The M2M rows are gone by post_delete, so remember the experts beforehand
+    instance._index_expert_ids = list(instance.experts_mots_cles.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=MotCle)
+def mot_cle_deleted(sender, instance, **kwargs):
+    schedule_update(getattr(instance, "_index_expert_ids", []))
+
+
+@receiver(m2m_changed, sender=Expert.mots_cles.through)
+def mots_cles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            schedule_update([instance.pk])
+    elif action == "pre_clear":
+        instance._index_expert_ids = list(instance.experts_mots_cles.values_list("id", flat=True))
+    elif action == "post_clear":
+        schedule_update(getattr(instance, "_index_expert_ids", []))
+    elif action in ("post_add", "post_remove"):
+        schedule_update(pk_set or [])
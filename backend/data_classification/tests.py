@@ -1,6 +1,30 @@
-from django.test import TestCase
-from .classify import clean_area, classify_article, classify_articles
+import asyncio
+import tempfile
+from io import StringIO
+import threading
+import time
+import numpy as np
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from database.models import Doctorant, Etablissement, Expert, Expertise, MotCle, Publication
+from .index import ExpertIndex, ExpertIndexUpdater
+from .lexical import BM25Index, tokenize
+from .ranking import MatchConstraints, rank_experts, reciprocal_ranks
+from .assign import assign_experts, save_assignment, solve_rounds
+from .conflicts import ConflictGraph, get_conflict_graph, mark_conflicts_dirty, title_key, touch_establishment_version
+from data_cleaning.cache import TextMemo
+from .classify import (
+    clean_area, classify_article, classify_articles, chunk_titles, parse_numbered_areas,
+    ClassificationService, EmbeddingBackend, RateLimiter, StubBackend,
+)
+from .fetch import FetchOrchestrator, SourceResult, iter_researcher_data, process_researcher_data
+from data_collection.cache import set_offline
 
+@override_settings(CLASSIFICATION_MEMO_PATH=None)
 class ClassifierTests(TestCase):
     
     def setUp(self):
@@ -41,3 +65,568 @@ class ClassifierTests(TestCase):
         """Test classify_articles with an empty list."""
         result = classify_articles([])
         self.assertEqual(result, [])  # Should return an empty list
+
+
+class ClassificationServiceTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.memo = TextMemo(f'{self.directory.name}/classifications.sqlite3', 'stub')
+        self.backend = StubBackend({'Graph neural networks': ['graph theory', 'machine learning']}, default=['computer science'])
+
+    def make_service(self, **kwargs):
+        return ClassificationService(self.backend, self.memo, **kwargs)
+
+    def test_parse_numbered_areas(self):
+        answer = "1. **machine learning, computer vision (cv)**\n2. **databases**\n"
+        self.assertEqual(parse_numbered_areas(answer), {1: ['machine learning', 'computer vision'], 2: ['databases']})
+
+    def test_chunks_are_bounded(self):
+        chunks = chunk_titles(['a' * 40] * 10, max_tokens=35, max_titles=4)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 3, 1])
+        self.assertEqual(chunk_titles(['a' * 400, 'b'], max_tokens=10, max_titles=4), [['a' * 400], ['b']])
+
+    def test_titles_are_classified_once(self):
+        service = self.make_service(max_titles=2, concurrency=2)
+        titles = ['Graph neural networks', 'Query optimization', 'Data lakes', 'graph  neural networks']
+        self.assertEqual(service.classify_titles(titles), [
+            ['graph theory', 'machine learning'], ['computer science'], ['computer science'],
+            ['graph theory', 'machine learning'],
+        ])
+        self.assertEqual(sum(len(call) for call in self.backend.calls), 3)
+        # The first spelling of each title is sent, not its normalized key
+        self.assertIn('Graph neural networks', [title for call in self.backend.calls for title in call])
+
+        self.backend.calls.clear()
+        self.make_service().classify_titles(['GRAPH NEURAL NETWORKS', 'Stream processing'])
+        self.assertEqual(self.backend.calls, [['Stream processing']])
+
+    def test_failed_chunks_are_not_remembered(self):
+        service = self.make_service()
+        with patch.object(self.backend, 'classify_chunk', side_effect=RuntimeError('quota exceeded')):
+            self.assertEqual(service.classify_titles(['Query optimization']), [[]])
+        self.assertEqual(service.classify_titles(['Query optimization']), [['computer science']])
+
+    def test_remote_backends_are_not_called_offline(self):
+        self.make_service().classify_titles(['Graph neural networks'])
+        self.backend.calls.clear()
+        self.backend.remote = True
+        set_offline(True)
+        self.addCleanup(set_offline, None)
+        self.assertEqual(self.make_service().classify_titles(['Graph neural networks', 'Query optimization']),
+                         [['graph theory', 'machine learning'], []])
+        self.assertEqual(self.backend.calls, [])
+
+    def test_rate_limiter_spaces_calls(self):
+        limiter = RateLimiter(rate=20, period=1.0)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_classify_articles_uses_the_service(self):
+        with patch('data_classification.classify.get_classification_service', return_value=self.make_service()):
+            self.assertEqual(
+                classify_articles(['Graph neural networks', 'Query optimization']),
+                ['graph theory', 'machine learning', 'computer science'],
+            )
+
+
+class EmbeddingBackendTests(TestCase):
+
+    def setUp(self):
+        self.backend = EmbeddingBackend(['machine learning', 'relational databases', 'computer networks'], top_k=2, threshold=0.2)
+
+    def test_titles_map_to_nearest_terms(self):
+        areas = self.backend.classify_chunk([
+            'Machine learning models for medical diagnosis',
+            'Query optimization in relational databases',
+        ])
+        self.assertEqual(areas[0][0], 'machine learning')
+        self.assertEqual(areas[1][0], 'relational databases')
+        self.assertLessEqual(max(len(items) for items in areas.values()), 2)
+
+    def test_terms_below_threshold_are_left_out(self):
+        backend = EmbeddingBackend(['computer networks'], top_k=1, threshold=0.99)
+        self.assertEqual(backend.classify_chunk(['Medieval poetry of the Maghreb']), {0: []})
+
+    def test_service_sends_all_titles_at_once_without_rate_limit(self):
+        limiter = RateLimiter(rate=1, period=3600)
+        service = ClassificationService(self.backend, max_titles=1, rate_limiter=limiter)
+        with patch.object(self.backend, 'classify_chunk', wraps=self.backend.classify_chunk) as classify_chunk:
+            start = time.monotonic()
+            service.classify_titles(['Machine learning for networks', 'Databases at scale', 'Routing in networks'])
+        classify_chunk.assert_called_once()
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_namespace_depends_on_vocabulary(self):
+        self.assertNotEqual(self.backend.namespace, EmbeddingBackend(['machine learning'], top_k=2, threshold=0.2).namespace)
+
+
+class ExpertIndexTests(TestCase):
+
+    def setUp(self):
+        """Build a small index from hand-made embeddings."""
+        self.index = ExpertIndex(
+            ["a", "b", "c"],
+            np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.7, 0.7, 0.0]]),
+        )
+
+    def test_search_vector_orders_by_similarity(self):
+        """Test that search_vector returns the closest experts first."""
+        result = self.index.search_vector(np.array([1.0, 0.1, 0.0]), k=2)
+        self.assertEqual([expert_id for expert_id, _ in result], ["a", "c"])
+
+    def test_upsert_replaces_and_appends(self):
+        """Test that upsert updates existing experts and adds new ones."""
+        self.index.upsert({"a": np.array([0.0, 0.0, 1.0]), "d": np.array([1.0, 0.0, 0.0])})
+        self.assertEqual(len(self.index), 4)
+        result = self.index.search_vector(np.array([0.0, 0.0, 1.0]), k=1)
+        self.assertEqual(result[0][0], "a")
+
+    def test_remove(self):
+        """Test that removed experts are no longer returned."""
+        self.index.remove(["a"])
+        result = self.index.search_vector(np.array([1.0, 0.0, 0.0]), k=3)
+        self.assertNotIn("a", [expert_id for expert_id, _ in result])
+        self.assertEqual(len(result), 2)
+
+    def test_empty_index(self):
+        """Test that an empty index returns no results."""
+        self.assertEqual(ExpertIndex().search_vector(np.array([1.0, 0.0]), k=3), [])
+
+
+class ExpertIndexUpdaterTests(TestCase):
+
+    def setUp(self):
+        """Create an expert with one keyword and one publication."""
+        self.expert = Expert.objects.create(nom="Doe", prenom="John", grade="PR")
+        self.mot_cle = MotCle.objects.create(mot_cle="machine learning", source="Autre")
+
+    @patch("data_classification.signals.index_updater")
+    def test_signals_mark_changed_expert(self, mock_updater):
+        """Test that keyword and publication changes schedule only the affected expert."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.expert.mots_cles.add(self.mot_cle)
+        with self.captureOnCommitCallbacks(execute=True):
+            Publication.objects.create(titre="Deep nets", expert=self.expert, source="DBLP")
+        for call in mock_updater.mark_dirty.call_args_list:
+            self.assertEqual(list(call.args[0]), [self.expert.pk])
+        self.assertEqual(mock_updater.mark_dirty.call_count, 2)
+
+    @patch("data_classification.signals.index_updater")
+    def test_reverse_clear_marks_linked_experts(self, mock_updater):
+        """Test that clearing a keyword's experts schedules those experts."""
+        self.expert.mots_cles.add(self.mot_cle)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mot_cle.experts_mots_cles.clear()
+        mock_updater.mark_dirty.assert_called_once_with([self.expert.pk])
+
+    @patch("data_classification.index.save_expert_index")
+    @patch("data_classification.index.get_expert_index")
+    @patch("data_classification.index.encode_sentences")
+    def test_flush_reencodes_dirty_experts_in_one_batch(self, mock_encode, mock_get_index, mock_save):
+        """Test that flush upserts experts with text and removes the others."""
+        mock_encode.side_effect = lambda sentences: np.ones((len(sentences), 3))
+        gone = "00000000-0000-0000-0000-000000000000"
+        index = ExpertIndex([gone], np.array([[1.0, 0.0, 0.0]]))
+        mock_get_index.return_value = index
+        self.expert.mots_cles.add(self.mot_cle)
+
+        updater = ExpertIndexUpdater(delay=60)
+        updater.mark_dirty([self.expert.pk, gone])
+        updater.flush()
+
+        mock_encode.assert_called_once_with(["machine learning"])
+        self.assertEqual(index.expert_ids, [str(self.expert.pk)])
+        mock_save.assert_called_once_with(index)
+
+
+class FetchOrchestratorTests(TestCase):
+
+    def setUp(self):
+        self.orchestrator = FetchOrchestrator(
+            concurrency={'dblp': 2, 'scholar': 1, 'researchgate': 1},
+            timeouts={'dblp': 5, 'scholar': 5, 'researchgate': 0.2},
+        )
+        self.addCleanup(self.orchestrator.close)
+
+    @staticmethod
+    def fake_collect(delays):
+        def collect(source, first_name, last_name):
+            time.sleep(delays[source])
+            return SourceResult(source, [f'{source} article'], [f'{source} interest'])
+        return collect
+
+    def test_slow_source_times_out_and_others_stream_first(self):
+        delays = {'dblp': 0.0, 'scholar': 0.05, 'researchgate': 1.0}
+
+        async def stream():
+            return [result async for result in self.orchestrator.stream_sources('John', 'Doe')]
+
+        with patch('data_classification.fetch.collect_source', self.fake_collect(delays)):
+            results = asyncio.run(stream())
+
+        self.assertEqual([result.source for result in results], ['dblp', 'scholar', 'researchgate'])
+        self.assertEqual(results[2], SourceResult('researchgate', [], [], 'timeout'))
+
+    def test_failing_source_gives_partial_results(self):
+        def collect(source, first_name, last_name):
+            if source == 'scholar':
+                raise RuntimeError('blocked')
+            return SourceResult(source, [f'{source} article'], [])
+
+        with patch('data_classification.fetch.collect_source', collect):
+            results = asyncio.run(self.orchestrator.collect('John', 'Doe'))
+
+        self.assertEqual(results['scholar'].error, 'blocked')
+        self.assertEqual(results['dblp'].articles, ['dblp article'])
+
+    def test_fetch_many_respects_source_limits(self):
+        running = {'dblp': 0, 'scholar': 0, 'researchgate': 0}
+        peak = dict(running)
+        lock = threading.Lock()
+
+        def collect(source, first_name, last_name):
+            with lock:
+                running[source] += 1
+                peak[source] = max(peak[source], running[source])
+            time.sleep(0.02)
+            with lock:
+                running[source] -= 1
+            return SourceResult(source, [], [])
+
+        researchers = [(i, 'First', f'Last{i}') for i in range(6)]
+        with patch('data_classification.fetch.collect_source', collect), \
+                patch('data_classification.fetch.process_researcher_data', return_value=([], [])), \
+                patch('data_classification.fetch.get_orchestrator', return_value=self.orchestrator):
+            results = dict(iter_researcher_data(researchers, max_researchers=4))
+
+        self.assertEqual(sorted(results), list(range(6)))
+        self.assertEqual(peak, {'dblp': 2, 'scholar': 1, 'researchgate': 1})
+
+    def test_limits_hold_across_event_loops(self):
+        running = {'dblp': 0, 'scholar': 0, 'researchgate': 0}
+        peak = dict(running)
+        lock = threading.Lock()
+
+        def collect(source, first_name, last_name):
+            with lock:
+                running[source] += 1
+                peak[source] = max(peak[source], running[source])
+            time.sleep(0.02)
+            with lock:
+                running[source] -= 1
+            return SourceResult(source, [], [])
+
+        def caller():
+            # Like fetch_researcher_data, each call runs its own event loop
+            for _ in range(3):
+                asyncio.run(self.orchestrator.collect('John', 'Doe'))
+
+        with patch('data_classification.fetch.collect_source', collect):
+            threads = [threading.Thread(target=caller) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(peak, {'dblp': 2, 'scholar': 1, 'researchgate': 1})
+
+
+class ProcessResearcherDataTests(TestCase):
+
+    @patch('data_classification.fetch.classify_articles', return_value=['computer vision'])
+    @patch('data_cleaning.provenance.translate_batch')
+    def test_translated_titles_keep_their_sources(self, mock_translate, mock_classify):
+        translations = {
+            'apprentissage profond pour la vision par ordinateur': 'deep learning for computer vision',
+            'deep learning for computer vision': 'deep learning for computer vision',
+        }
+        mock_translate.side_effect = lambda texts, batch_size=None: [translations[text] for text in texts]
+
+        articles, interests = process_researcher_data({
+            'dblp': SourceResult('dblp', ['deep learning for computer vision'], []),
+            'researchgate': SourceResult('researchgate', ['apprentissage profond pour la vision par ordinateur'], ['computer vision']),
+        })
+
+        self.assertEqual(articles, [('Deep learning for computer vision', 'ResearchGate', ['DBLP', 'ResearchGate'])])
+        self.assertEqual(interests, [('Computer Vision', 'ResearchGate', ['ResearchGate', 'Classified'])])
+
+
+class BM25IndexTests(TestCase):
+
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.upsert({
+            'a': ['Machine Learning', 'Deep neural networks for image classification'],
+            'b': ['Databases', 'Query optimization in distributed databases'],
+            'c': ['Computer Networks', 'Routing in wireless sensor networks', 'Neural network based routing'],
+        })
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('Réseaux de capteurs for the Networks'), ['reseaux', 'capteur', 'network'])
+
+    def test_search_ranks_by_relevance(self):
+        self.assertEqual([expert_id for expert_id, _ in self.index.search('distributed database queries')], ['b'])
+        ranking = [expert_id for expert_id, _ in self.index.search('neural networks for image recognition')]
+        self.assertEqual(ranking, ['a', 'c'])
+        self.assertEqual(self.index.search('quantum chemistry'), [])
+
+    def test_upsert_and_remove(self):
+        self.index.upsert({'b': ['Quantum computing']})
+        self.assertEqual(self.index.search('databases'), [])
+        self.assertEqual(self.index.search('quantum')[0][0], 'b')
+        self.index.remove(['b', 'unknown'])
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.search('quantum'), [])
+
+    @patch("data_classification.index.save_expert_index")
+    @patch("data_classification.index.get_expert_index")
+    @patch("data_classification.index.encode_sentences")
+    def test_updater_notifies_listeners(self, mock_encode, mock_get_index, mock_save):
+        mock_encode.side_effect = lambda sentences: np.ones((len(sentences), 3))
+        mock_get_index.return_value = ExpertIndex([], np.zeros((0, 3)))
+        expert = Expert.objects.create(nom="Doe", prenom="John", grade="PR")
+        Publication.objects.create(titre="Graph mining at scale", expert=expert, source="DBLP")
+
+        updater = ExpertIndexUpdater(delay=60)
+        updater.add_listener(lambda texts, removed, versions: self.index.upsert(texts))
+        updater.mark_dirty([expert.pk])
+        updater.flush()
+
+        self.assertEqual(self.index.search('graph mining')[0][0], str(expert.pk))
+
+    def test_foreign_index_write_drops_the_lexical_index(self):
+        from . import lexical
+        with patch.object(lexical, '_lexical_index', self.index), patch.object(lexical, '_lexical_version', 1.0):
+            lexical.update_lexical_index({'d': ['Quantum computing']}, set(), (1.0, 2.0))
+            self.assertIs(lexical._lexical_index, self.index)
+            self.assertEqual(lexical._lexical_version, 2.0)
+            # Another process replaced the file (version 3.0) before this save: its changes are missing
+            lexical.update_lexical_index({'e': ['Compilers']}, set(), (3.0, 4.0))
+            self.assertIsNone(lexical._lexical_index)
+
+
+class HybridRankingTests(TestCase):
+
+    def setUp(self):
+        """Four experts: both retrievers agree on the first, the second only matches lexically."""
+        self.vision = Expert.objects.create(nom="Vision", prenom="A", grade="PR", nombre_expertises=1)
+        self.lexical = Expert.objects.create(nom="Lexical", prenom="B", grade="MCA", nombre_expertises=2)
+        self.busy = Expert.objects.create(nom="Busy", prenom="C", grade="PR", nombre_expertises=9)
+        self.ungraded = Expert.objects.create(nom="Ungraded", prenom="D", grade="", nombre_expertises=0)
+        self.vision.mots_cles.add(MotCle.objects.create(mot_cle="Computer Vision"))
+
+        ids = [str(self.vision.pk), str(self.busy.pk), str(self.ungraded.pk)]
+        self.expert_index = ExpertIndex(ids, np.array([[1.0, 0.0], [0.8, 0.6], [0.9, 0.1]]))
+        self.lexical_index = BM25Index()
+        self.lexical_index.upsert({
+            str(self.vision.pk): ['Computer vision for medical images'],
+            str(self.lexical.pk): ['Medical images compression'],
+            str(self.ungraded.pk): ['Computer vision'],
+        })
+
+    def rank(self, **kwargs):
+        with patch("data_classification.ranking.encode_sentences", return_value=np.array([[1.0, 0.0]])):
+            return rank_experts("computer vision for medical images", expert_index=self.expert_index,
+                                lexical_index=self.lexical_index, **kwargs)
+
+    def test_reciprocal_ranks(self):
+        ranks, contributions = reciprocal_ranks(np.array([0.2, 0.9, 0.5, 0.7]), np.array([True, True, True, False]), depth=2, rrf_k=10)
+        self.assertEqual(ranks.tolist(), [0, 1, 2, 0])
+        np.testing.assert_allclose(contributions, [0.0, 1 / 11, 1 / 12, 0.0])
+
+    def test_fuses_both_retrievers(self):
+        results = self.rank(k=5)
+        self.assertEqual([result["id"] for result in results], [str(self.vision.pk), str(self.busy.pk), str(self.lexical.pk)])
+        best = results[0]
+        self.assertEqual((best["vector_rank"], best["lexical_rank"]), (1, 1))
+        self.assertEqual(best["keywords"], ["Computer Vision"])
+        self.assertAlmostEqual(best["score"], 2 / 61)
+        # Lexical-only experts have no vector component
+        self.assertIsNone(results[2]["vector_score"])
+        self.assertIsNone(results[1]["lexical_rank"])
+
+    def test_constraints(self):
+        constraints = MatchConstraints(exclude=frozenset([str(self.vision.pk)]), max_expertises=5)
+        self.assertEqual([result["id"] for result in self.rank(k=5, constraints=constraints)], [str(self.lexical.pk)])
+        everyone = self.rank(k=5, constraints=MatchConstraints(grades=None))
+        self.assertIn(str(self.ungraded.pk), [result["id"] for result in everyone])
+
+    def test_for_doctorant_excludes_supervisors(self):
+        doctorant = Doctorant(nom="Doc", prenom="E", directeur_these=self.vision, co_directeur_these=None)
+        constraints = MatchConstraints.for_doctorant(doctorant, max_expertises=3)
+        self.assertIs(constraints.doctorant, doctorant)
+        self.assertEqual(constraints.max_expertises, 3)
+        self.assertNotIn(str(self.vision.pk), [result["id"] for result in self.rank(constraints=constraints)])
+
+    def test_reads_only_the_candidates(self):
+        """The best experts by similarity are ineligible: the next ones are read, not the whole base."""
+        experts = [
+            Expert.objects.create(nom=f"Expert {i}", prenom="X", grade="MAA" if i < 6 else "PR") for i in range(40)
+        ]
+        vectors = np.array([[1.0, i / 40] for i in range(40)])
+        expert_index = ExpertIndex([str(expert.pk) for expert in experts], vectors / np.linalg.norm(vectors, axis=1, keepdims=True))
+        with patch("data_classification.ranking.encode_sentences", return_value=np.array([[1.0, 0.0]])), \
+                CaptureQueriesContext(connection) as queries:
+            results = rank_experts("computer vision", k=3, depth=3, expert_index=expert_index, lexical_index=BM25Index())
+        self.assertEqual([result["id"] for result in results], [str(expert.pk) for expert in experts[6:9]])
+        # Two rounds of grade checks (3 then 6 experts), then the 3 results and their keywords
+        self.assertEqual(len(queries), 4)
+        read = [sum(expert.pk.hex in query["sql"] for expert in experts) for query in queries[:2]]
+        self.assertEqual(read, [3, 6])
+
+    def test_empty_indexes(self):
+        with patch("data_classification.ranking.encode_sentences") as mock_encode:
+            self.assertEqual(rank_experts("anything", expert_index=ExpertIndex(), lexical_index=BM25Index()), [])
+        mock_encode.assert_not_called()
+
+
+class AssignmentTests(TestCase):
+
+    def setUp(self):
+        """Three theses and four experts; expert a is the best match of every thesis."""
+        self.experts = [
+            Expert.objects.create(nom=name, prenom="X", grade="PR", nombre_expertises=load)
+            for name, load in (("A", 0), ("B", 0), ("C", 0), ("D", 4))
+        ]
+        ids = [str(expert.pk) for expert in self.experts]
+        self.expert_index = ExpertIndex(ids, np.array([[1.0, 0.0], [0.8, 0.6], [0.6, 0.8], [1.0, 0.05]]))
+        self.doctorants = [
+            Doctorant.objects.create(nom=f"Doc{i}", prenom="Y", type_doctorat="LMD", titre_these=f"Thesis {i}")
+            for i in range(3)
+        ]
+
+    def assign(self, doctorants=None, **kwargs):
+        vectors = np.array([[1.0, 0.0], [0.9, 0.4], [0.5, 0.9]])
+        with patch("data_classification.assign.encode_sentences", side_effect=lambda titles: vectors[:len(titles)]):
+            return assign_experts(doctorants or self.doctorants, expert_index=self.expert_index, **kwargs)
+
+    def test_command_rejects_invalid_and_unknown_ids(self):
+        with self.assertRaisesMessage(CommandError, "Unknown doctorant ids: not-an-id"):
+            call_command("assign_experts", str(self.doctorants[0].pk), "not-an-id", stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "Unknown doctorant ids: 00000000-0000-0000-0000-000000000000"):
+            call_command("assign_experts", "00000000-0000-0000-0000-000000000000", stdout=StringIO())
+
+    def test_solve_rounds_respects_capacity(self):
+        scores = np.array([[0.9, 0.8, 0.1], [0.9, 0.7, 0.2]])
+        allowed = np.ones_like(scores, dtype=bool)
+        chosen = solve_rounds(scores, allowed, np.array([1, 1, 2]), reviewers=2)
+        # Both theses get two distinct experts and a and b are used once each
+        self.assertEqual(sorted(chosen[:, 0].tolist()), [0, 1])
+        self.assertEqual(chosen[:, 1].tolist(), [2, 2])
+
+    def test_assigns_distinct_reviewers_under_capacity(self):
+        result = self.assign(capacity=2)
+        self.assertEqual(len(result.drafts), 3)
+        self.assertEqual(result.unassigned, [])
+        load = {}
+        for draft in result.drafts:
+            self.assertNotEqual(draft.expert_1_id, draft.expert_2_id)
+            for expert_id in (draft.expert_1_id, draft.expert_2_id):
+                load[expert_id] = load.get(expert_id, 0) + 1
+        self.assertLessEqual(max(load.values()), 2)
+        self.assertFalse(Expertise.objects.exists())
+        self.assertEqual(len(result.scores[0]), 2)
+
+    def test_excludes_supervisors_and_overloaded_experts(self):
+        doctorant = self.doctorants[0]
+        doctorant.directeur_these = self.experts[0]
+        doctorant.save()
+        result = self.assign([doctorant], max_expertises=3)
+        draft = result.drafts[0]
+        self.assertEqual({draft.expert_1_id, draft.expert_2_id}, {self.experts[1].pk, self.experts[2].pk})
+
+    def test_unassigned_when_capacity_runs_out(self):
+        result = self.assign(capacity=1, max_expertises=3)
+        # Three experts with one slot each can complete a single thesis with two reviewers
+        self.assertEqual(len(result.drafts), 1)
+        self.assertEqual(len(result.unassigned), 2)
+
+    def test_save_assignment_updates_load(self):
+        result = self.assign([self.doctorants[0]])
+        before = sum(Expert.objects.values_list("nombre_expertises", flat=True))
+        save_assignment(result.drafts)
+        self.assertEqual(Expertise.objects.count(), 1)
+        self.assertEqual(sum(Expert.objects.values_list("nombre_expertises", flat=True)), before + 2)
+
+    def test_invalid_reviewers(self):
+        with self.assertRaises(ValueError):
+            self.assign(reviewers=4)
+
+
+class ConflictGraphTests(TestCase):
+
+    TITLE = "Scalable graph mining on distributed clusters"
+
+    def setUp(self):
+        """A supervisor, a colleague of the same establishment, a co-author and two unrelated experts."""
+        first, self.second = Etablissement.objects.create(nom="USTHB"), Etablissement.objects.create(nom="ESI")
+        self.supervisor = Expert.objects.create(nom="Sup", prenom="A", grade="PR", etablissement=first)
+        self.colleague = Expert.objects.create(nom="Col", prenom="B", grade="PR", etablissement=first)
+        self.coauthor = Expert.objects.create(nom="Co", prenom="C", grade="PR", etablissement=self.second)
+        self.other = Expert.objects.create(nom="Other", prenom="D", grade="MCA", etablissement=self.second)
+        self.stranger = Expert.objects.create(nom="Stranger", prenom="E", grade="MCA")
+        Publication.objects.create(titre=self.TITLE, expert=self.supervisor, source="DBLP")
+        Publication.objects.create(titre=self.TITLE.upper() + " ", expert=self.coauthor, source="DBLP")
+        self.doctorant = Doctorant(nom="Doc", prenom="F", type_doctorat="LMD", directeur_these=self.supervisor)
+        self.experts = [self.supervisor, self.colleague, self.coauthor, self.other, self.stranger]
+        self.ids = [str(expert.pk) for expert in self.experts]
+        self.graph = ConflictGraph.build()
+
+    def test_title_key(self):
+        self.assertEqual(title_key("  Graph  Mining on Clusters "), "graph mining on clusters")
+        self.assertIsNone(title_key("Introduction"))
+
+    def test_mask(self):
+        self.assertEqual(self.graph.mask([self.doctorant], self.ids).tolist(), [[True, True, True, False, False]])
+        self.assertEqual(self.graph.mask([self.doctorant], self.ids, rules=["coauthor"]).tolist(),
+                         [[True, False, True, False, False]])
+        self.assertEqual(self.graph.mask([self.doctorant], self.ids, rules=[]).tolist(),
+                         [[True, False, False, False, False]])
+        self.doctorant.etablissement_exercice = self.second
+        self.assertEqual(self.graph.mask([self.doctorant], self.ids[3:]).tolist(), [[True, False]])
+
+    def test_adjacency(self):
+        indptr, indices = self.graph.adjacency()
+        position = self.graph.expert_ids.index(str(self.supervisor.pk))
+        coauthors = indices[indptr[position]:indptr[position + 1]]
+        self.assertEqual([self.graph.expert_ids[i] for i in coauthors], [str(self.coauthor.pk)])
+
+    def test_incremental_refresh(self):
+        Publication.objects.filter(expert=self.coauthor).delete()
+        Publication.objects.create(titre=self.TITLE, expert=self.stranger, source="DBLP")
+        self.graph.mark_dirty([self.coauthor.pk, self.stranger.pk])
+        self.assertEqual(self.graph.mask([self.doctorant], self.ids, rules=["coauthor"]).tolist(),
+                         [[True, False, False, False, True]])
+
+    def test_unknown_experts_are_loaded(self):
+        newcomer = Expert.objects.create(nom="New", prenom="G", grade="PR", etablissement=self.supervisor.etablissement)
+        self.assertTrue(self.graph.mask([self.doctorant], [str(newcomer.pk)])[0, 0])
+
+    def test_own_changes_are_refreshed_incrementally(self):
+        graph = get_conflict_graph()
+        self.other.etablissement = self.supervisor.etablissement
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.save()
+            self.stranger.save()
+        self.assertEqual(graph._dirty, {str(self.other.pk)})
+        self.assertIs(get_conflict_graph(), graph)
+        self.assertEqual(graph.mask([self.doctorant], self.ids[3:]).tolist(), [[True, False]])
+
+    def test_changes_of_other_processes_rebuild_the_shared_graph(self):
+        graph = get_conflict_graph()
+        # Another worker moves an expert, then this one moves another
+        Expert.objects.filter(pk=self.other.pk).update(etablissement=self.supervisor.etablissement)
+        touch_establishment_version()
+        mark_conflicts_dirty([self.stranger.pk])
+        self.assertIsNot(get_conflict_graph(), graph)
+        self.assertEqual(get_conflict_graph().mask([self.doctorant], self.ids[3:]).tolist(), [[True, False]])
+
+    def test_build_loads_every_expert(self):
+        Expert.objects.bulk_create([Expert(nom=f"E{i}", prenom="H", grade="MCB") for i in range(2000)])
+        graph = ConflictGraph.build()
+        self.assertEqual(len(graph), len(graph.establishments))
+        self.assertEqual(len(graph), Expert.objects.count())
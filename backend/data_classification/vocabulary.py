@@ -0,0 +1,140 @@
+"""
+Controlled vocabulary of research areas used by the offline (embedding) classifier.
+Terms are lowercase, like the areas returned by the other backends.
+"""
+
+RESEARCH_AREAS = [
+    # Artificial intelligence
+    "artificial intelligence",
+    "machine learning",
+    "deep learning",
+    "reinforcement learning",
+    "neural networks",
+    "natural language processing",
+    "computer vision",
+    "image processing",
+    "speech recognition",
+    "knowledge representation",
+    "ontologies",
+    "multi-agent systems",
+    "expert systems",
+    "fuzzy logic",
+    "evolutionary algorithms",
+    "metaheuristics",
+    "swarm intelligence",
+    "planning and scheduling",
+    "recommender systems",
+    "information retrieval",
+    "sentiment analysis",
+    "pattern recognition",
+    "explainable artificial intelligence",
+    "generative models",
+    "federated learning",
+    # Data
+    "data mining",
+    "big data",
+    "data science",
+    "databases",
+    "data warehousing",
+    "semantic web",
+    "knowledge graphs",
+    "graph mining",
+    "time series analysis",
+    "data visualization",
+    "data integration",
+    "cloud data management",
+    # Systems and networks
+    "computer networks",
+    "wireless sensor networks",
+    "internet of things",
+    "mobile computing",
+    "vehicular networks",
+    "software defined networking",
+    "5g networks",
+    "cloud computing",
+    "edge computing",
+    "fog computing",
+    "distributed systems",
+    "parallel computing",
+    "high performance computing",
+    "grid computing",
+    "operating systems",
+    "embedded systems",
+    "real-time systems",
+    "cyber-physical systems",
+    "computer architecture",
+    "hardware design",
+    "energy efficiency",
+    "virtualization",
+    # Security
+    "cybersecurity",
+    "cryptography",
+    "network security",
+    "intrusion detection",
+    "blockchain",
+    "privacy",
+    "malware analysis",
+    "access control",
+    "biometrics",
+    "digital forensics",
+    # Software
+    "software engineering",
+    "software architecture",
+    "software testing",
+    "formal methods",
+    "model-driven engineering",
+    "programming languages",
+    "compilers",
+    "service-oriented computing",
+    "web services",
+    "web development",
+    "requirements engineering",
+    "software maintenance",
+    "business process management",
+    "information systems",
+    "enterprise architecture",
+    # Human and society
+    "human-computer interaction",
+    "e-learning",
+    "educational technology",
+    "e-health",
+    "medical informatics",
+    "bioinformatics",
+    "computational biology",
+    "social networks",
+    "e-government",
+    "smart cities",
+    "geographic information systems",
+    "remote sensing",
+    "digital libraries",
+    "arabic language processing",
+    # Theory and mathematics
+    "algorithms",
+    "complexity theory",
+    "graph theory",
+    "combinatorial optimization",
+    "operations research",
+    "numerical analysis",
+    "applied mathematics",
+    "statistics",
+    "probability theory",
+    "logic",
+    "automata theory",
+    "computational geometry",
+    "quantum computing",
+    # Engineering
+    "robotics",
+    "control systems",
+    "signal processing",
+    "telecommunications",
+    "computer graphics",
+    "virtual reality",
+    "augmented reality",
+    "multimedia",
+    "video processing",
+    "medical imaging",
+    "renewable energy",
+    "smart grids",
+    "autonomous vehicles",
+    "simulation and modeling",
+]
@@ -0,0 +1,246 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+import numpy as np
+
+# SQLite limits the number of bound parameters per statement
+SQL_BATCH = 900
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a text before hashing it: lowercase and collapse whitespace.
+    The MiniLM tokenizer is uncased, so this does not change the embedding.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return " ".join(text.lower().split())
+
+
+def text_key(text: str, model_name: str) -> str:
+    """
+    Build the content-addressed cache key of a text for a given model.
+
+    Args:
+        text (str): The text to hash.
+        model_name (str): The name of the embedding model.
+
+    Returns:
+        str: A hexadecimal SHA-1 digest.
+    """
+    return hashlib.sha1(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed embedding cache: a memory-mapped float32 matrix holding the vectors and
+    a SQLite key index mapping each text hash to its row. When the matrix is full,
+    the least recently used rows are reused. Several processes (e.g. the server and
+    import_experts) can share the files: reads and writes hold the SQLite write lock.
+    """
+
+    def __init__(self, directory: str, model_name: str, capacity: int):
+        self.directory = directory
+        self.model_name = model_name
+        self.capacity = capacity
+        slug = model_name.replace("/", "_")
+        os.makedirs(directory, exist_ok=True)
+        self.matrix_path = os.path.join(directory, f"{slug}.f32")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._db = sqlite3.connect(os.path.join(directory, f"{slug}.sqlite3"), check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);"
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL);"
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);"
+        )
+        meta = dict(self._db.execute("SELECT name, value FROM meta"))
+        self.dim = meta.get("dim")
+        if self.dim is not None and (meta.get("capacity") != capacity or not os.path.exists(self.matrix_path)):
+            # The matrix layout changed, start over
+            self.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _open_matrix(self, dim: int) -> np.memmap:
+        if self._matrix is None:
+            if self.dim is None:
+                self.dim = dim
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                        [("dim", dim), ("capacity", self.capacity)],
+                    )
+            mode = "r+" if os.path.exists(self.matrix_path) else "w+"
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode=mode, shape=(self.capacity, self.dim))
+        return self._matrix
+
+    def clear(self) -> None:
+        """
+        Drop every cached embedding.
+        """
+        with self._db:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM meta")
+        self._matrix = None
+        self.dim = None
+        if os.path.exists(self.matrix_path):
+            os.remove(self.matrix_path)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the SQLite write lock (BEGIN IMMEDIATE) of the key index, shared with the other processes,
+        until the changes are committed, so that rows are chosen, written and read by one process at a time.
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.rollback()
+            raise
+        self._db.commit()
+
+    def _lookup_slots(self, keys: List[str]) -> dict:
+        slots = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), SQL_BATCH):
+            chunk = unique_keys[start:start + SQL_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            slots.update(self._db.execute(f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", chunk))
+        return slots
+
+    def get_many(self, texts: List[str]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Look up the embeddings of several texts.
+
+        Args:
+            texts (List[str]): The texts to look up.
+
+        Returns:
+            Tuple[Optional[np.ndarray], List[int]]: A (len(texts), dim) array filled for the cache hits
+                (None if nothing is cached yet), and the positions of the texts that were not found.
+        """
+        keys = [text_key(text, self.model_name) for text in texts]
+        with self._lock:
+            if self.dim is None:
+                return None, list(range(len(texts)))
+            matrix = self._open_matrix(self.dim)
+            with self._locked():
+                slots = self._lookup_slots(keys)
+                if slots:
+                    now = time.time()
+                    self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in slots])
+
+                embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+                hits = [(i, slots[key]) for i, key in enumerate(keys) if key in slots]
+                if hits:
+                    positions, rows = zip(*hits)
+                    embeddings[list(positions)] = matrix[list(rows)]
+            return embeddings, [i for i, key in enumerate(keys) if key not in slots]
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray) -> None:
+        """
+        Store the embeddings of several texts, evicting the least recently used rows if needed.
+
+        Args:
+            texts (List[str]): The texts that were encoded.
+            embeddings (np.ndarray): Their embeddings, one row per text.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        rows = {text_key(text, self.model_name): embedding for text, embedding in zip(texts, embeddings)}
+        # Never store more rows than the matrix can hold
+        rows = dict(list(rows.items())[-self.capacity:])
+        if not rows:
+            return
+
+        with self._lock:
+            matrix = self._open_matrix(embeddings.shape[1])
+            # The rows are chosen and written before the commit, under the lock of every process
+            with self._locked():
+                existing = self._lookup_slots(list(rows))
+                new_keys = [key for key in rows if key not in existing]
+
+                # Rows are only freed by eviction and reused at once, so slots 0..used-1 are always taken
+                used = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                evicted = []
+                overflow = used + len(new_keys) - self.capacity
+                if overflow > 0:
+                    keep = set(existing.values())
+                    candidates = self._db.execute(
+                        "SELECT slot FROM entries ORDER BY last_used LIMIT ?", (overflow + len(keep),)
+                    )
+                    evicted = [slot for (slot,) in candidates if slot not in keep][:overflow]
+                available = evicted + list(range(used, min(self.capacity, used + len(new_keys))))
+                assignments = list(existing.items()) + list(zip(new_keys, available))
+
+                now = time.time()
+                self._db.executemany("DELETE FROM entries WHERE slot = ?", [(slot,) for slot in evicted])
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                    [(key, slot, now) for key, slot in assignments],
+                )
+                for key, slot in assignments:
+                    matrix[slot] = rows[key]
+                matrix.flush()
+
+
+class TextMemo:
+    """
+    Persistent string-to-string memo stored in SQLite, e.g. source text to translation.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> dict:
+        """
+        Look up several texts.
+
+        Args:
+            texts (List[str]): The texts to look up.
+
+        Returns:
+            dict: A mapping of each text found to its stored value.
+        """
+        keys = {self._key(text): text for text in texts}
+        found = {}
+        with self._lock:
+            key_list = list(keys)
+            for start in range(0, len(key_list), SQL_BATCH):
+                chunk = key_list[start:start + SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                for key, value in self._db.execute(f"SELECT key, value FROM memo WHERE key IN ({placeholders})", chunk):
+                    found[keys[key]] = value
+        return found
+
+    def set_many(self, values: dict) -> None:
+        """
+        Store several text/value pairs.
+
+        Args:
+            values (dict): A mapping of text to the value to remember.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO memo (key, value) VALUES (?, ?)",
+                [(self._key(text), value) for text, value in values.items()],
+            )
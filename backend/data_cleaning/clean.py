@@ -1,16 +1,51 @@
+import threading
 import warnings
-from typing import List
+from typing import Dict, List, Optional
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from django.conf import settings
+from backend.registry import registry, SENTENCE_MODEL
+from .cache import EmbeddingCache
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+MODEL_NAME = SENTENCE_MODEL
+
+# Rows of the similarity matrix computed at once by the exact duplicate search
+BLOCK_SIZE = 512
+
+# Locality-sensitive hashing parameters for the approximate duplicate search
+LSH_MIN_SIZE = 5000
+LSH_TABLES = 8
+LSH_BITS = 12
+
+# Loaded on first use
+model = registry.lazy("sentence_transformer")
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Return the shared on-disk embedding cache, or None when EMBEDDING_CACHE_SIZE is 0.
+
+    Returns:
+        Optional[EmbeddingCache]: The cache for the sentence-transformers model.
+    """
+    global _embedding_cache
+    if not settings.EMBEDDING_CACHE_SIZE:
+        return None
+    directory, capacity = str(settings.EMBEDDING_CACHE_DIR), settings.EMBEDDING_CACHE_SIZE
+    # Reopened when the settings change (e.g. override_settings in the tests)
+    if _embedding_cache is None or (_embedding_cache.directory, _embedding_cache.capacity) != (directory, capacity):
+        with _embedding_cache_lock:
+            if _embedding_cache is None or (_embedding_cache.directory, _embedding_cache.capacity) != (directory, capacity):
+                _embedding_cache = EmbeddingCache(directory, MODEL_NAME, capacity)
+    return _embedding_cache
 
 def encode_sentences(sentences: List[str]) -> List[np.ndarray]:
     """
     Encode a list of sentences into embeddings using the sentence-transformers model.
+    Embeddings already in the on-disk cache are reused; only the misses are encoded.
 
     Args:
         sentences (List[str]): List of sentences to encode.
@@ -18,7 +53,25 @@ def encode_sentences(sentences: List[str]) -> List[np.ndarray]:
     Returns:
         List[np.ndarray]: A list of sentence embeddings.
     """
-    return model.encode(sentences)
+    cache = get_embedding_cache()
+    if cache is None or not len(sentences):
+        return model.encode(sentences)
+
+    embeddings, missing = cache.get_many(sentences)
+    if not missing:
+        return embeddings
+
+    # Encode each distinct missing sentence once
+    to_encode = list(dict.fromkeys(sentences[i] for i in missing))
+    encoded = np.asarray(model.encode(to_encode), dtype=np.float32)
+    cache.put_many(to_encode, encoded)
+
+    if embeddings is None:
+        embeddings = np.zeros((len(sentences), encoded.shape[1]), dtype=np.float32)
+    rows = {sentence: row for sentence, row in zip(to_encode, encoded)}
+    for i in missing:
+        embeddings[i] = rows[sentences[i]]
+    return embeddings
 
 def compute_similarity(embeddings: List[np.ndarray]) -> List[List[float]]:
     """
@@ -30,28 +83,120 @@ def compute_similarity(embeddings: List[np.ndarray]) -> List[List[float]]:
     Returns:
         List[List[float]]: A similarity matrix with cosine similarities between each pair of embeddings.
     """
+    from sklearn.metrics.pairwise import cosine_similarity
     return cosine_similarity(embeddings)
 
-def remove_duplicates(articles: List[str], threshold: float = 0.9) -> List[str]:
+def normalize_embeddings(embeddings: List[np.ndarray]) -> np.ndarray:
     """
-    Remove duplicates from a list of articles based on a similarity threshold, keeping unique items.
+    Scale embeddings to unit length so that dot products are cosine similarities.
+
+    Args:
+        embeddings (List[np.ndarray]): A list of sentence embeddings.
+
+    Returns:
+        np.ndarray: A 2D float32 array of unit-length embeddings.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+def find_similar_pairs(embeddings: np.ndarray, threshold: float, block_size: int = BLOCK_SIZE) -> List[np.ndarray]:
+    """
+    Find, for each embedding, the later embeddings whose cosine similarity reaches the threshold.
+    The similarity matrix is computed one block of rows at a time, so memory stays at block_size x N.
+
+    Args:
+        embeddings (np.ndarray): Unit-length embeddings.
+        threshold (float): The similarity threshold.
+        block_size (int, optional): The number of rows compared per block. Defaults to BLOCK_SIZE.
+
+    Returns:
+        List[np.ndarray]: For each index i, the sorted indices j > i similar to i.
+    """
+    n = len(embeddings)
+    columns = np.arange(n)
+    neighbours = []
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        similarities = embeddings[start:end] @ embeddings.T
+        rows = np.arange(start, end)
+        hits = (similarities >= threshold) & (columns[None, :] > rows[:, None])
+        row_hits, column_hits = np.nonzero(hits)
+        splits = np.searchsorted(row_hits, np.arange(1, end - start))
+        neighbours.extend(np.split(column_hits, splits))
+    return neighbours
+
+def find_similar_pairs_lsh(embeddings: np.ndarray, threshold: float, num_tables: int = LSH_TABLES,
+                           num_bits: int = LSH_BITS, seed: int = 0) -> List[np.ndarray]:
+    """
+    Approximate version of find_similar_pairs using random-hyperplane locality-sensitive hashing.
+    Only embeddings sharing a bucket in at least one table are compared, and every candidate pair
+    is checked against the exact threshold, so no false positives are returned; very close pairs
+    are found with high probability.
+
+    Args:
+        embeddings (np.ndarray): Unit-length embeddings.
+        threshold (float): The similarity threshold.
+        num_tables (int, optional): The number of hash tables. Defaults to LSH_TABLES.
+        num_bits (int, optional): The number of hyperplanes per table. Defaults to LSH_BITS.
+        seed (int, optional): The random seed for the hyperplanes. Defaults to 0.
+
+    Returns:
+        List[np.ndarray]: For each index i, the sorted indices j > i similar to i.
+    """
+    n, dim = embeddings.shape
+    rng = np.random.default_rng(seed)
+    weights = 1 << np.arange(num_bits, dtype=np.int64)
+    neighbours = [set() for _ in range(n)]
+
+    for _ in range(num_tables):
+        planes = rng.standard_normal((dim, num_bits)).astype(np.float32)
+        codes = ((embeddings @ planes) > 0) @ weights
+        order = np.argsort(codes, kind="stable")
+        bucket_starts = np.flatnonzero(np.diff(codes[order])) + 1
+        for bucket in np.split(order, bucket_starts):
+            if len(bucket) < 2:
+                continue
+            bucket = np.sort(bucket)
+            similarities = embeddings[bucket] @ embeddings[bucket].T
+            rows, columns = np.nonzero(np.triu(similarities >= threshold, k=1))
+            for i, j in zip(bucket[rows], bucket[columns]):
+                neighbours[i].add(j)
+
+    return [np.array(sorted(js), dtype=np.int64) for js in neighbours]
+
+def group_duplicates(articles: List[str], threshold: float = 0.9, approximate: Optional[bool] = None) -> Dict[int, List[int]]:
+    """
+    Group similar articles under the first occurrence of each group.
+    Articles with fewer than three words are dropped.
 
     Args:
         articles (List[str]): List of articles or strings to deduplicate.
         threshold (float, optional): The similarity threshold for detecting duplicates. Defaults to 0.9.
+        approximate (bool, optional): Use locality-sensitive hashing instead of the exact blocked search.
+            Defaults to None, which enables it for lists of at least LSH_MIN_SIZE articles.
 
     Returns:
-        List[str]: A list of unique articles after deduplication.
+        Dict[int, List[int]]: The index of each kept article, in order, mapped to the indices
+            of the duplicates it absorbed.
     """
     if not articles:
-        return []
+        return {}
 
     if len(articles) == 1:
-        return articles
+        return {0: []}
 
-    embeddings = encode_sentences(articles)
-    similarity_matrix = compute_similarity(embeddings)
+    if approximate is None:
+        approximate = len(articles) >= LSH_MIN_SIZE
+
+    embeddings = normalize_embeddings(encode_sentences(articles))
+    if approximate:
+        neighbours = find_similar_pairs_lsh(embeddings, threshold)
+    else:
+        neighbours = find_similar_pairs(embeddings, threshold)
     to_remove = set()
+    groups = {}
 
     for i in range(len(articles)):
         if i in to_remove:
@@ -59,8 +204,25 @@ def remove_duplicates(articles: List[str], threshold: float = 0.9) -> List[str]:
         if len(articles[i].split()) < 3:
             to_remove.add(i)
             continue
-        for j in range(i + 1, len(articles)):
-            if similarity_matrix[i][j] >= threshold:
-                to_remove.add(j)
+        absorbed = [j for j in neighbours[i].tolist() if j not in to_remove]
+        to_remove.update(absorbed)
+        groups[i] = absorbed
+
+    return groups
+
+def remove_duplicates(articles: List[str], threshold: float = 0.9, approximate: Optional[bool] = None) -> List[str]:
+    """
+    Remove duplicates from a list of articles based on a similarity threshold, keeping unique items.
+    The first occurrence of each group of similar articles is kept; articles with fewer than
+    three words are dropped.
+
+    Args:
+        articles (List[str]): List of articles or strings to deduplicate.
+        threshold (float, optional): The similarity threshold for detecting duplicates. Defaults to 0.9.
+        approximate (bool, optional): Use locality-sensitive hashing instead of the exact blocked search.
+            Defaults to None, which enables it for lists of at least LSH_MIN_SIZE articles.
 
-    return [article for i, article in enumerate(articles) if i not in to_remove]
+    Returns:
+        List[str]: A list of unique articles after deduplication.
+    """
+    return [articles[i] for i in group_duplicates(articles, threshold, approximate)]
@@ -0,0 +1,143 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional
+import numpy as np
+from .clean import encode_sentences, find_similar_pairs, normalize_embeddings
+
+# Acronyms commonly returned as interests, mapped to their expansion
+ACRONYMS = {
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "rl": "reinforcement learning",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "iot": "internet of things",
+    "hci": "human-computer interaction",
+    "hpc": "high performance computing",
+    "gis": "geographic information systems",
+    "sdn": "software defined networking",
+    "wsn": "wireless sensor networks",
+    "mas": "multi-agent systems",
+    "ir": "information retrieval",
+    "os": "operating systems",
+    "se": "software engineering",
+    "bi": "business intelligence",
+    "xai": "explainable artificial intelligence",
+    "llm": "large language models",
+    "llms": "large language models",
+    "cnn": "convolutional neural networks",
+    "cnns": "convolutional neural networks",
+    "gnn": "graph neural networks",
+    "gnns": "graph neural networks",
+}
+
+# Plural-looking words that must not be singularized
+INVARIABLE = {"data", "things", "series", "species", "news", "means", "chaos", "bias", "lens", "gas", "mas", "os", "ios",
+              "windows"}
+
+# Irregular plurals
+IRREGULAR = {"axes": "axis", "indices": "index", "matrices": "matrix", "vertices": "vertex", "criteria": "criterion"}
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    Normalize a keyword: Unicode compatibility form, lowercase, no parenthesized text,
+    hyphens, underscores and slashes turned into spaces, collapsed whitespace.
+
+    Args:
+        keyword (str): The keyword to normalize.
+
+    Returns:
+        str: The normalized keyword.
+    """
+    text = unicodedata.normalize("NFKC", keyword).lower()
+    text = re.sub(r"\(.*?\)", " ", text)
+    text = re.sub(r"[-_/]+", " ", text)
+    text = re.sub(r"[^\w\s+#.&']", " ", text)
+    return " ".join(text.split()).strip(" .'")
+
+
+def lemmatize_word(word: str) -> str:
+    """
+    Singularize an English word with a few suffix rules.
+
+    Args:
+        word (str): A lowercase word.
+
+    Returns:
+        str: Its singular form, or the word itself when no rule applies.
+    """
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    if len(word) <= 3 or word in INVARIABLE or word.endswith(("ics", "ss", "us", "is", "ous")):
+        return word
+    if word.endswith(("yses", "theses")):
+        # analyses, hypotheses
+        return word[:-2] + "is"
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def canonical_form(keyword: str) -> str:
+    """
+    Reduce a keyword to the form used to compare keywords: normalized, acronyms expanded
+    and every word singularized. It is a grouping key only; keywords keep their original spelling.
+
+    Args:
+        keyword (str): The keyword.
+
+    Returns:
+        str: The canonical form, empty for a keyword without any word.
+    """
+    text = normalize_keyword(keyword)
+    text = ACRONYMS.get(text, text)
+    return " ".join(lemmatize_word(word) for word in text.split())
+
+
+def cluster_keywords(keywords: List[str], counts: Optional[Dict[str, int]] = None,
+                     threshold: float = 0.9) -> Dict[str, str]:
+    """
+    Group keywords that are the same after canonicalization or whose embeddings are closer
+    than `threshold`, and pick the most used keyword of each group as its representative.
+
+    Args:
+        keywords (List[str]): The keywords to group.
+        counts (Dict[str, int], optional): How often each keyword is used. Defaults to once each.
+        threshold (float, optional): The cosine similarity above which two keywords are synonyms.
+
+    Returns:
+        Dict[str, str]: Each keyword mapped to the canonical form of its group representative.
+    """
+    counts = counts or {}
+    forms: Dict[str, List[str]] = {}
+    for keyword in keywords:
+        form = canonical_form(keyword)
+        if form:
+            forms.setdefault(form, []).append(keyword)
+    if not forms:
+        return {}
+
+    # Most used forms first, so that each group is absorbed by its most used form
+    weight = {form: sum(counts.get(keyword, 1) for keyword in members) for form, members in forms.items()}
+    ordered = sorted(forms, key=lambda form: (-weight[form], form))
+    if len(ordered) > 1:
+        embeddings = normalize_embeddings(encode_sentences(ordered))
+        neighbours = find_similar_pairs(embeddings, threshold)
+    else:
+        neighbours = [np.array([], dtype=np.int64)]
+
+    representative: Dict[str, str] = {}
+    for i, form in enumerate(ordered):
+        if form in representative:
+            continue
+        representative[form] = form
+        for j in neighbours[i].tolist():
+            representative.setdefault(ordered[j], form)
+
+    return {keyword: representative[form] for form, members in forms.items() for keyword in members}
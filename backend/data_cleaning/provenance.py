@@ -0,0 +1,104 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from .clean import group_duplicates
+from .translate import translate_batch
+
+# Attribution order when a title or an interest was found on several sources
+SOURCE_PRIORITY = ("Google Scholar", "ResearchGate", "DBLP", "Classified")
+
+
+@dataclass
+class TextRecord:
+    """
+    A title or an interest together with where it comes from.
+
+    Attributes:
+        text (str): The text as it is compared and stored (translated, if needed).
+        original (str): The text as returned by the first source that found it.
+        sources (List[str]): Every source that found it (or one of its duplicates).
+    """
+    text: str
+    original: str
+    sources: List[str] = field(default_factory=list)
+
+    def add_sources(self, sources: Iterable[str]) -> None:
+        for source in sources:
+            if source not in self.sources:
+                self.sources.append(source)
+
+    @property
+    def source(self) -> str:
+        """
+        Returns:
+            str: The preferred source according to SOURCE_PRIORITY.
+        """
+        return min(self.sources, key=source_rank) if self.sources else "Autre"
+
+
+def source_rank(source: str) -> int:
+    return SOURCE_PRIORITY.index(source) if source in SOURCE_PRIORITY else len(SOURCE_PRIORITY)
+
+
+def collect_records(texts_by_source: Dict[str, List[str]]) -> List[TextRecord]:
+    """
+    Build one record per distinct text, in the order the sources are given.
+
+    Args:
+        texts_by_source (Dict[str, List[str]]): The texts found by each source, keyed by source name.
+
+    Returns:
+        List[TextRecord]: The records, each listing every source that returned its text.
+    """
+    records: Dict[str, TextRecord] = {}
+    for source, texts in texts_by_source.items():
+        for text in texts:
+            record = records.get(text)
+            if record is None:
+                records[text] = TextRecord(text, text, [source])
+            else:
+                record.add_sources([source])
+    return list(records.values())
+
+
+def translate_records(records: List[TextRecord], batch_size: Optional[int] = None) -> List[TextRecord]:
+    """
+    Translate the records to English and merge those whose translations are identical.
+    Records that cannot be translated (unsupported language, failed translation) are dropped.
+
+    Args:
+        records (List[TextRecord]): The records to translate.
+        batch_size (int, optional): The number of texts per pipeline call.
+
+    Returns:
+        List[TextRecord]: The translated records, in their original order.
+    """
+    translated: Dict[str, TextRecord] = {}
+    for record, text in zip(records, translate_batch([record.original for record in records], batch_size)):
+        if not text:
+            continue
+        if text in translated:
+            translated[text].add_sources(record.sources)
+        else:
+            record.text = text
+            translated[text] = record
+    return list(translated.values())
+
+
+def deduplicate_records(records: List[TextRecord], threshold: float = 0.9) -> List[TextRecord]:
+    """
+    Remove similar records (see `group_duplicates`); the kept record inherits the sources
+    of the duplicates it absorbed.
+
+    Args:
+        records (List[TextRecord]): The records to deduplicate.
+        threshold (float, optional): The similarity threshold for detecting duplicates. Defaults to 0.9.
+
+    Returns:
+        List[TextRecord]: The kept records, in their original order.
+    """
+    kept = []
+    for i, absorbed in group_duplicates([record.text for record in records], threshold).items():
+        for j in absorbed:
+            records[i].add_sources(records[j].sources)
+        kept.append(records[i])
+    return kept
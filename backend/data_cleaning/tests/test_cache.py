@@ -0,0 +1,96 @@
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+import numpy as np
+from django.conf import settings
+from django.test import TestCase, override_settings
+from data_cleaning.cache import EmbeddingCache, text_key
+from data_cleaning.clean import get_embedding_cache
+
+class EmbeddingCacheTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = EmbeddingCache(self.directory.name, "test-model", capacity=3)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_empty_cache_misses_everything(self):
+        embeddings, missing = self.cache.get_many(["a title", "another title"])
+        self.assertIsNone(embeddings)
+        self.assertEqual(missing, [0, 1])
+
+    def test_round_trip(self):
+        self.cache.put_many(["first title", "second title"], np.array([[1, 0], [0, 1]]))
+        embeddings, missing = self.cache.get_many(["second title", "unknown", "first title"])
+        self.assertEqual(missing, [1])
+        np.testing.assert_array_equal(embeddings[0], [0, 1])
+        np.testing.assert_array_equal(embeddings[2], [1, 0])
+
+    def test_key_ignores_case_and_whitespace(self):
+        self.assertEqual(text_key("Deep  Learning ", "m"), text_key("deep learning", "m"))
+        self.assertNotEqual(text_key("deep learning", "m"), text_key("deep learning", "other-model"))
+
+    def test_persists_across_instances(self):
+        self.cache.put_many(["first title"], np.array([[1, 2]]))
+        reopened = EmbeddingCache(self.directory.name, "test-model", capacity=3)
+        embeddings, missing = reopened.get_many(["first title"])
+        self.assertEqual(missing, [])
+        np.testing.assert_array_equal(embeddings[0], [1, 2])
+
+    def test_least_recently_used_rows_are_evicted(self):
+        for text, row in zip(["a", "b", "c"], np.eye(3)):
+            self.cache.put_many([text], [row])
+        self.cache.get_many(["a"])
+        self.cache.put_many(["d"], np.array([[1, 1, 1]]))
+        self.assertEqual(len(self.cache), 3)
+        embeddings, missing = self.cache.get_many(["a", "b", "c", "d"])
+        self.assertEqual(missing, [1])
+        np.testing.assert_array_equal(embeddings[0], [1, 0, 0])
+        np.testing.assert_array_equal(embeddings[3], [1, 1, 1])
+
+    def test_instances_sharing_a_directory_never_mix_rows(self):
+        # Two instances stand for two processes: they only share the files
+        caches = [EmbeddingCache(self.directory.name, "test-model", capacity=8) for _ in range(2)]
+        texts = {"a": ["a 1", "a 2"], "b": ["b 1", "b 2"]}
+        vectors = {"a": np.array([[1, 0], [2, 0]]), "b": np.array([[0, 1], [0, 2]])}
+
+        # Both writers pause after choosing their rows, if nothing keeps them apart
+        barrier = threading.Barrier(2)
+        clock = time.time
+
+        def slow_clock():
+            try:
+                barrier.wait(timeout=0.5)
+            except threading.BrokenBarrierError:
+                pass
+            return clock()
+
+        with patch("data_cleaning.cache.time.time", side_effect=slow_clock):
+            threads = [threading.Thread(target=cache.put_many, args=(texts[name], vectors[name]))
+                       for cache, name in zip(caches, "ab")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        embeddings, missing = caches[0].get_many(texts["a"] + texts["b"])
+        self.assertEqual(missing, [])
+        np.testing.assert_array_equal(embeddings, np.concatenate([vectors["a"], vectors["b"]]))
+
+class SharedEmbeddingCacheTests(TestCase):
+
+    def test_disabled_during_tests(self):
+        self.assertEqual(settings.EMBEDDING_CACHE_SIZE, 0)
+        self.assertIsNone(get_embedding_cache())
+
+    def test_follows_the_settings(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            with override_settings(EMBEDDING_CACHE_DIR=first, EMBEDDING_CACHE_SIZE=3):
+                cache = get_embedding_cache()
+                self.assertEqual(cache.directory, first)
+                self.assertIs(get_embedding_cache(), cache)
+            with override_settings(EMBEDDING_CACHE_DIR=second, EMBEDDING_CACHE_SIZE=3):
+                self.assertEqual(get_embedding_cache().directory, second)
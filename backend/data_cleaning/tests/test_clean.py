@@ -1,5 +1,6 @@
+import numpy as np
 from django.test import TestCase
-from data_cleaning.clean import remove_duplicates
+from data_cleaning.clean import remove_duplicates, group_duplicates, find_similar_pairs, find_similar_pairs_lsh, normalize_embeddings
 
 class RemoveDuplicatesTests(TestCase):
 
@@ -66,3 +67,47 @@ class RemoveDuplicatesTests(TestCase):
             "A completely different article."
         ]
         self.assertCountEqual(result, expected)
+
+    def test_remove_duplicates_approximate(self):
+        result = remove_duplicates(self.articles, threshold=0.9, approximate=True)
+        self.assertEqual(result, remove_duplicates(self.articles, threshold=0.9, approximate=False))
+
+    def test_remove_duplicates_keeps_first_occurrence(self):
+        result = remove_duplicates([
+            "A completely different article.",
+            "The quick brown fox jumps over the lazy dog!",
+            "The quick brown fox jumps over the lazy dog.",
+        ], threshold=0.9)
+        self.assertEqual(result, [
+            "A completely different article.",
+            "The quick brown fox jumps over the lazy dog!",
+        ])
+
+    def test_group_duplicates_reports_absorbed_articles(self):
+        groups = group_duplicates([
+            "The quick brown fox jumps over the lazy dog.",
+            "A completely different article.",
+            "Short.",
+            "The quick brown fox jumps over the lazy dog!",
+        ], threshold=0.9)
+        self.assertEqual(groups, {0: [3], 1: []})
+
+
+class SimilarPairsTests(TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        base = rng.standard_normal((200, 32))
+        near = base[:50] + 0.01 * rng.standard_normal((50, 32))
+        self.embeddings = normalize_embeddings(np.vstack([base, near]))
+
+    def test_blocked_search_matches_full_matrix(self):
+        similarities = self.embeddings @ self.embeddings.T
+        expected = [np.flatnonzero(similarities[i, i + 1:] >= 0.9) + i + 1 for i in range(len(self.embeddings))]
+        result = find_similar_pairs(self.embeddings, 0.9, block_size=7)
+        self.assertEqual([r.tolist() for r in result], [e.tolist() for e in expected])
+
+    def test_lsh_search_finds_near_duplicates(self):
+        result = find_similar_pairs_lsh(self.embeddings, 0.9)
+        for i in range(50):
+            self.assertIn(200 + i, result[i].tolist())
@@ -0,0 +1,37 @@
+from django.test import TestCase
+from data_cleaning.keywords import canonical_form, cluster_keywords, lemmatize_word, normalize_keyword
+
+class KeywordTests(TestCase):
+
+    def test_normalize_keyword(self):
+        self.assertEqual(normalize_keyword("  Artificial Intelligence (AI) "), "artificial intelligence")
+        self.assertEqual(normalize_keyword("Multi-Agent_Systems"), "multi agent systems")
+        self.assertEqual(normalize_keyword("C++"), "c++")
+
+    def test_lemmatize_word(self):
+        self.assertEqual(lemmatize_word("networks"), "network")
+        self.assertEqual(lemmatize_word("ontologies"), "ontology")
+        self.assertEqual(lemmatize_word("analysis"), "analysis")
+        self.assertEqual(lemmatize_word("robotics"), "robotics")
+        self.assertEqual(lemmatize_word("processes"), "process")
+        self.assertEqual(lemmatize_word("data"), "data")
+        self.assertEqual(lemmatize_word("analyses"), "analysis")
+        self.assertEqual(lemmatize_word("axes"), "axis")
+        self.assertEqual(lemmatize_word("windows"), "windows")
+
+    def test_spellings_share_a_canonical_form(self):
+        forms = {canonical_form(k) for k in ["machine learning", "Machine Learning", "ML", "machine-learning"]}
+        self.assertEqual(forms, {"machine learning"})
+        self.assertEqual(canonical_form("Neural Networks"), canonical_form("neural network"))
+        self.assertEqual(canonical_form("Internet of Things"), "internet of things")
+        self.assertEqual(canonical_form("IoT"), "internet of things")
+
+    def test_cluster_keywords_prefers_the_most_used_form(self):
+        mapping = cluster_keywords(
+            ["Neural Networks", "neural network", "ML", "Machine Learning", "Databases"],
+            counts={"Neural Networks": 1, "neural network": 5, "ML": 3, "Machine Learning": 1, "Databases": 2},
+        )
+        self.assertEqual(mapping["Neural Networks"], "neural network")
+        self.assertEqual(mapping["ML"], mapping["Machine Learning"])
+        self.assertEqual(mapping["Databases"], "database")
+        self.assertEqual(cluster_keywords(["", "()"]), {})
@@ -0,0 +1,51 @@
+from django.test import TestCase
+from unittest.mock import patch
+from data_cleaning.provenance import TextRecord, collect_records, deduplicate_records, translate_records
+
+TRANSLATIONS = {
+    "apprentissage profond pour la vision": "deep learning for vision",
+    "deep learning for vision": "deep learning for vision",
+    "graph neural networks for molecules": "graph neural networks for molecules",
+    "graph neural networks for molecules.": "graph neural networks for molecules.",
+}
+
+
+def fake_translate_batch(texts, batch_size=None):
+    return [TRANSLATIONS.get(text, "") for text in texts]
+
+
+@patch('data_cleaning.provenance.translate_batch', fake_translate_batch)
+class ProvenanceTests(TestCase):
+
+    def test_collect_records_merges_identical_texts(self):
+        records = collect_records({
+            "DBLP": ["graph neural networks for molecules"],
+            "Google Scholar": ["graph neural networks for molecules", "deep learning for vision"],
+        })
+        self.assertEqual([(r.text, r.sources) for r in records], [
+            ("graph neural networks for molecules", ["DBLP", "Google Scholar"]),
+            ("deep learning for vision", ["Google Scholar"]),
+        ])
+
+    def test_translation_keeps_sources_and_original(self):
+        records = translate_records(collect_records({
+            "ResearchGate": ["apprentissage profond pour la vision", "titre en klingon"],
+            "DBLP": ["deep learning for vision"],
+        }))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].text, "deep learning for vision")
+        self.assertEqual(records[0].original, "apprentissage profond pour la vision")
+        self.assertEqual(records[0].sources, ["ResearchGate", "DBLP"])
+        self.assertEqual(records[0].source, "ResearchGate")
+
+    def test_duplicates_pass_their_sources_to_the_kept_record(self):
+        records = deduplicate_records(translate_records(collect_records({
+            "DBLP": ["graph neural networks for molecules."],
+            "Google Scholar": ["graph neural networks for molecules"],
+        })))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].text, "graph neural networks for molecules.")
+        self.assertEqual(records[0].source, "Google Scholar")
+
+    def test_record_without_source(self):
+        self.assertEqual(TextRecord("text", "text").source, "Autre")
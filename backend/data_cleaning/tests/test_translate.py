@@ -1,7 +1,11 @@
-from django.test import TestCase
+import os
+import tempfile
+from django.test import TestCase, override_settings
 from unittest.mock import patch
-from data_cleaning.translate import translate_text, translate_texts
+from data_cleaning.cache import TextMemo
+from data_cleaning.translate import get_translation_memo, translate_text, translate_texts
 
+@override_settings(TRANSLATION_MEMO_PATH=None)
 class TranslationTests(TestCase):
     @patch('data_cleaning.translate.translator')
     def test_translate_text_french(self, mock_translator):
@@ -71,3 +75,62 @@ class TranslationTests(TestCase):
         result = translate_text(french_text)
         
         self.assertEqual(result, "")
+
+
+class BatchTranslationTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.memo = TextMemo(os.path.join(self.directory.name, "memo.sqlite3"), "test")
+        patcher = patch('data_cleaning.translate.get_translation_memo', return_value=self.memo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    @patch('data_cleaning.translate.translator')
+    @patch('data_cleaning.translate.detect_language')
+    def test_french_texts_are_translated_in_one_batch(self, mock_detect_language, mock_translator):
+        """
+        Test that French texts go to the pipeline together and the output order is preserved.
+        """
+        mock_detect_language.side_effect = lambda text: "en" if text.startswith("The") else "fr"
+        mock_translator.side_effect = lambda batch, **kwargs: [{"translation_text": f"en:{text}"} for text in batch]
+
+        texts = ["Un titre", "The title", "Un autre titre", "Un titre"]
+        result = translate_texts(texts, batch_size=8)
+
+        self.assertEqual(result, ["en:Un titre", "The title", "en:Un autre titre", "en:Un titre"])
+        mock_translator.assert_called_once_with(["Un titre", "Un autre titre"], max_length=400, batch_size=8)
+
+    @patch('data_cleaning.translate.translator')
+    @patch('data_cleaning.translate.detect_language')
+    def test_memoized_translations_skip_the_pipeline(self, mock_detect_language, mock_translator):
+        """
+        Test that texts translated before are served from the memo.
+        """
+        mock_detect_language.return_value = "fr"
+        self.memo.set_many({"Bonjour le monde": "Hello world"})
+
+        result = translate_texts(["Bonjour le monde"])
+
+        self.assertEqual(result, ["Hello world"])
+        mock_translator.assert_not_called()
+
+
+class TranslationMemoSettingsTests(TestCase):
+
+    @patch('data_cleaning.translate.translator')
+    @patch('data_cleaning.translate.detect_language')
+    def test_memo_follows_the_setting(self, mock_detect_language, mock_translator):
+        """
+        Test that the shared memo is reopened at the configured path and disabled without one.
+        """
+        self.assertIsNone(get_translation_memo())
+        mock_detect_language.return_value = "fr"
+        mock_translator.return_value = [{"translation_text": "Hello world"}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "translations.sqlite3")
+            with override_settings(TRANSLATION_MEMO_PATH=path):
+                translate_texts(["Bonjour le monde"])
+                self.assertEqual(get_translation_memo().path, path)
+                self.assertEqual(TextMemo(path, get_translation_memo().namespace).get_many(["Bonjour le monde"]),
+                                 {"Bonjour le monde": "Hello world"})
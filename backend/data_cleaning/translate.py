@@ -1,11 +1,36 @@
+import threading
 from langdetect import detect, DetectorFactory
-from typing import List
-from transformers import pipeline
+from typing import List, Optional
+from django.conf import settings
+from backend.registry import registry, TRANSLATION_MODEL
+from .cache import TextMemo
 
 # Ensure consistent results from langdetect
 DetectorFactory.seed = 0
 
-translator = pipeline("translation", model="Helsinki-NLP/opus-mt-fr-en")
+# Loaded on first use
+translator = registry.lazy("translator")
+
+_translation_memo = None
+_translation_memo_lock = threading.Lock()
+
+def get_translation_memo() -> Optional[TextMemo]:
+    """
+    Return the shared persistent translation memo, or None when TRANSLATION_MEMO_PATH is not set.
+
+    Returns:
+        Optional[TextMemo]: The memo mapping French source texts to their translation.
+    """
+    global _translation_memo
+    if not settings.TRANSLATION_MEMO_PATH:
+        return None
+    path = str(settings.TRANSLATION_MEMO_PATH)
+    # Reopened when the setting changes (e.g. override_settings in the tests)
+    if _translation_memo is None or _translation_memo.path != path:
+        with _translation_memo_lock:
+            if _translation_memo is None or _translation_memo.path != path:
+                _translation_memo = TextMemo(path, TRANSLATION_MODEL)
+    return _translation_memo
 
 def detect_language(text: str) -> str:
     """
@@ -49,20 +74,82 @@ def translate_text(text: str) -> str:
     else:
         return ""
 
-def translate_texts(texts: List[str]) -> List[str]:
+def translate_french_texts(texts: List[str], batch_size: int) -> dict:
+    """
+    Translate French texts to English, passing them to the pipeline in batches.
+    If a batch fails, its texts are retried one by one so that a single bad text only loses itself.
+
+    Args:
+        texts (List[str]): Distinct French texts.
+        batch_size (int): The number of texts per pipeline call.
+
+    Returns:
+        dict: A mapping of each successfully translated text to its translation.
+    """
+    translations = {}
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        try:
+            results = translator(batch, max_length=400, batch_size=batch_size)
+            translations.update(
+                (text, result["translation_text"]) for text, result in zip(batch, results)
+            )
+        except Exception as e:
+            print(f"Batch translation failed, retrying one by one: {e}")
+            for text in batch:
+                try:
+                    translations[text] = translator(text, max_length=400)[0]["translation_text"]
+                except Exception as e:
+                    print(f"Translation failed: {e}")
+    return translations
+
+def translate_batch(texts: List[str], batch_size: Optional[int] = None) -> List[str]:
+    """
+    Translate a list of texts, keeping one result per input text.
+    Languages are detected for the whole list, then the distinct French texts that are not
+    in the translation memo are translated in batches and remembered.
+
+    Args:
+        texts (List[str]): A list of texts to translate.
+        batch_size (int, optional): The number of texts per pipeline call. Defaults to TRANSLATION_BATCH_SIZE.
+
+    Returns:
+        List[str]: For each input text, its translation if it's French, the text itself if it's English,
+            or an empty string otherwise (including failed translations).
+    """
+    batch_size = batch_size or settings.TRANSLATION_BATCH_SIZE
+    languages = [detect_language(text) for text in texts]
+    french = list(dict.fromkeys(text for text, lang in zip(texts, languages) if lang == "fr"))
+
+    memo = get_translation_memo()
+    translations = memo.get_many(french) if memo and french else {}
+    missing = [text for text in french if text not in translations]
+    if missing:
+        translated = translate_french_texts(missing, batch_size)
+        if memo and translated:
+            memo.set_many(translated)
+        translations.update(translated)
+
+    results = []
+    for text, lang in zip(texts, languages):
+        if lang == "fr":
+            results.append(translations.get(text, ""))
+        elif lang == "en":
+            results.append(text)
+        else:
+            results.append("")
+    return results
+
+def translate_texts(texts: List[str], batch_size: Optional[int] = None) -> List[str]:
     """
     Translate a list of texts. French texts will be translated to English.
     English texts will be returned as is. Other languages will be ignored.
 
     Args:
         texts (List[str]): A list of texts to translate.
+        batch_size (int, optional): The number of texts per pipeline call. Defaults to TRANSLATION_BATCH_SIZE.
 
     Returns:
         List[str]: A list of translated or original texts, excluding unsupported languages.
     """
-    translated_texts = []
-    for text in texts:
-        translated_text = translate_text(text)
-        if translated_text:
-            translated_texts.append(translated_text)
-    return translated_texts
+    return [text for text in translate_batch(texts, batch_size) if text]
@@ -0,0 +1,209 @@
+import asyncio
+import atexit
+import threading
+from typing import Iterable, List, Optional
+from playwright.async_api import async_playwright, Error as PlaywrightError
+from .config import USER_AGENT
+
+BLOCKED_RESOURCES = ("image", "font", "stylesheet", "media")
+
+
+class PooledBrowser:
+    """
+    A launched browser with its context and the pages waiting to be reused.
+    """
+
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+        self.idle_pages: List = []
+        self.served = 0
+        self.active = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by every thread of the process.
+
+    The pool runs async Playwright on its own event loop thread. Pages are reused between
+    lookups, at most `max_pages` are open at once, images/fonts/CSS are not downloaded, and
+    the browser is replaced after `recycle_after` page loads or as soon as it crashes.
+    """
+
+    def __init__(self, max_pages: int = 2, recycle_after: int = 100, timeout: float = 30.0,
+                 blocked_resources: Iterable[str] = BLOCKED_RESOURCES, user_agent: str = USER_AGENT):
+        self.max_pages = max_pages
+        self.recycle_after = recycle_after
+        self.timeout = timeout
+        self.blocked_resources = frozenset(blocked_resources)
+        self.user_agent = user_agent
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._current: Optional[PooledBrowser] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self.launches = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+        return self._loop
+
+    def content(self, url: str) -> str:
+        """
+        Load a page and return its HTML, blocking the calling thread.
+
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            str: The page content.
+        """
+        return asyncio.run_coroutine_threadsafe(self._fetch_content(url), self._ensure_loop()).result()
+
+    async def fetch(self, url: str) -> str:
+        """
+        Load a page and return its HTML, from any event loop.
+
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            str: The page content.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._fetch_content(url), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _fetch_content(self, url: str) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+            self._launch_lock = asyncio.Lock()
+
+        async with self._semaphore:
+            pooled, page = await self._acquire_page()
+            failed = True
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout * 1000)
+                content = await page.content()
+                failed = False
+                return content
+            except PlaywrightError:
+                if not pooled.browser.is_connected():
+                    pooled.retired = True
+                raise
+            finally:
+                await self._release_page(pooled, page, failed)
+
+    async def _acquire_page(self):
+        async with self._launch_lock:
+            current = self._current
+            if current is None or current.retired or not current.browser.is_connected():
+                if current is not None:
+                    current.retired = True
+                    await self._close_if_unused(current)
+                self._current = current = await self._launch()
+            current.active += 1
+            current.served += 1
+            if current.served >= self.recycle_after:
+                current.retired = True
+        try:
+            page = current.idle_pages.pop() if current.idle_pages else await current.context.new_page()
+        except PlaywrightError:
+            current.active -= 1
+            current.retired = True
+            await self._close_if_unused(current)
+            raise
+        return current, page
+
+    async def _release_page(self, pooled: PooledBrowser, page, failed: bool) -> None:
+        pooled.active -= 1
+        if pooled.retired:
+            await self._close_if_unused(pooled)
+        elif failed:
+            # A page left in an unknown state is not reused
+            await self._close_quietly(page)
+        else:
+            pooled.idle_pages.append(page)
+
+    async def _launch(self) -> PooledBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        browser = await self._playwright.chromium.launch(headless=True)
+        context = await browser.new_context(user_agent=self.user_agent)
+        if self.blocked_resources:
+            await context.route("**/*", self._route)
+        self.launches += 1
+        return PooledBrowser(browser, context)
+
+    async def _route(self, route) -> None:
+        if route.request.resource_type in self.blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _close_if_unused(self, pooled: PooledBrowser) -> None:
+        if pooled.active == 0:
+            await self._close_quietly(pooled.browser)
+
+    @staticmethod
+    async def _close_quietly(closable) -> None:
+        try:
+            await closable.close()
+        except PlaywrightError:
+            pass
+
+    async def _shutdown(self) -> None:
+        if self._current is not None:
+            await self._close_quietly(self._current.browser)
+            self._current = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self) -> None:
+        """
+        Close the browser and stop the event loop thread.
+        """
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=10)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop = None
+            self._thread = None
+            self._semaphore = None
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Return the process-wide browser pool, configured from the GATE_BROWSER_* settings.
+
+    Returns:
+        BrowserPool: The shared pool.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from django.conf import settings
+                _pool = BrowserPool(
+                    max_pages=settings.GATE_BROWSER_MAX_PAGES,
+                    recycle_after=settings.GATE_BROWSER_RECYCLE_AFTER,
+                    timeout=settings.GATE_BROWSER_TIMEOUT,
+                    blocked_resources=settings.GATE_BROWSER_BLOCKED_RESOURCES,
+                )
+                atexit.register(_pool.close)
+    return _pool
@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, NamedTuple, Optional
+
+
+class StoredResponse(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: Optional[float]) -> bool:
+        return ttl is None or time.time() - self.fetched_at <= ttl
+
+
+class OfflineMiss(LookupError):
+    """
+    Raised in offline mode when a response was never stored.
+    """
+
+
+class ResponseStore:
+    """
+    Raw responses of the data sources, kept in SQLite and compressed with zlib.
+    Each response is keyed by its source (e.g. 'dblp') and its query (e.g. the URL).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "source TEXT, query TEXT, body BLOB, etag TEXT, last_modified TEXT, fetched_at REAL, "
+            "PRIMARY KEY (source, query))"
+        )
+
+    def get(self, source: str, query: str) -> Optional[StoredResponse]:
+        """
+        Return the stored response of a query.
+
+        Args:
+            source (str): The data source.
+            query (str): The query, such as a URL.
+
+        Returns:
+            Optional[StoredResponse]: The response, or None if it was never stored.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE source = ? AND query = ?",
+                (source, query),
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return StoredResponse(zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched_at)
+
+    def lookup(self, source: str, query: str, ttl: Optional[float]) -> Optional[StoredResponse]:
+        """
+        Return the stored response of a query if it is still fresh.
+
+        Args:
+            source (str): The data source.
+            query (str): The query, such as a URL.
+            ttl (float, optional): The age in seconds after which a response is stale, None to never expire.
+
+        Returns:
+            Optional[StoredResponse]: The response, or None if it is missing or stale.
+        """
+        stored = self.get(source, query)
+        return stored if stored is not None and stored.is_fresh(ttl) else None
+
+    def put(self, source: str, query: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """
+        Store or replace the response of a query.
+
+        Args:
+            source (str): The data source.
+            query (str): The query, such as a URL.
+            body (str): The raw response.
+            etag (str, optional): The ETag header of the response.
+            last_modified (str, optional): The Last-Modified header of the response.
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (source, query, body, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source, query, zlib.compress(body.encode("utf-8")), etag, last_modified, time.time()),
+            )
+
+    def touch(self, source: str, query: str) -> None:
+        """
+        Mark a stored response as fresh, e.g. after the server answered 304 Not Modified.
+
+        Args:
+            source (str): The data source.
+            query (str): The query, such as a URL.
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE responses SET fetched_at = ? WHERE source = ? AND query = ?",
+                (time.time(), source, query),
+            )
+
+
+_store: Optional[ResponseStore] = None
+_store_lock = threading.Lock()
+_offline: Optional[bool] = None
+
+
+def get_response_store() -> Optional[ResponseStore]:
+    """
+    Return the shared response store, or None when COLLECTOR_CACHE_PATH is not set.
+
+    Returns:
+        Optional[ResponseStore]: The store.
+    """
+    global _store
+    from django.conf import settings
+    if not settings.COLLECTOR_CACHE_PATH:
+        return None
+    path = str(settings.COLLECTOR_CACHE_PATH)
+    if _store is None or _store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                _store = ResponseStore(path)
+    return _store
+
+
+def set_offline(offline: Optional[bool]) -> None:
+    """
+    Switch the collectors to offline replay: stored responses are used whatever their age
+    and nothing is requested from the network. None goes back to the COLLECTOR_OFFLINE setting.
+
+    Args:
+        offline (Optional[bool]): Whether to replay stored responses only.
+    """
+    global _offline
+    _offline = offline
+
+
+def is_offline() -> bool:
+    if _offline is not None:
+        return _offline
+    from django.conf import settings
+    return settings.COLLECTOR_OFFLINE
+
+
+def get_ttl() -> Optional[float]:
+    from django.conf import settings
+    return settings.COLLECTOR_CACHE_TTL
+
+
+def cached_fetch(source: str, query: str, fetch: Callable[[], str],
+                 is_valid: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Return the stored response of a query, or call `fetch` and store its result.
+    Exceptions raised by `fetch` are not stored, so failed requests are retried next time; neither are
+    empty responses nor those rejected by `is_valid` (e.g. a captcha page or an empty search), which
+    would otherwise hide the researcher until the response expires.
+
+    Args:
+        source (str): The data source.
+        query (str): The query identifying the response.
+        fetch (Callable[[], str]): A function without arguments performing the request.
+        is_valid (Callable[[str], bool], optional): Whether a response is worth storing. Stored responses
+            it rejects are ignored. Defaults to accepting any non-empty response.
+
+    Returns:
+        str: The raw response.
+
+    Raises:
+        OfflineMiss: In offline mode, when the response was never stored.
+    """
+    def storable(body: str) -> bool:
+        return bool(body) and (is_valid is None or is_valid(body))
+
+    store = get_response_store()
+    offline = is_offline()
+    if store is not None:
+        stored = store.lookup(source, query, None if offline else get_ttl())
+        if stored is not None and storable(stored.body):
+            return stored.body
+    if offline:
+        raise OfflineMiss(f"No stored {source} response for {query}")
+
+    body = fetch()
+    if store is not None and storable(body):
+        store.put(source, query, body)
+    return body
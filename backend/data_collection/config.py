@@ -2,4 +2,10 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 API_URL = "https://dblp.org/search/author/api"
 HEADERS = {
     "Accept": "application/json"
-}
\ No newline at end of file
+}
+# (connect, read) timeouts in seconds for DBLP requests
+TIMEOUT = (5, 30)
+# Retries with exponential backoff (0.5s, 1s, 2s, ...) on rate limiting and server errors
+RETRIES = 4
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
@@ -1,26 +1,122 @@
+import json
 import requests
-from parsel import Selector
+import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List
-from .config import API_URL, HEADERS
+from .cache import OfflineMiss, cached_fetch, get_response_store, get_ttl, is_offline
+from .config import API_URL, HEADERS, USER_AGENT, TIMEOUT, RETRIES, BACKOFF_FACTOR, RETRY_STATUSES
 
-def get_html_content(url: str) -> str:
+# Publication types listed in a DBLP person record (dblpperson/r/<type>)
+RECORD_TYPES = ("article", "inproceedings", "proceedings", "book", "incollection", "phdthesis", "mastersthesis", "www", "data")
+
+
+def build_session() -> requests.Session:
+    """
+    Builds the HTTP session shared by all DBLP requests.
+    Connections are kept alive between requests, and requests failing with 429 or 5xx are
+    retried with exponential backoff, honoring the Retry-After header.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=retry)
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = build_session()
+
+
+def get_content(url: str) -> str:
     """
-    Fetches HTML content from a given URL.
+    Fetches the content of a given URL.
+    The last response is kept with its ETag/Last-Modified headers: it is served as is while it
+    is younger than COLLECTOR_CACHE_TTL, then revalidated, so an unchanged page only costs a
+    304 Not Modified. In offline mode only stored responses are used.
 
     Args:
         url (str): The URL to fetch content from.
 
     Returns:
-        str: The HTML content of the page, or an empty string if there was an error.
+        str: The content of the page, or an empty string if there was an error.
     """
+    store = get_response_store()
+    cached = store.get("dblp", url) if store is not None else None
+    offline = is_offline()
+    if cached is not None and (offline or cached.is_fresh(get_ttl())):
+        return cached.body
+    if offline:
+        print(f"DBLP : No stored content for {url} (offline)")
+        return ""
+
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
     try:
-        response = requests.get(url)  # Make a GET request to the URL
+        response = session.get(url, headers=headers, timeout=TIMEOUT)
+        if response.status_code == 304 and cached is not None:
+            store.touch("dblp", url)
+            return cached.body
         response.raise_for_status()  # Raise an exception for HTTP errors
-        return response.text  # Return the HTML content
     except requests.RequestException as e:
-        print(f"DBLP : Error fetching HTML content from {url}: {e}")
+        print(f"DBLP : Error fetching content from {url}: {e}")
         return ""
 
+    if store is not None:
+        store.put(
+            "dblp", url, response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return response.text
+
+
+def parse_person_xml(xml_content: str) -> List[str]:
+    """
+    Extracts the publication titles from a DBLP person record (https://dblp.org/pid/<pid>.xml).
+
+    Args:
+        xml_content (str): The XML document.
+
+    Returns:
+        List[str]: The publication titles in lowercase.
+    """
+    if not xml_content:
+        return []
+    try:
+        root = ET.fromstring(xml_content)
+    except ET.ParseError as e:
+        print(f"DBLP : Invalid person record: {e}")
+        return []
+
+    articles = []
+    for record in root.iterfind("r/*"):
+        if record.tag not in RECORD_TYPES:
+            continue
+        title = record.find("title")
+        if title is not None:
+            # Titles may contain markup such as <i> or <sub>
+            text = " ".join("".join(title.itertext()).split())
+            if text:
+                articles.append(text.lower())
+    return articles
+
+
 def get_dblp_articles(author_name: str) -> List[str]:
     """
     Searches for the most relevant author on DBLP and retrieves their publications.
@@ -34,15 +130,18 @@ def get_dblp_articles(author_name: str) -> List[str]:
     # Parameters for the API request
     params = {"q": author_name, "format": "json"}
 
-    try:
+    def search() -> str:
         # Make a GET request to the DBLP API with the search parameters
-        response = requests.get(API_URL, headers=HEADERS, params=params)
+        response = session.get(API_URL, headers=HEADERS, params=params, timeout=TIMEOUT)
         response.raise_for_status()
-    except requests.RequestException as e:
+        return response.text
+
+    try:
+        data = json.loads(cached_fetch("dblp", f"search:{author_name}", search))
+    except (requests.RequestException, OfflineMiss, ValueError) as e:
         print(f"DBLP : Error fetching author data: {e}")
         return []
 
-    data = response.json()
     # Extract the list of authors from the response
     authors = data.get("result", {}).get("hits", {}).get("hit", [])
     if not authors:
@@ -57,17 +156,10 @@ def get_dblp_articles(author_name: str) -> List[str]:
         print(f"DBLP : No URL found for author: {author_info.get('author', 'Unknown')}")
         return []
 
-    # Fetch the HTML content of the author's DBLP page
-    html_content = get_html_content(author_url)
-    selector = Selector(text=html_content)
-    
-    # Extract article titles and return them in lowercase
-    articles = [
-        article.css("::text").get().strip().lower()
-        for article in selector.css(".title")
-    ]
+    # Fetch the XML record of the author, much lighter than the HTML page
+    articles = parse_person_xml(get_content(f"{author_url}.xml"))
 
     if not articles:
-        print("DBLP : No articles found or selector issue.")
+        print("DBLP : No articles found in the person record.")
 
-    return articles
\ No newline at end of file
+    return articles
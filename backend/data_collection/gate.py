@@ -1,8 +1,15 @@
-from typing import List, Tuple
-from playwright.sync_api import sync_playwright
+from typing import Callable, List, Tuple
 from parsel import Selector
 import urllib.parse
-from .config import USER_AGENT
+from .browser import get_browser_pool
+from .cache import cached_fetch
+
+PROFILE_SELECTOR = ".nova-legacy-v-entity-item__title"
+INTEREST_SELECTOR = ".js-target-skills > .nova-legacy-l-flex__item"
+ARTICLE_SELECTOR = ".nova-legacy-v-publication-item__title"
+
+# Titles of the pages served instead of the requested one when the browser is blocked
+BLOCKED_PAGE_MARKERS = ("just a moment", "security check", "captcha", "attention required")
 
 def names_match(first_names: List[str], last_names: List[str], profile_names: List[str]) -> bool:
     """
@@ -20,6 +27,43 @@ def names_match(first_names: List[str], last_names: List[str], profile_names: Li
     ln_matches = all(ln in profile_names for ln in last_names)
     return fn_matches and ln_matches
 
+def is_gate_page(content: str) -> bool:
+    """
+    Checks that a page is not empty nor a challenge or captcha page.
+
+    Args:
+        content (str): The page content.
+
+    Returns:
+        bool: True if the page can be parsed and stored.
+    """
+    if not content.strip():
+        return False
+    title = (Selector(text=content).css("title::text").get() or "").lower()
+    return not any(marker in title for marker in BLOCKED_PAGE_MARKERS)
+
+def has_selector(css: str) -> Callable[[str], bool]:
+    """
+    Returns:
+        Callable[[str], bool]: A check that a page is a ResearchGate page with at least one `css` element.
+    """
+    return lambda content: is_gate_page(content) and bool(Selector(text=content).css(css))
+
+def fetch_page_content(url: str, is_valid: Callable[[str], bool] = is_gate_page) -> str:
+    """
+    Loads a page in the shared headless browser and returns its HTML.
+    Pages are kept in the response store and reused until they expire; pages rejected by
+    `is_valid` (blocked, empty results) are not stored, so they are loaded again next time.
+
+    Args:
+        url (str): The URL of the page.
+        is_valid (Callable[[str], bool], optional): Whether the page is worth storing. Defaults to is_gate_page.
+
+    Returns:
+        str: The page content.
+    """
+    return cached_fetch("researchgate", url, lambda: get_browser_pool().content(url), is_valid)
+
 def get_gate_profile_url(first_name: str, last_name: str) -> str:
     """
     Searches for a researcher on ResearchGate and retrieves the URL of their profile.
@@ -31,45 +75,38 @@ def get_gate_profile_url(first_name: str, last_name: str) -> str:
     Returns:
         str: The URL of the researcher's profile, or an empty string if no profile is found.
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)  # Launch a headless browser
-        page = browser.new_page(user_agent=USER_AGENT)  # Open a new page with a specified User-Agent
-
-        try:
-            # Prepare the query for ResearchGate search
-            first_names = first_name.strip().lower().split()
-            last_names = last_name.strip().lower().split()
-            first_name_query = " OR ".join([f'"{name}"' for name in first_names])
-            last_name_query = " OR ".join([f'"{name}"' for name in last_names])
-            query = f"({first_name_query}) AND ({last_name_query})"
-            encoded_query = urllib.parse.quote(query)
-            url = f"https://www.researchgate.net/search/researcher?q={encoded_query}"
-            page.goto(url, wait_until="domcontentloaded")  # Navigate to the search results page
-
-            content = page.content()  # Get the page content
-            selector = Selector(text=content)
-            profiles = selector.css(".nova-legacy-v-entity-item__title")  # Select profile titles
-            result = []
-
-            for profile in profiles:
-                profile_name = profile.css("a::text").get().replace("-", " ")
-                profile_names = profile_name.strip().lower().split()
-                if names_match(first_names, last_names, profile_names):
-                    profile_url = profile.css("a").attrib["href"].split("?")[0]
-                    profile_url = "https://www.researchgate.net/" + profile_url
-                    result.append(profile_url)
-
-            # Return the shortest URL from the results or an empty string if no results
-            profile_url = min(result, key=len) if result else ""
-            return profile_url
-
-        except Exception as e:
-            # Print any errors that occur during the process
-            print(f"GATE : An error occurred in get_gate_profile_url: {e}")
-            return ""
-
-        finally:
-            browser.close()
+    try:
+        # Prepare the query for ResearchGate search
+        first_names = first_name.strip().lower().split()
+        last_names = last_name.strip().lower().split()
+        first_name_query = " OR ".join([f'"{name}"' for name in first_names])
+        last_name_query = " OR ".join([f'"{name}"' for name in last_names])
+        query = f"({first_name_query}) AND ({last_name_query})"
+        encoded_query = urllib.parse.quote(query)
+        url = f"https://www.researchgate.net/search/researcher?q={encoded_query}"
+
+        # Get the search results page content; a search without results is not stored
+        content = fetch_page_content(url, has_selector(PROFILE_SELECTOR))
+        selector = Selector(text=content)
+        profiles = selector.css(PROFILE_SELECTOR)  # Select profile titles
+        result = []
+
+        for profile in profiles:
+            profile_name = profile.css("a::text").get().replace("-", " ")
+            profile_names = profile_name.strip().lower().split()
+            if names_match(first_names, last_names, profile_names):
+                profile_url = profile.css("a").attrib["href"].split("?")[0]
+                profile_url = "https://www.researchgate.net/" + profile_url
+                result.append(profile_url)
+
+        # Return the shortest URL from the results or an empty string if no results
+        profile_url = min(result, key=len) if result else ""
+        return profile_url
+
+    except Exception as e:
+        # Print any errors that occur during the process
+        print(f"GATE : An error occurred in get_gate_profile_url: {e}")
+        return ""
 
 def get_gate_articles_interests(first_name: str, last_name: str) -> Tuple[List[str], List[str]]:
     """
@@ -92,32 +129,26 @@ def get_gate_articles_interests(first_name: str, last_name: str) -> Tuple[List[s
     if not profile_url:
         return [], []
 
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.launch(headless=True)  # Launch a headless browser
-            page = browser.new_page(user_agent=USER_AGENT)  # Open a new page with a specified User-Agent
-            page.goto(profile_url, wait_until="domcontentloaded")  # Navigate to the researcher's profile page
-            content = page.content()  # Get the page content
-            selector = Selector(text=content)
-
-            # Extract research interests
-            interest_elements = selector.css(".js-target-skills > .nova-legacy-l-flex__item")
-            interests = [interest.css("::text").get().strip().lower() for interest in interest_elements]
-            if not interests:
-                print(f"GATE : No interests found or selector issue.  \n{profile_url}")
-
-            # Extract publication titles
-            article_elements = selector.css(".nova-legacy-v-publication-item__title")
-            articles = [article.css("::text").get().strip().lower() for article in article_elements]
-            if not articles:
-                print(f"GATE : No articles found or selector issue.  \n{profile_url}")
-
-            return interests, articles
-
-        except Exception as e:
-            # Print any errors that occur during the process
-            print(f"GATE : An error occurred in get_gate_articles_interests: {e}")
-            return [], []
-
-        finally:
-            browser.close()
\ No newline at end of file
+    try:
+        # Get the researcher's profile page content; a profile without interests nor articles is not stored
+        content = fetch_page_content(profile_url, has_selector(f"{INTEREST_SELECTOR}, {ARTICLE_SELECTOR}"))
+        selector = Selector(text=content)
+
+        # Extract research interests
+        interest_elements = selector.css(INTEREST_SELECTOR)
+        interests = [interest.css("::text").get().strip().lower() for interest in interest_elements]
+        if not interests:
+            print(f"GATE : No interests found or selector issue.  \n{profile_url}")
+
+        # Extract publication titles
+        article_elements = selector.css(ARTICLE_SELECTOR)
+        articles = [article.css("::text").get().strip().lower() for article in article_elements]
+        if not articles:
+            print(f"GATE : No articles found or selector issue.  \n{profile_url}")
+
+        return interests, articles
+
+    except Exception as e:
+        # Print any errors that occur during the process
+        print(f"GATE : An error occurred in get_gate_articles_interests: {e}")
+        return [], []
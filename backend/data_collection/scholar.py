@@ -1,20 +1,20 @@
+import json
 import sys
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from scholarly import scholarly
+from .cache import OfflineMiss, cached_fetch
 
 sys.stdout.reconfigure(encoding="utf-8")
 
-def get_scholar_articles_interests(name: str) -> Tuple[List[str], List[str]]:
+def get_scholar_author(name: str) -> Optional[dict]:
     """
-    Searches for an author on Google Scholar and retrieves their research interests and publications.
+    Searches for an author on Google Scholar and retrieves their detailed profile.
 
     Args:
         name (str): The name of the author to search for.
 
     Returns:
-        Tuple[List[str], List[str]]: A tuple containing two lists:
-            - A list of research interests (strings) of the author.
-            - A list of publication titles (strings) by the author.
+        Optional[dict]: The filled author profile, or None if no author was found.
     """
     search_query = scholarly.search_author(name)
 
@@ -22,11 +22,37 @@ def get_scholar_articles_interests(name: str) -> Tuple[List[str], List[str]]:
         # Retrieve the first search result (the most relevant author)
         author = next(search_query)
     except StopIteration:
-        print(f"SCHOLAR : No results found for author: {name}")
-        return [], []
+        return None
 
     # Retrieve detailed information about the author
-    author_info = scholarly.fill(author)
+    return scholarly.fill(author)
+
+def get_scholar_articles_interests(name: str) -> Tuple[List[str], List[str]]:
+    """
+    Searches for an author on Google Scholar and retrieves their research interests and publications.
+    The raw profile is kept in the response store, so it is parsed again without any request later on.
+
+    Args:
+        name (str): The name of the author to search for.
+
+    Returns:
+        Tuple[List[str], List[str]]: A tuple containing two lists:
+            - A list of research interests (strings) of the author.
+            - A list of publication titles (strings) by the author.
+    """
+    try:
+        # "null" (no author found, or blocked) is not stored, so the search is tried again next time
+        author_info = json.loads(cached_fetch(
+            "scholar", name, lambda: json.dumps(get_scholar_author(name), default=str),
+            lambda body: body != "null",
+        ))
+    except OfflineMiss as e:
+        print(f"SCHOLAR : {e}")
+        return [], []
+
+    if author_info is None:
+        print(f"SCHOLAR : No results found for author: {name}")
+        return [], []
 
     publications = [
         publication["bib"]["title"].strip().lower()
@@ -0,0 +1,115 @@
+import asyncio
+from django.test import SimpleTestCase
+from unittest.mock import patch, AsyncMock, MagicMock
+from playwright.async_api import Error as PlaywrightError
+from data_collection.browser import BrowserPool
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.url = None
+
+    async def goto(self, url, **kwargs):
+        if url == "crash":
+            self.browser.connected = False
+            raise PlaywrightError("Target crashed")
+        self.url = url
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages = []
+        self.route_handler = None
+
+    async def new_page(self):
+        page = FakePage(self.browser)
+        self.pages.append(page)
+        return page
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.context = None
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        self.context = FakeContext(self)
+        return self.context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = self
+        self.browsers = []
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+    async def stop(self):
+        pass
+
+
+class TestBrowserPool(SimpleTestCase):
+
+    def setUp(self):
+        self.playwright = FakePlaywright()
+        patcher = patch('data_collection.browser.async_playwright')
+        mock_async_playwright = patcher.start()
+        mock_async_playwright.return_value.start = AsyncMock(return_value=self.playwright)
+        self.addCleanup(patcher.stop)
+
+    def make_pool(self, **kwargs):
+        pool = BrowserPool(**kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_pages_are_reused(self):
+        pool = self.make_pool(recycle_after=100)
+        self.assertEqual(pool.content("https://example.com/1"), "<html>https://example.com/1</html>")
+        pool.content("https://example.com/2")
+        self.assertEqual(len(self.playwright.browsers), 1)
+        self.assertEqual(len(self.playwright.browsers[0].context.pages), 1)
+
+    def test_browser_is_recycled_after_n_pages(self):
+        pool = self.make_pool(recycle_after=2)
+        for i in range(5):
+            pool.content(f"https://example.com/{i}")
+        self.assertEqual(len(self.playwright.browsers), 3)
+        self.assertFalse(self.playwright.browsers[0].connected)
+
+    def test_browser_is_replaced_after_a_crash(self):
+        pool = self.make_pool()
+        with self.assertRaises(PlaywrightError):
+            pool.content("crash")
+        self.assertEqual(pool.content("https://example.com"), "<html>https://example.com</html>")
+        self.assertEqual(len(self.playwright.browsers), 2)
+
+    def test_heavy_resources_are_blocked(self):
+        pool = self.make_pool(blocked_resources=["image"])
+        pool.content("https://example.com")
+        handler = self.playwright.browsers[0].context.route_handler
+        for resource_type, aborted in (("image", True), ("document", False)):
+            route = MagicMock(abort=AsyncMock(), continue_=AsyncMock())
+            route.request.resource_type = resource_type
+            asyncio.run(handler(route))
+            self.assertEqual(route.abort.called, aborted)
+            self.assertEqual(route.continue_.called, not aborted)
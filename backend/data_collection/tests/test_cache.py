@@ -0,0 +1,99 @@
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+from django.test import TestCase, override_settings
+from data_collection.cache import OfflineMiss, ResponseStore, cached_fetch, get_response_store, set_offline
+from data_collection.gate import get_gate_profile_url
+from data_collection.scholar import get_scholar_articles_interests
+
+
+class ResponseStoreTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings = override_settings(COLLECTOR_CACHE_PATH=f"{self.tmp.name}/responses.sqlite3", COLLECTOR_CACHE_TTL=3600)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(set_offline, None)
+
+    def test_put_get_roundtrip(self):
+        store = ResponseStore(f"{self.tmp.name}/other.sqlite3")
+        store.put("dblp", "https://dblp.org/pid/1.xml", "<dblpperson/>", etag='"e"')
+        stored = store.get("dblp", "https://dblp.org/pid/1.xml")
+        self.assertEqual((stored.body, stored.etag, stored.last_modified), ("<dblpperson/>", '"e"', None))
+        self.assertIsNone(store.get("scholar", "https://dblp.org/pid/1.xml"))
+
+    def test_cached_fetch_reuses_fresh_responses(self):
+        fetch = MagicMock(return_value="body")
+        self.assertEqual(cached_fetch("scholar", "John Doe", fetch), "body")
+        self.assertEqual(cached_fetch("scholar", "John Doe", fetch), "body")
+        fetch.assert_called_once()
+
+    def test_stale_responses_are_fetched_again(self):
+        get_response_store().put("scholar", "John Doe", "old")
+        with override_settings(COLLECTOR_CACHE_TTL=0):
+            time.sleep(0.01)
+            self.assertEqual(cached_fetch("scholar", "John Doe", lambda: "new"), "new")
+        self.assertEqual(get_response_store().get("scholar", "John Doe").body, "new")
+
+    def test_failed_fetches_are_not_stored(self):
+        def fail():
+            raise RuntimeError("blocked")
+        with self.assertRaises(RuntimeError):
+            cached_fetch("researchgate", "https://www.researchgate.net/x", fail)
+        self.assertIsNone(get_response_store().get("researchgate", "https://www.researchgate.net/x"))
+
+    def test_empty_and_invalid_responses_are_not_stored(self):
+        self.assertEqual(cached_fetch("scholar", "John Doe", lambda: ""), "")
+        self.assertEqual(cached_fetch("scholar", "John Doe", lambda: "null", lambda body: body != "null"), "null")
+        self.assertIsNone(get_response_store().get("scholar", "John Doe"))
+        # A rejected response stored earlier is fetched again
+        get_response_store().put("scholar", "Jane Roe", "null")
+        self.assertEqual(cached_fetch("scholar", "Jane Roe", lambda: "{}", lambda body: body != "null"), "{}")
+        self.assertEqual(get_response_store().get("scholar", "Jane Roe").body, "{}")
+
+    @patch('data_collection.gate.get_browser_pool')
+    def test_blocked_and_empty_gate_pages_are_not_stored(self, mock_pool):
+        blocked = '<html><head><title>Just a moment...</title></head><body></body></html>'
+        empty = '<html><head><title>Search</title></head><body></body></html>'
+        found = '<html><body><div class="nova-legacy-v-entity-item__title"><a href="profile/1">John Doe</a></div></body></html>'
+        mock_pool.return_value.content.side_effect = [blocked, empty, found]
+
+        for _ in range(3):
+            url = get_gate_profile_url("John", "Doe")
+        self.assertEqual(url, "https://www.researchgate.net/profile/1")
+        # Stored once found
+        self.assertEqual(get_gate_profile_url("John", "Doe"), url)
+        self.assertEqual(mock_pool.return_value.content.call_count, 3)
+
+    @patch('data_collection.scholar.get_scholar_author', return_value=None)
+    def test_missing_scholar_author_is_not_stored(self, mock_author):
+        self.assertEqual(get_scholar_articles_interests("John Doe"), ([], []))
+        self.assertEqual(get_scholar_articles_interests("John Doe"), ([], []))
+        self.assertEqual(mock_author.call_count, 2)
+
+    def test_offline_replays_stale_responses_and_never_fetches(self):
+        get_response_store().put("scholar", "John Doe", "old")
+        fetch = MagicMock(return_value="new")
+        set_offline(True)
+        with override_settings(COLLECTOR_CACHE_TTL=0):
+            self.assertEqual(cached_fetch("scholar", "John Doe", fetch), "old")
+            with self.assertRaises(OfflineMiss):
+                cached_fetch("scholar", "Jane Roe", fetch)
+        fetch.assert_not_called()
+
+    @patch('data_collection.scholar.scholarly')
+    def test_scholar_profile_is_parsed_again_offline(self, mock_scholarly):
+        mock_scholarly.search_author.return_value = iter([MagicMock()])
+        mock_scholarly.fill.return_value = {
+            "publications": [{"bib": {"title": "First Publication"}}],
+            "interests": ["Graphs"],
+        }
+        online = get_scholar_articles_interests("John Doe")
+
+        set_offline(True)
+        mock_scholarly.reset_mock()
+        self.assertEqual(get_scholar_articles_interests("John Doe"), online)
+        self.assertEqual(get_scholar_articles_interests("Jane Roe"), ([], []))
+        mock_scholarly.search_author.assert_not_called()
@@ -1,40 +1,59 @@
-from django.test import TestCase
+import json
+import tempfile
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock
 import requests
-from data_collection.dblp import get_dblp_articles, get_html_content
-
+from data_collection.cache import get_response_store
+from data_collection.config import TIMEOUT
+from data_collection.dblp import get_dblp_articles, get_content, parse_person_xml, session
+
+PERSON_XML = """<?xml version="1.0" encoding="US-ASCII"?>
+<dblpperson name="Test Author" pid="00/0000" n="3">
+<person key="homepages/00/0000"><author pid="00/0000">Test Author</author></person>
+<r><article key="journals/x/A1"><author pid="00/0000">Test Author</author><title>First Article.</title></article></r>
+<r><inproceedings key="conf/y/B2"><author pid="00/0000">Test Author</author><title>Second <i>Article</i>.</title></inproceedings></r>
+<coauthors n="0"></coauthors>
+</dblpperson>"""
+
+
+def make_response(status_code=200, text="", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Error")
+    return response
+
+
+@override_settings(COLLECTOR_CACHE_PATH=None)
 class TestDblpFunctions(TestCase):
 
-    @patch('data_collection.dblp.requests.get')
-    def test_get_html_content_success(self, mock_get):
+    @patch('data_collection.dblp.session.get')
+    def test_get_content_success(self, mock_get):
         # Mock a successful request
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = "<html>Test HTML Content</html>"
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_response(text="<html>Test HTML Content</html>")
 
         url = "https://example.com"
-        result = get_html_content(url)
+        result = get_content(url)
         self.assertEqual(result, "<html>Test HTML Content</html>")
-        mock_get.assert_called_once_with(url)
+        mock_get.assert_called_once_with(url, headers={}, timeout=TIMEOUT)
 
-    @patch('data_collection.dblp.requests.get')
-    def test_get_html_content_failure(self, mock_get):
+    @patch('data_collection.dblp.session.get')
+    def test_get_content_failure(self, mock_get):
         # Mock a failed request
         mock_get.side_effect = requests.RequestException("Error fetching content")
 
         url = "https://example.com"
-        result = get_html_content(url)
+        result = get_content(url)
         self.assertEqual(result, "")  # Expecting an empty string on failure
-        mock_get.assert_called_once_with(url)
+        mock_get.assert_called_once_with(url, headers={}, timeout=TIMEOUT)
 
-    @patch('data_collection.dblp.get_html_content')
-    @patch('data_collection.dblp.requests.get')
-    def test_get_dblp_articles_success(self, mock_get, mock_get_html_content):
+    @patch('data_collection.dblp.get_content')
+    @patch('data_collection.dblp.session.get')
+    def test_get_dblp_articles_success(self, mock_get, mock_get_content):
         # Mock the DBLP API response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_get.return_value = make_response(text=json.dumps({
             "result": {
                 "hits": {
                     "hit": [
@@ -48,36 +67,28 @@ class TestDblpFunctions(TestCase):
                     ]
                 }
             }
-        }
-        mock_get.return_value = mock_response
+        }))
 
-        # Mock the HTML content fetch
-        mock_get_html_content.return_value = """
-        <html>
-            <div class="title">First Article</div>
-            <div class="title">Second Article</div>
-        </html>
-        """
+        # Mock the person record fetch
+        mock_get_content.return_value = PERSON_XML
 
         author_name = "Test Author"
         articles = get_dblp_articles(author_name)
 
         # Assert expected articles
-        self.assertEqual(articles, ["first article", "second article"])
+        self.assertEqual(articles, ["first article.", "second article."])
 
-        # Ensure the API call and HTML fetching were done
+        # Ensure the API call and the person record fetching were done
         mock_get.assert_called_once_with(
-            'https://dblp.org/search/author/api', headers={'Accept': 'application/json'}, params={'q': author_name, 'format': 'json'}
+            'https://dblp.org/search/author/api', headers={'Accept': 'application/json'},
+            params={'q': author_name, 'format': 'json'}, timeout=TIMEOUT
         )
-        mock_get_html_content.assert_called_once_with("https://dblp.org/test-author-url")
+        mock_get_content.assert_called_once_with("https://dblp.org/test-author-url.xml")
 
-    @patch('data_collection.dblp.requests.get')
+    @patch('data_collection.dblp.session.get')
     def test_get_dblp_articles_no_results(self, mock_get):
         # Mock an empty DBLP API response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"result": {"hits": {"hit": []}}}
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_response(text=json.dumps({"result": {"hits": {"hit": []}}}))
 
         author_name = "Unknown Author"
         articles = get_dblp_articles(author_name)
@@ -85,7 +96,7 @@ class TestDblpFunctions(TestCase):
         self.assertEqual(articles, [])
         mock_get.assert_called_once()
 
-    @patch('data_collection.dblp.requests.get')
+    @patch('data_collection.dblp.session.get')
     def test_get_dblp_articles_request_exception(self, mock_get):
         # Simulate a request exception
         mock_get.side_effect = requests.RequestException("Error fetching data")
@@ -94,4 +105,62 @@ class TestDblpFunctions(TestCase):
         articles = get_dblp_articles(author_name)
 
         self.assertEqual(articles, [])
-        mock_get.assert_called_once()
\ No newline at end of file
+        mock_get.assert_called_once()
+
+    def test_parse_person_xml_invalid(self):
+        self.assertEqual(parse_person_xml(""), [])
+        self.assertEqual(parse_person_xml("<html><div class='title'>x</div>"), [])
+
+    def test_session_retries_rate_limits_and_server_errors(self):
+        retry = session.get_adapter("https://dblp.org").max_retries
+        self.assertGreater(retry.total, 0)
+        self.assertIn(429, retry.status_forcelist)
+        self.assertIn(503, retry.status_forcelist)
+        self.assertTrue(retry.respect_retry_after_header)
+
+
+class TestDblpConditionalRequests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # Stored responses are always stale, so every fetch revalidates
+        settings = override_settings(COLLECTOR_CACHE_PATH=f"{self.tmp.name}/responses.sqlite3", COLLECTOR_CACHE_TTL=-1)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.store = get_response_store()
+
+    @patch('data_collection.dblp.session.get')
+    def test_unchanged_page_is_served_from_store(self, mock_get):
+        url = "https://dblp.org/pid/00/0000.xml"
+        mock_get.return_value = make_response(
+            text=PERSON_XML, headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        )
+        self.assertEqual(get_content(url), PERSON_XML)
+
+        mock_get.return_value = make_response(status_code=304)
+        self.assertEqual(get_content(url), PERSON_XML)
+        mock_get.assert_called_with(url, headers={
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+        }, timeout=TIMEOUT)
+
+    @patch('data_collection.dblp.session.get')
+    def test_changed_page_replaces_stored_copy(self, mock_get):
+        url = "https://dblp.org/pid/00/0000.xml"
+        mock_get.return_value = make_response(text="<old/>", headers={"ETag": '"v1"'})
+        get_content(url)
+        mock_get.return_value = make_response(text="<new/>", headers={"ETag": '"v2"'})
+        self.assertEqual(get_content(url), "<new/>")
+
+        stored = self.store.get("dblp", url)
+        self.assertEqual((stored.body, stored.etag), ("<new/>", '"v2"'))
+
+    @patch('data_collection.dblp.session.get')
+    def test_fresh_page_is_served_without_request(self, mock_get):
+        url = "https://dblp.org/pid/00/0000.xml"
+        self.store.put("dblp", url, PERSON_XML, etag='"abc"')
+        with override_settings(COLLECTOR_CACHE_TTL=3600):
+            self.assertEqual(get_content(url), PERSON_XML)
+        mock_get.assert_not_called()
+
@@ -24,17 +24,25 @@ class TestGateFunctions(TestCase):
         profile_names = ["doe", "john"]
         self.assertTrue(names_match(first_names, last_names, profile_names))
 
-    @patch('data_collection.gate.sync_playwright')
-    def test_get_gate_profile_url(self, mock_playwright):
-        mock_browser = MagicMock()
-        mock_page = MagicMock()
-        
-        # Mocking the Playwright context
-        mock_playwright.return_value.__enter__.return_value.chromium.launch.return_value = mock_browser
-        mock_browser.new_page.return_value = mock_page
-        mock_page.goto.return_value = None
-        mock_page.content.return_value = '<html><div class="nova-legacy-v-entity-item__title"><a href="profile/1">John Doe</a></div></html>'
+    @patch('data_collection.gate.fetch_page_content')
+    def test_get_gate_profile_url(self, mock_fetch_page_content):
+        mock_fetch_page_content.return_value = '<html><div class="nova-legacy-v-entity-item__title"><a href="profile/1">John Doe</a></div></html>'
 
         result = get_gate_profile_url("John", "Doe")
         expected_url = "https://www.researchgate.net/profile/1"
-        self.assertEqual(result, expected_url)
\ No newline at end of file
+        self.assertEqual(result, expected_url)
+
+    @patch('data_collection.gate.fetch_page_content')
+    @patch('data_collection.gate.get_gate_profile_url')
+    def test_get_gate_articles_interests(self, mock_get_profile_url, mock_fetch_page_content):
+        mock_get_profile_url.return_value = "https://www.researchgate.net/profile/1"
+        mock_fetch_page_content.return_value = (
+            '<html><div class="js-target-skills"><div class="nova-legacy-l-flex__item">Data Mining</div></div>'
+            '<div class="nova-legacy-v-publication-item__title">A Paper</div></html>'
+        )
+
+        interests, articles = get_gate_articles_interests("John", "Doe")
+        self.assertEqual(interests, ["data mining"])
+        self.assertEqual(articles, ["a paper"])
+        mock_fetch_page_content.assert_called_once()
+        self.assertEqual(mock_fetch_page_content.call_args.args[0], "https://www.researchgate.net/profile/1")
@@ -1,7 +1,8 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock
 from data_collection.scholar import get_scholar_articles_interests
 
+@override_settings(COLLECTOR_CACHE_PATH=None)
 class TestScholarFunctions(TestCase):
     
     @patch('data_collection.scholar.scholarly.search_author')
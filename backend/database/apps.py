@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class DatabaseConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'database'
+
+    def ready(self):
+        # Invalidate the cached API responses when the models change
+        from . import signals  # noqa: F401
@@ -0,0 +1,248 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .cache import bump_model_versions
+
+# Rows per INSERT/UPDATE statement
+BULK_BATCH_SIZE = 1000
+
+
+def parse_pk(model, value):
+    """
+    Returns:
+        The primary key `value` converted to the type of the model's key, or None if it is not a valid key.
+    """
+    if value is None or isinstance(value, (dict, list, bool)):
+        return None
+    try:
+        return model._meta.pk.to_python(value)
+    except (DjangoValidationError, TypeError, ValueError):
+        return None
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key relation reading its object from the lookups of the enclosing `BulkListSerializer`,
+    so that a batch resolves each related model in one query instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        lookups = getattr(self.root, 'bulk_lookups', None)
+        model = self.get_queryset().model
+        pk = parse_pk(model, data)
+        if lookups is None or model not in lookups or pk is None:
+            return super().to_internal_value(data)
+        try:
+            return lookups[model][pk]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer validating and writing a batch of model instances at once.
+
+    The related objects of the whole batch are fetched with one query per related model before the
+    items are validated. `create` and `update` write with `bulk_create`/`bulk_update` and fill the
+    many-to-many through tables directly, in one transaction. Validation errors are returned per item,
+    as a list aligned with the input (`{}` for a valid item).
+    """
+
+    def relation_fields(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, BulkPrimaryKeyRelatedField]: The writable relation fields of the child, by field name.
+        """
+        relations = {}
+        for name, field in self.child.fields.items():
+            if field.read_only:
+                continue
+            relation = getattr(field, 'child_relation', field)
+            if isinstance(relation, BulkPrimaryKeyRelatedField):
+                relations[name] = relation
+        return relations
+
+    def load_related(self, data: List) -> None:
+        """
+        Fetch every object referenced by the batch, one query per related model.
+
+        Args:
+            data (List[dict]): The submitted items.
+        """
+        wanted = defaultdict(set)
+        relations = self.relation_fields()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            for name, relation in relations.items():
+                values = item.get(name)
+                model = relation.get_queryset().model
+                for value in (values if isinstance(values, list) else [values]):
+                    pk = parse_pk(model, value)
+                    if pk is not None:
+                        wanted[model].add(pk)
+        querysets = {relation.get_queryset().model: relation.get_queryset() for relation in relations.values()}
+        self.bulk_lookups = {model: querysets[model].in_bulk(pks) for model, pks in wanted.items()}
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='not_a_list')
+        if not data and not self.allow_empty:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages['empty']]}, code='empty')
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages['max_length'].format(max_length=self.max_length)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='max_length')
+
+        self.load_related(data)
+        # An update validates each item against its own instance, given in input order
+        instances = self.instance if self.instance is not None else [None] * len(data)
+        validated, errors = [], []
+        try:
+            for item, instance in zip(data, instances):
+                self.child.instance = instance
+                try:
+                    validated.append(self.child.run_validation(item))
+                    errors.append({})
+                except serializers.ValidationError as exc:
+                    errors.append(exc.detail)
+        finally:
+            self.child.instance = None
+            self.bulk_lookups = None
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def many_to_many_names(self, validated_data: List[dict]) -> List[str]:
+        model = self.child.Meta.model
+        names = {field.name for field in model._meta.many_to_many}
+        return sorted({name for attrs in validated_data for name in attrs if name in names})
+
+    def write_many_to_many(self, instances: List, relations: List[dict], names: List[str], replace: bool) -> None:
+        """
+        Fill the through tables of the batch with one INSERT per relation (and one DELETE when replacing).
+
+        Args:
+            instances (List[Model]): The saved instances.
+            relations (List[dict]): For each instance, the related objects by field name.
+            names (List[str]): The many-to-many fields written.
+            replace (bool): Whether the current relations of the instances are removed first.
+        """
+        model = self.child.Meta.model
+        for name in names:
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            owners = [instance for instance, related in zip(instances, relations) if name in related]
+            if replace:
+                through.objects.filter(**{f'{source}__in': owners}).delete()
+            rows = []
+            for instance, related in zip(instances, relations):
+                pks = dict.fromkeys(obj.pk for obj in related.get(name, ()))
+                rows.extend(through(**{f'{source}_id': instance.pk, f'{target}_id': pk}) for pk in pks)
+            through.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+            bump_model_versions(field.related_model)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        names = self.many_to_many_names(validated_data)
+        instances, relations = [], []
+        for attrs in validated_data:
+            relations.append({name: attrs.pop(name) for name in names if name in attrs})
+            instances.append(model(**attrs))
+        with transaction.atomic():
+            model.objects.bulk_create(instances, batch_size=BULK_BATCH_SIZE)
+            self.write_many_to_many(instances, relations, names, replace=False)
+            bump_model_versions(model)
+        return instances
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        names = self.many_to_many_names(validated_data)
+        relations, fields = [], set()
+        for instance, attrs in zip(instances, validated_data):
+            relations.append({name: attrs.pop(name) for name in names if name in attrs})
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+        with transaction.atomic():
+            if fields:
+                model.objects.bulk_update(instances, sorted(fields), batch_size=BULK_BATCH_SIZE)
+            self.write_many_to_many(instances, relations, names, replace=True)
+            bump_model_versions(model)
+        return instances
+
+
+class BulkSerializerMixin:
+    """
+    ModelSerializer mixin resolving primary key relations through `BulkListSerializer` lookups.
+    The serializer's Meta sets `list_serializer_class = BulkListSerializer`.
+    """
+    serializer_related_field = BulkPrimaryKeyRelatedField
+
+
+class BulkWriteMixin:
+    """
+    Viewset mixin adding `/bulk/`: a list of objects is created (POST) or updated (PUT, PATCH for a
+    partial update, each item with its `id`) in one transaction, or nothing is written and the errors
+    are returned per item. The serializer must use `BulkListSerializer`.
+    """
+
+    @action(detail=False, methods=['post', 'put', 'patch'])
+    def bulk(self, request):
+        """
+        Create or update up to BULK_MAX_ITEMS objects at once.
+        """
+        items = request.data
+        kwargs = {'data': items, 'many': True, 'max_length': settings.BULK_MAX_ITEMS}
+        if request.method != 'POST' and isinstance(items, list):
+            instances, errors = self.bulk_instances(items)
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            kwargs.update(instance=instances, partial=request.method == 'PATCH')
+
+        serializer = self.get_serializer(**kwargs)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        saved = serializer.save()
+
+        # Read back with the viewset's prefetching, in input order
+        pks = [instance.pk for instance in saved]
+        instances = self.get_queryset().in_bulk(pks)
+        data = self.get_serializer([instances[pk] for pk in pks], many=True).data
+        return Response(data, status=status.HTTP_201_CREATED if request.method == 'POST' else status.HTTP_200_OK)
+
+    def bulk_instances(self, items: List) -> Tuple[List, List[dict]]:
+        """
+        Fetch the instances updated by a batch, in one query.
+
+        Args:
+            items (List[dict]): The submitted items, each with its `id`.
+
+        Returns:
+            Tuple[List[Model], List[dict]]: The instances in input order, and the errors of each item.
+        """
+        queryset = self.get_queryset()
+        pks = [parse_pk(queryset.model, item.get('id')) if isinstance(item, dict) else None for item in items]
+        found = queryset.in_bulk([pk for pk in pks if pk is not None])
+        instances, errors, seen = [], [], set()
+        for item, pk in zip(items, pks):
+            if not isinstance(item, dict):
+                errors.append({api_settings.NON_FIELD_ERRORS_KEY: ['Expected an object.']})
+            elif pk is None:
+                errors.append({'id': ['A valid id is required.']})
+            elif pk not in found:
+                errors.append({'id': ['Not found.']})
+            elif pk in seen:
+                errors.append({'id': ['Duplicate id in the batch.']})
+            else:
+                errors.append({})
+            seen.add(pk)
+            instances.append(found.get(pk))
+        return instances, errors
@@ -0,0 +1,115 @@
+import hashlib
+import time
+from typing import Iterable, List
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_PREFIX = 'api:version:'
+RESPONSE_PREFIX = 'api:response:'
+
+
+def version_key(model) -> str:
+    return VERSION_PREFIX + model._meta.label_lower
+
+
+def model_versions(models: Iterable) -> List[int]:
+    """
+    Return the current version of several models, in one cache lookup.
+
+    A missing version (never set, or evicted) starts from the current time, so that it never
+    matches a version seen before.
+
+    Args:
+        models (Iterable): The model classes.
+
+    Returns:
+        List[int]: Their versions, in the same order.
+    """
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_model_versions(*models) -> None:
+    """
+    Invalidate the cached responses built from some models.
+
+    The versions are bumped at once and again when the current transaction commits, so that
+    the responses cached while it was open are dropped as well. Signals call this for single-row
+    changes; code writing with bulk_create or update() must call it explicitly.
+
+    Args:
+        *models: The model classes that changed.
+    """
+    def bump():
+        for model in models:
+            try:
+                cache.incr(version_key(model))
+            except ValueError:
+                cache.set(version_key(model), time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def matches_etag(request, etag: str) -> bool:
+    """
+    Check the If-None-Match header of a request against an ETag.
+
+    Args:
+        request (Request): The request.
+        etag (str): The quoted ETag of the current response.
+
+    Returns:
+        bool: True if the client already has this response.
+    """
+    header = request.headers.get('If-None-Match', '')
+    tags = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return etag in tags or '*' in tags
+
+
+class CachedResponseMixin:
+    """
+    Viewset mixin caching the `list` and `retrieve` responses until one of their models changes.
+
+    The cache key combines the absolute URL, its query parameters, the response format and the version of
+    the viewset model and of the models in `cache_models`. The same key gives the ETag, so a client
+    sending it back in If-None-Match gets a 304 without any query nor serialization.
+    """
+    cache_models = ()
+
+    def cached_response(self, handler, request, *args, **kwargs) -> Response:
+        models = [self.queryset.model, *self.cache_models]
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        # Scheme and host too: the pagination links of the response are absolute URLs
+        url = request.build_absolute_uri(request.path)
+        source = f'{url}?{query}|{request.accepted_renderer.format}|{model_versions(models)}'
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        etag = f'"{digest}"'
+        if matches_etag(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        data = cache.get(RESPONSE_PREFIX + digest)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(RESPONSE_PREFIX + digest, response.data, settings.API_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
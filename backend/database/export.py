@@ -0,0 +1,222 @@
+import csv
+import datetime
+import io
+import json
+import uuid
+from typing import Any, Callable, Dict, Iterator, List
+from django.conf import settings
+from django.db import models
+from django.db.models import Prefetch
+from .models import Doctorant, Expert, Publication
+
+# Exported tables, by name
+EXPORT_MODELS = {
+    'experts': Expert,
+    'publications': Publication,
+    'doctorants': Doctorant,
+}
+
+# Many-to-many fields exported as the list of the related names
+RELATED_LABELS = {
+    Expert: {'mots_cles': 'mot_cle'},
+    Doctorant: {'laboratoires': 'nom'},
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def export_columns(model) -> List[str]:
+    """
+    Returns:
+        List[str]: The exported columns of a model: its fields (foreign keys as `<name>_id`) then its
+            many-to-many fields.
+    """
+    return [field.attname for field in model._meta.concrete_fields] + list(RELATED_LABELS.get(model, {}))
+
+
+def plain_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(model, chunk_size: int = None) -> Iterator[Dict[str, Any]]:
+    """
+    Read every row of a model with a server-side cursor, `chunk_size` rows at a time.
+
+    Args:
+        model: The model class.
+        chunk_size (int, optional): The rows fetched at once. Defaults to EXPORT_CHUNK_SIZE.
+
+    Yields:
+        Dict[str, Any]: One row per instance, with JSON-compatible values.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    related = RELATED_LABELS.get(model, {})
+    queryset = model.objects.order_by('pk').prefetch_related(*(
+        Prefetch(name, queryset=model._meta.get_field(name).related_model.objects.only('pk', label))
+        for name, label in related.items()
+    ))
+    attnames = [field.attname for field in model._meta.concrete_fields]
+    # The related rows are prefetched once per chunk
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        row = {attname: plain_value(getattr(instance, attname)) for attname in attnames}
+        for name, label in related.items():
+            row[name] = [getattr(related_instance, label) for related_instance in getattr(instance, name).all()]
+        yield row
+
+
+def batched(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(model, rows: Iterator[Dict[str, Any]], chunk_size: int) -> Iterator[bytes]:
+    """
+    Encode rows as CSV, lists and dictionaries being written as JSON.
+
+    Yields:
+        bytes: The header, then the rows of each chunk.
+    """
+    columns = export_columns(model)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+    for batch in batched(rows, chunk_size):
+        for row in batch:
+            writer.writerow([
+                json.dumps(row[column], ensure_ascii=False) if isinstance(row[column], (list, dict)) else row[column]
+                for column in columns
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def stream_jsonl(model, rows: Iterator[Dict[str, Any]], chunk_size: int) -> Iterator[bytes]:
+    """
+    Encode rows as JSON Lines.
+
+    Yields:
+        bytes: The rows of each chunk, one JSON object per line.
+    """
+    for batch in batched(rows, chunk_size):
+        yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in batch).encode('utf-8')
+
+
+class ChunkSink:
+    """
+    Write-only file collecting the bytes written since the last `take`, for streaming a Parquet file.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def parquet_schema(model):
+    import pyarrow as pa
+
+    types = {
+        models.IntegerField: pa.int64(),
+        models.BooleanField: pa.bool_(),
+        models.FloatField: pa.float64(),
+    }
+    fields = []
+    for field in model._meta.concrete_fields:
+        arrow_type = next((t for cls, t in types.items() if isinstance(field, cls)), pa.string())
+        fields.append(pa.field(field.attname, arrow_type))
+    fields.extend(pa.field(name, pa.list_(pa.string())) for name in RELATED_LABELS.get(model, {}))
+    return pa.schema(fields)
+
+
+def stream_parquet(model, rows: Iterator[Dict[str, Any]], chunk_size: int) -> Iterator[bytes]:
+    """
+    Encode rows as a Parquet file, one row group per chunk. JSON fields are stored as JSON text.
+
+    Yields:
+        bytes: The file, as each row group is written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(model)
+    json_columns = {field.attname for field in model._meta.concrete_fields if isinstance(field, models.JSONField)}
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    for batch in batched(rows, chunk_size):
+        for row in batch:
+            for column in json_columns:
+                row[column] = json.dumps(row[column], ensure_ascii=False) if row[column] is not None else None
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+EXPORT_FORMATS: Dict[str, Callable] = {
+    'csv': stream_csv,
+    'jsonl': stream_jsonl,
+    'parquet': stream_parquet,
+}
+
+
+def stream_export(name: str, export_format: str, chunk_size: int = None) -> Iterator[bytes]:
+    """
+    Export a whole table, in constant memory.
+
+    Args:
+        name (str): The table, a key of EXPORT_MODELS.
+        export_format (str): 'csv', 'jsonl' or 'parquet'.
+        chunk_size (int, optional): The rows read and encoded at once. Defaults to EXPORT_CHUNK_SIZE.
+
+    Returns:
+        Iterator[bytes]: The encoded file, chunk by chunk.
+
+    Raises:
+        ImportError: For the Parquet format, when pyarrow is not installed.
+    """
+    if export_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("The Parquet export requires pyarrow (pip install pyarrow).")
+    model = EXPORT_MODELS[name]
+    encode = EXPORT_FORMATS[export_format]
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    return encode(model, iter_rows(model, chunk_size), chunk_size)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from data_classification.assign import (
+    EXPERT_SLOTS, UnknownDoctorants, assign_experts, find_doctorants, pending_doctorants, save_assignment,
+)
+
+class Command(BaseCommand):
+    help = 'Propose reviewers (Expertise drafts) for the theses of a cohort of doctorants.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('doctorants', nargs='*',
+                            help='Ids of the doctorants (default: enrolled doctorants with a thesis title and no expertise).')
+        parser.add_argument('--reviewers', type=int, default=None,
+                            help='Reviewers per thesis, 2 or 3 (default: ASSIGNMENT_REVIEWERS).')
+        parser.add_argument('--capacity', type=int, default=None,
+                            help='Theses given to one expert (default: ASSIGNMENT_CAPACITY).')
+        parser.add_argument('--max-expertises', type=int, default=None,
+                            help='Highest nombre_expertises of an assigned expert (default: ASSIGNMENT_MAX_EXPERTISES).')
+        parser.add_argument('--commit', action='store_true',
+                            help='Save the expertises instead of only printing them.')
+
+    def handle(self, *args, **kwargs):
+        doctorants = pending_doctorants()
+        if kwargs['doctorants']:
+            try:
+                doctorants = find_doctorants(kwargs['doctorants'])
+            except UnknownDoctorants as e:
+                raise CommandError(e)
+        try:
+            result = assign_experts(
+                doctorants,
+                reviewers=kwargs['reviewers'],
+                capacity=kwargs['capacity'],
+                max_expertises=kwargs['max_expertises'],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        for draft, scores in zip(result.drafts, result.scores):
+            experts = [getattr(draft, slot) for slot in EXPERT_SLOTS if getattr(draft, slot + '_id')]
+            reviewers = ', '.join(f'{expert} ({score:.2f})' for expert, score in zip(experts, scores))
+            self.stdout.write(f'{draft.doctorant}: {reviewers}')
+        for doctorant in result.unassigned:
+            self.stdout.write(self.style.WARNING(f'{doctorant}: no reviewers assigned (missing title or not enough eligible experts)'))
+
+        if kwargs['commit']:
+            save_assignment(result.drafts)
+            self.stdout.write(self.style.SUCCESS(f'{len(result.drafts)} expertises saved'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(result.drafts)} expertises proposed (use --commit to save them)'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from data_classification.index import rebuild_expert_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the expert embedding index used for thesis matching.'
+
+    def handle(self, *args, **kwargs):
+        index = rebuild_expert_index()
+        self.stdout.write(self.style.SUCCESS(f'Expert index built with {len(index)} experts'))
@@ -0,0 +1,35 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from database.export import EXPORT_FORMATS, EXPORT_MODELS, stream_export
+
+class Command(BaseCommand):
+    help = 'Export a whole table (experts, publications, doctorants) as CSV, JSON Lines or Parquet, in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(EXPORT_MODELS), help='The table to export.')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv',
+                            help='The file format (default: csv).')
+        parser.add_argument('--output', type=str,
+                            help='The output file (default: <table>.<format>, "-" for the standard output).')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows read and written at once (default: EXPORT_CHUNK_SIZE).')
+
+    def handle(self, *args, **kwargs):
+        table, export_format = kwargs['table'], kwargs['format']
+        output = kwargs['output'] or f'{table}.{export_format}'
+        try:
+            content = stream_export(table, export_format, kwargs['chunk_size'])
+        except ImportError as e:
+            raise CommandError(e)
+
+        if output == '-':
+            for chunk in content:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        size = 0
+        with open(output, 'wb') as file:
+            for chunk in content:
+                file.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f'{table} exported to {output} ({size} bytes)'))
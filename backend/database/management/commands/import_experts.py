@@ -1,43 +1,153 @@
+import csv
+import json
+import os
 import pandas as pd
 from django.core.management.base import BaseCommand
-from database.models import Pays, Etablissement, Expert, Publication, MotCle
-from data_classification.fetch import fetch_researcher_data
+from django.db import transaction
+from database.cache import bump_model_versions
+from database.models import Pays, Etablissement, Expert, Publication, MotCle, MotCleAlias
+from data_classification.fetch import iter_researcher_data
+from data_classification.signals import schedule_update
+from data_collection.cache import get_response_store, set_offline
+from data_cleaning.keywords import canonical_form, normalize_keyword
+
+REPORT_FIELDS = ['row', 'nom', 'prenom', 'status', 'publications', 'interests', 'error']
 
 class Command(BaseCommand):
     help = 'Import experts from an Excel file.'
 
     def add_arguments(self, parser):
         parser.add_argument('file_path', type=str, help='The path to the Excel file.')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of experts fetched concurrently (default: 1).')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip the rows already imported according to the journal.')
+        parser.add_argument('--journal', type=str,
+                            help='Journal of imported rows (default: <file_path>.journal).')
+        parser.add_argument('--report', type=str,
+                            help='CSV report with the status of each row (default: <file_path>.report.csv).')
+        parser.add_argument('--offline', action='store_true',
+                            help='Replay the stored source responses without any network access; titles are only classified '
+                                 'from the classification memo or by a local CLASSIFIER_BACKEND.')
 
     def handle(self, *args, **kwargs):
+        if kwargs['offline']:
+            if get_response_store() is None:
+                self.stderr.write(self.style.ERROR('--offline needs COLLECTOR_CACHE_PATH to be set'))
+                return
+            set_offline(True)
+        try:
+            self.import_file(**kwargs)
+        finally:
+            if kwargs['offline']:
+                set_offline(None)
+
+    def import_file(self, **kwargs):
         file_path = kwargs['file_path']
+        journal_path = kwargs['journal'] or f'{file_path}.journal'
+        report_path = kwargs['report'] or f'{file_path}.report.csv'
+        resume = kwargs['resume']
 
         try:
             data = pd.read_excel(file_path)
-            for _, row in data.iterrows():
-                etablissement_name = row.get('etablissement', '').strip()
-                ville = row.get('ville', '').strip()
-                pays_name = row.get('pays', '').strip()
-
-                pays = self.get_or_create_pays(pays_name)
-                etablissement = self.get_or_create_etablissement(etablissement_name, ville, pays)
+        except FileNotFoundError:
+            self.stderr.write(self.style.ERROR('File not found'))
+            return
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(str(e)))
+            return
 
-                expert_name = row.get('nom', '').strip()
-                expert_prenom = row.get('prenom', '').strip()
+        done = self.read_journal(journal_path) if resume else set()
+        rows = [
+            (index, row) for index, row in data.iterrows()
+            if self.row_key(index, row) not in done
+        ]
+        if done:
+            self.stdout.write(f'Resuming: {len(data) - len(rows)} rows already imported')
 
-                publications, interests = fetch_researcher_data(expert_prenom, expert_name)
-                mot_cle_list = self.get_create_interests(interests)
-                expert = self.create_or_update_expert(row, expert_name, expert_prenom, etablissement, publications)
+        new_report = not (resume and os.path.exists(report_path))
+        failed = 0
+        with open(journal_path, 'a' if resume else 'w', encoding='utf-8') as journal, \
+                open(report_path, 'w' if new_report else 'a', newline='', encoding='utf-8') as report_file:
+            report = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+            if new_report:
+                report.writeheader()
 
-                expert.mots_cles.set(mot_cle_list)
-                self.add_publications(expert, publications)
+            # Sources are queried concurrently across researchers; database writes stay in this thread
+            rows_by_index = dict(rows)
+            researchers = []
+            for index, row in rows:
+                expert_name, expert_prenom = self.row_names(row)
+                researchers.append((index, expert_prenom, expert_name))
+            for index, result in iter_researcher_data(researchers, kwargs['workers']):
+                row = rows_by_index[index]
+                expert_name, expert_prenom = self.row_names(row)
+                status = {'row': index, 'nom': expert_name, 'prenom': expert_prenom}
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    publications, interests = result
+                    self.import_row(row, publications, interests)
+                except Exception as e:
+                    failed += 1
+                    status.update(status='failed', error=str(e))
+                    self.stderr.write(self.style.ERROR(f'{expert_name} {expert_prenom}: {e}'))
+                else:
+                    status.update(status='imported', publications=len(publications), interests=len(interests))
+                    journal.write(json.dumps({'key': self.row_key(index, row)}) + '\n')
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                report.writerow(status)
+                report_file.flush()
 
+        if failed:
+            self.stderr.write(self.style.WARNING(f'{failed} experts could not be imported, see {report_path}'))
+        else:
             self.stdout.write(self.style.SUCCESS('Experts imported successfully'))
 
-        except FileNotFoundError:
-            self.stderr.write(self.style.ERROR('File not found'))
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(str(e)))
+    @staticmethod
+    def cell(row, column):
+        value = row.get(column, '')
+        return '' if pd.isna(value) else str(value).strip()
+
+    def row_names(self, row):
+        return self.cell(row, 'nom'), self.cell(row, 'prenom')
+
+    def row_key(self, index, row):
+        expert_name, expert_prenom = self.row_names(row)
+        return f'{index}:{expert_name}:{expert_prenom}'
+
+    def read_journal(self, journal_path):
+        if not os.path.exists(journal_path):
+            return set()
+        done = set()
+        with open(journal_path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    done.add(json.loads(line)['key'])
+                except (ValueError, KeyError):
+                    # A line cut short by a crash
+                    continue
+        return done
+
+    def import_row(self, row, publications, interests):
+        etablissement_name = self.cell(row, 'etablissement')
+        ville = self.cell(row, 'ville')
+        pays_name = self.cell(row, 'pays')
+
+        pays = self.get_or_create_pays(pays_name)
+        etablissement = self.get_or_create_etablissement(etablissement_name, ville, pays)
+
+        expert_name, expert_prenom = self.row_names(row)
+        with transaction.atomic():
+            mot_cle_list = self.get_create_interests(interests)
+            expert = self.create_or_update_expert(row, expert_name, expert_prenom, etablissement, publications)
+
+            expert.mots_cles.set(mot_cle_list)
+            self.add_publications(expert, publications)
+            # bulk_create sends no post_save, so refresh the expert in the matching index explicitly
+            schedule_update([expert.pk])
+            bump_model_versions(MotCle, Publication)
 
     def get_or_create_pays(self, pays_name):
         pays, _ = Pays.objects.get_or_create(pays=pays_name)
@@ -52,15 +162,53 @@ class Command(BaseCommand):
         return etablissement
 
     def get_create_interests(self, interests):
-        mot_cle_list = []
-        for interest, source in interests:
-            if interest.strip():
-                mot_cle, _ = MotCle.objects.update_or_create(
-                    mot_cle=interest,
-                    defaults={'source': source}
-                )
-                mot_cle_list.append(mot_cle)
-        return mot_cle_list
+        # Spellings already merged into a keyword, or sharing its canonical form, are resolved
+        # through its aliases; a new keyword keeps the spelling it was found with
+        spellings = {}
+        for interest, source, _ in interests:
+            spelling = normalize_keyword(interest)
+            if spelling:
+                spellings.setdefault(spelling, (interest.strip(), source))
+        forms = {spelling: canonical_form(interest) for spelling, (interest, _) in spellings.items()}
+        known = dict(
+            MotCleAlias.objects.filter(alias__in=list(spellings) + list(forms.values()))
+            .values_list('alias', 'mot_cle__mot_cle')
+        )
+        sources = {}
+        aliases = {}
+        for spelling, (interest, source) in spellings.items():
+            form = forms[spelling]
+            name = known.get(spelling) or known.get(form) or aliases.get(form) or interest
+            sources[name] = source
+            aliases[spelling] = name
+            aliases.setdefault(form, name)
+        if not sources:
+            return []
+
+        existing = MotCle.objects.in_bulk(list(sources), field_name='mot_cle')
+        changed = []
+        for name, mot_cle in existing.items():
+            if mot_cle.source != sources[name]:
+                mot_cle.source = sources[name]
+                changed.append(mot_cle)
+        MotCle.objects.bulk_update(changed, ['source'])
+
+        missing = [name for name in sources if name not in existing]
+        if missing:
+            # update_conflicts covers rows created concurrently since the lookup
+            MotCle.objects.bulk_create(
+                [MotCle(mot_cle=name, source=sources[name]) for name in missing],
+                update_conflicts=True,
+                unique_fields=['mot_cle'],
+                update_fields=['source'],
+            )
+            existing.update(MotCle.objects.in_bulk(missing, field_name='mot_cle'))
+
+        MotCleAlias.objects.bulk_create(
+            [MotCleAlias(alias=alias, mot_cle=existing[name]) for alias, name in aliases.items() if alias not in known],
+            ignore_conflicts=True,
+        )
+        return [existing[name] for name in sources]
 
     def create_or_update_expert(self, row, expert_name, expert_prenom, etablissement, publications):
         expert, _ = Expert.objects.update_or_create(
@@ -78,9 +226,14 @@ class Command(BaseCommand):
         return expert
 
     def add_publications(self, expert, publications):
-        for title, source in publications:
-            Publication.objects.update_or_create(
-                titre=title,
-                expert=expert,
-                defaults={'source': source}
-            )
+        sources = {title: (source, all_sources) for title, source, all_sources in publications}
+        Publication.objects.bulk_create(
+            [
+                Publication(titre=title, expert=expert, source=source, sources=all_sources)
+                for title, (source, all_sources) in sources.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['titre', 'expert'],
+            update_fields=['source', 'sources'],
+            batch_size=500,
+        )
@@ -0,0 +1,77 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from database.cache import bump_model_versions
+from database.models import Expert, MotCle, MotCleAlias
+from data_cleaning.keywords import cluster_keywords, normalize_keyword
+from data_classification.signals import schedule_update
+
+class Command(BaseCommand):
+    help = 'Merge duplicate and synonymous keywords (MotCle) into canonical keywords with aliases.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=None,
+                            help='Cosine similarity above which two keywords are merged (default: KEYWORD_MERGE_THRESHOLD).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only print the groups that would be merged.')
+
+    def handle(self, *args, **kwargs):
+        threshold = kwargs['threshold'] or settings.KEYWORD_MERGE_THRESHOLD
+        mots_cles = list(MotCle.objects.annotate(usage=Count('experts_mots_cles')))
+        counts = {mot_cle.mot_cle: mot_cle.usage for mot_cle in mots_cles}
+        representative = cluster_keywords(list(counts), counts, threshold)
+
+        groups = defaultdict(list)
+        for mot_cle in mots_cles:
+            if mot_cle.mot_cle in representative:
+                groups[representative[mot_cle.mot_cle]].append(mot_cle)
+        # A keyword alone in its group keeps its row and spelling
+        groups = {canonical: members for canonical, members in groups.items() if len(members) > 1}
+
+        for canonical, members in groups.items():
+            self.stdout.write(f'{self.kept(members).mot_cle} <- {", ".join(m.mot_cle for m in members)}')
+        if kwargs['dry_run'] or not groups:
+            self.stdout.write(self.style.SUCCESS(f'{len(groups)} keywords to merge'))
+            return
+
+        with transaction.atomic():
+            removed, experts = self.merge(groups)
+        # bulk_create sends no m2m_changed, so refresh the experts in the matching index explicitly
+        schedule_update(experts)
+        bump_model_versions(MotCle, Expert)
+        self.stdout.write(self.style.SUCCESS(f'{len(groups)} keywords merged, {removed} duplicates removed'))
+
+    def kept(self, members):
+        """
+        Returns:
+            MotCle: The keyword of a group that absorbs the others: the most used spelling,
+                capitalized ones first on a tie.
+        """
+        return max(members, key=lambda m: (m.usage, m.mot_cle != m.mot_cle.lower(), m.mot_cle))
+
+    def merge(self, groups):
+        through = Expert.mots_cles.through
+        member_ids = [m.id for members in groups.values() for m in members]
+        linked = defaultdict(set)
+        for mot_cle_id, expert_id in through.objects.filter(motcle_id__in=member_ids).values_list('motcle_id', 'expert_id'):
+            linked[mot_cle_id].add(expert_id)
+
+        aliases, links, duplicate_ids, experts = [], [], [], set()
+        for canonical, members in groups.items():
+            keep = self.kept(members)
+            duplicates = [m for m in members if m is not keep]
+            # Every spelling and the canonical form resolve to the kept keyword on import
+            spellings = {normalize_keyword(m.mot_cle) for m in members} | {canonical}
+            aliases.extend(MotCleAlias(alias=spelling, mot_cle=keep) for spelling in sorted(spellings))
+            duplicate_ids.extend(m.id for m in duplicates)
+            moved = set().union(*(linked[m.id] for m in duplicates))
+            links.extend(through(expert_id=expert_id, motcle_id=keep.id) for expert_id in moved - linked[keep.id])
+            experts.update(moved)
+            MotCleAlias.objects.filter(mot_cle__in=duplicates).update(mot_cle=keep)
+
+        MotCle.objects.filter(id__in=duplicate_ids).delete()
+        through.objects.bulk_create(links, batch_size=1000)
+        MotCleAlias.objects.bulk_create(aliases, ignore_conflicts=True, batch_size=1000)
+        return len(duplicate_ids), experts
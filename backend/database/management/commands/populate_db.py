@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 import random
+from database.cache import bump_model_versions
 from database.models import Pays, Evaluation, Etablissement, Laboratoire, Expert, Doctorant, PV, Expertise
 
 class Command(BaseCommand):
@@ -110,6 +111,7 @@ class Command(BaseCommand):
             for doctorant in doctorants
         ]
         Expertise.objects.bulk_create(expertises)
+        bump_model_versions(Evaluation, PV, Expertise)
 
         # Return a success message
         self.stdout.write(self.style.SUCCESS('Database populated with test data successfully'))
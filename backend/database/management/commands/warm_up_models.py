@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from backend.registry import registry
+
+class Command(BaseCommand):
+    help = 'Load the ML models and API clients ahead of time (they are otherwise loaded on first use).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*',
+            help=f"Resources to load among: {', '.join(registry.names())}. Defaults to WARM_UP_MODELS, or all of them.",
+        )
+
+    def handle(self, *args, **kwargs):
+        names = kwargs['models'] or settings.WARM_UP_MODELS or registry.names()
+        unknown = set(names) - set(registry.names())
+        if unknown:
+            raise CommandError(f"Unknown resources: {', '.join(sorted(unknown))}")
+
+        for name in names:
+            registry.get(name)
+            self.stdout.write(f'Loaded {name}')
+        self.stdout.write(self.style.SUCCESS('Models loaded successfully'))
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:00
+
+from collections import defaultdict
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor):
+    """Merge rows that would violate the new unique constraints."""
+    MotCle = apps.get_model('database', 'MotCle')
+    Expert = apps.get_model('database', 'Expert')
+    Publication = apps.get_model('database', 'Publication')
+    through = Expert.mots_cles.through
+
+    groups = defaultdict(list)
+    for mot_cle_id, mot_cle in MotCle.objects.order_by('mot_cle', 'id').values_list('id', 'mot_cle'):
+        groups[mot_cle].append(mot_cle_id)
+    for keep, *duplicates in (ids for ids in groups.values() if len(ids) > 1):
+        linked = set(through.objects.filter(motcle_id=keep).values_list('expert_id', flat=True))
+        experts = set(through.objects.filter(motcle_id__in=duplicates).values_list('expert_id', flat=True))
+        through.objects.bulk_create([through(expert_id=expert_id, motcle_id=keep) for expert_id in experts - linked])
+        MotCle.objects.filter(id__in=duplicates).delete()
+
+    seen = set()
+    duplicates = []
+    for publication_id, expert_id, titre in Publication.objects.order_by('expert_id', 'titre', 'id').values_list('id', 'expert_id', 'titre'):
+        if (expert_id, titre) in seen:
+            duplicates.append(publication_id)
+        seen.add((expert_id, titre))
+    Publication.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='motcle',
+            name='mot_cle',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='publication',
+            constraint=models.UniqueConstraint(fields=('titre', 'expert'), name='unique_publication_per_expert'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+def fill_sources(apps, schema_editor):
+    """Existing publications only know their main source."""
+    Publication = apps.get_model('database', 'Publication')
+    publications = list(Publication.objects.only('id', 'source'))
+    for publication in publications:
+        publication.sources = [publication.source]
+    Publication.objects.bulk_update(publications, ['sources'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0002_unique_motcle_publication'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='sources',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(fill_sources, migrations.RunPython.noop),
+    ]
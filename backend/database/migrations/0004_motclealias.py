@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0003_publication_sources'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MotCleAlias',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('alias', models.CharField(max_length=255, unique=True)),
+                ('mot_cle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='database.motcle')),
+            ],
+        ),
+    ]
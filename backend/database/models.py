@@ -275,7 +275,7 @@ class Expertise(models.Model):
 
 class MotCle(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    mot_cle = models.CharField(max_length=255)
+    mot_cle = models.CharField(max_length=255, unique=True)
     source = models.CharField(
         max_length=50,
         choices=[
@@ -290,6 +290,18 @@ class MotCle(models.Model):
         return self.mot_cle
 
 
+class MotCleAlias(models.Model):
+    """Another spelling of a keyword (e.g. "ml", "neural networks"), normalized."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    alias = models.CharField(max_length=255, unique=True)
+    mot_cle = models.ForeignKey(
+        MotCle, on_delete=models.CASCADE, related_name="aliases"
+    )
+
+    def __str__(self):
+        return f"{self.alias} -> {self.mot_cle.mot_cle}"
+
+
 class Publication(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     titre = models.TextField()
@@ -305,6 +317,13 @@ class Publication(models.Model):
             ("Autre", "Autre"),
         ],
     )
+    # Every source that found the publication, `source` being the preferred one
+    sources = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["titre", "expert"], name="unique_publication_per_expert"),
+        ]
 
     def __str__(self):
         return self.titre
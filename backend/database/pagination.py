@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Cursor pagination on the primary key: each page is one indexed range query whatever its depth,
+    and pages stay consistent while rows are inserted.
+    Query parameters: `cursor` (from the `next`/`previous` links) and `page_size`.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
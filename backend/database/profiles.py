@@ -0,0 +1,47 @@
+from django.db.models import F, Func, IntegerField, OuterRef, Prefetch, Q, QuerySet, Subquery
+from .models import Expert, Expertise, MotCle, Publication
+
+# Annotation holding the number of publications of each source, e.g. 'publications_google_scholar'
+SOURCE_ANNOTATIONS = {
+    source: 'publications_' + source.lower().replace(' ', '_')
+    for source, _ in Publication._meta.get_field('source').choices
+}
+
+
+def count_subquery(queryset: QuerySet) -> Subquery:
+    """
+    Count the rows of a correlated queryset inside the main query, without GROUP BY on the outer rows.
+
+    Args:
+        queryset (QuerySet): The rows to count, filtered on `OuterRef`.
+
+    Returns:
+        Subquery: An integer expression.
+    """
+    count = Func(F('pk'), function='COUNT', output_field=IntegerField())
+    return Subquery(queryset.order_by().values(count=count), output_field=IntegerField())
+
+
+def profile_queryset() -> QuerySet:
+    """
+    Experts with everything their profile card shows, read in two queries whatever the number of experts:
+    the experts joined with their establishment and country and annotated with their publication counts
+    and reviewing load, then their keywords.
+
+    Returns:
+        QuerySet: The annotated experts.
+    """
+    publications = Publication.objects.filter(expert=OuterRef('pk'))
+    # Expertises of theses that are not defended yet
+    reviewing = Expertise.objects.filter(
+        Q(expert_1=OuterRef('pk')) | Q(expert_2=OuterRef('pk')) | Q(expert_3=OuterRef('pk')),
+        doctorant__situation='Inscrit',
+    )
+    return (
+        Expert.objects.select_related('etablissement__pays')
+        .prefetch_related(Prefetch('mots_cles', queryset=MotCle.objects.only('id', 'mot_cle').order_by('mot_cle')))
+        .annotate(
+            charge_expertises=count_subquery(reviewing),
+            **{name: count_subquery(publications.filter(source=source)) for source, name in SOURCE_ANNOTATIONS.items()},
+        )
+    )
@@ -1,52 +1,122 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from .bulk import BulkListSerializer, BulkSerializerMixin
 from .models import Pays, Etablissement, Doctorant, Expert, PV, Publication, Evaluation, MotCle, Expertise, Laboratoire
+from .profiles import SOURCE_ANNOTATIONS
 
-class PaysSerializer(serializers.ModelSerializer):
+
+def requested_fields(request):
+    """
+    Read the sparse fieldset of a read request: `?fields=id,nom,grade`.
+
+    Args:
+        request (Request): The request, or None.
+
+    Returns:
+        set: The requested field names, or None when every field is requested.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(',') if field.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin returning only the fields listed in the `fields` query parameter.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class PaysSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Pays
         fields = '__all__'
 
-class EtablissementSerializer(serializers.ModelSerializer):
+class EtablissementSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Etablissement
         fields = '__all__'
 
-class DoctorantSerializer(serializers.ModelSerializer):
+class DoctorantSerializer(BulkSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Doctorant
         fields = '__all__'
+        list_serializer_class = BulkListSerializer
 
-class ExpertSerializer(serializers.ModelSerializer):
+class ExpertSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Expert
         fields = '__all__'
 
-class PVSerializer(serializers.ModelSerializer):
+class PVSerializer(BulkSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PV
         fields = '__all__'
+        list_serializer_class = BulkListSerializer
 
-class PublicationSerializer(serializers.ModelSerializer):
+class PublicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Publication
         fields = '__all__'
 
-class EvaluationSerializer(serializers.ModelSerializer):
+class EvaluationSerializer(BulkSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Evaluation
         fields = '__all__'
+        list_serializer_class = BulkListSerializer
 
-class MotCleSerializer(serializers.ModelSerializer):
+class MotCleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = MotCle
         fields = '__all__'
         
-class ExpertiseSerializer(serializers.ModelSerializer):
+class ExpertiseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Expertise
         fields = '__all__'
         
-class LaboratoireSerializer(serializers.ModelSerializer):
+class LaboratoireSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Laboratoire
         fields = '__all__'
+
+
+class ExpertProfileSerializer(serializers.BaseSerializer):
+    """
+    Read-only expert card built from `profiles.profile_queryset()`: the expert, its establishment
+    and country, its keywords, its publication counts by source and its current reviewing load.
+    The dictionary is written by hand, without the per-field machinery of a ModelSerializer.
+    """
+
+    def to_representation(self, expert):
+        etablissement = expert.etablissement
+        pays = etablissement.pays if etablissement is not None else None
+        publications = {source: getattr(expert, name) for source, name in SOURCE_ANNOTATIONS.items()}
+        return {
+            'id': str(expert.pk),
+            'nom': expert.nom,
+            'prenom': expert.prenom,
+            'grade': expert.grade,
+            'emails': expert.emails,
+            'telephones': expert.telephones,
+            'etablissement': None if etablissement is None else {
+                'id': str(etablissement.pk),
+                'nom': etablissement.nom,
+                'ville': etablissement.ville,
+                'pays': None if pays is None else {'id': str(pays.pk), 'pays': pays.pays},
+            },
+            'mots_cles': [{'id': str(mot_cle.pk), 'mot_cle': mot_cle.mot_cle} for mot_cle in expert.mots_cles.all()],
+            'publications': sum(publications.values()),
+            'publications_par_source': {source: count for source, count in publications.items() if count},
+            'nombre_expertises': expert.nombre_expertises,
+            'charge_expertises': expert.charge_expertises,
+        }
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .cache import bump_model_versions
+
+
+def is_database_model(sender) -> bool:
+    return getattr(getattr(sender, '_meta', None), 'app_label', None) == 'database'
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def model_changed(sender, signal, **kwargs):
+    if not is_database_model(sender):
+        return
+    models = [sender]
+    if signal is post_delete:
+        # Its many-to-many rows are deleted in cascade without signal (e.g. a MotCle of experts)
+        models += [field.related_model for field in sender._meta.get_fields() if field.many_to_many]
+    bump_model_versions(*models)
+
+
+@receiver(m2m_changed)
+def relation_changed(sender, instance, action, model, **kwargs):
+    # Both sides serialize the relation (e.g. Expert.mots_cles)
+    if action.startswith('post_') and is_database_model(model):
+        bump_model_versions(type(instance), model)
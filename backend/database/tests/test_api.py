@@ -0,0 +1,165 @@
+from unittest.mock import patch
+import numpy as np
+from django.test import TestCase
+from rest_framework.test import APIClient
+from database.models import Doctorant, Etablissement, Expert, Expertise, Laboratoire, MotCle, Pays, Publication
+from data_classification.index import ExpertIndex
+from data_classification.lexical import BM25Index
+
+class ExpertSearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.ml = Expert.objects.create(nom='Doe', prenom='John', grade='PR')
+        self.db = Expert.objects.create(nom='Roe', prenom='Jane', grade='MCA')
+        self.ml.mots_cles.add(MotCle.objects.create(mot_cle='Machine Learning', source='Google Scholar'))
+        Publication.objects.create(titre='Deep learning for medical imaging', expert=self.ml, source='DBLP')
+        Publication.objects.create(titre='Query processing in column stores', expert=self.db, source='DBLP')
+        patcher = patch('database.views.get_lexical_index', return_value=BM25Index.build())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_returns_ranked_experts(self):
+        response = self.client.get('/api/experts/search/', {'q': 'Machine learning for medical images', 'k': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([expert['id'] for expert in response.data], [str(self.ml.pk)])
+        self.assertGreater(response.data[0]['score'], 0)
+
+    def test_search_requires_a_query(self):
+        self.assertEqual(self.client.get('/api/experts/search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/experts/search/', {'q': 'x', 'k': 'many'}).status_code, 400)
+
+
+class AssignExpertsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.experts = [Expert.objects.create(nom=name, prenom='X', grade='PR') for name in 'ABC']
+        self.doctorant = Doctorant.objects.create(nom='Doc', prenom='Y', type_doctorat='LMD', titre_these='Graph mining')
+        index = ExpertIndex([str(expert.pk) for expert in self.experts], np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]]))
+        for target, value in (('get_expert_index', index), ('encode_sentences', np.array([[1.0, 0.0]]))):
+            patcher = patch(f'data_classification.assign.{target}', return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_drafts_are_not_saved(self):
+        response = self.client.post('/api/doctorants/assign-experts/', {}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['committed'])
+        self.assertEqual(response.data['expertises'][0]['experts'], [str(self.experts[0].pk), str(self.experts[1].pk)])
+        self.assertFalse(Expertise.objects.exists())
+
+    def test_commit(self):
+        response = self.client.post('/api/doctorants/assign-experts/',
+                                    {'doctorants': [str(self.doctorant.pk)], 'commit': True}, format='json')
+        self.assertTrue(response.data['committed'])
+        self.assertEqual(Expertise.objects.get().doctorant, self.doctorant)
+        self.assertEqual(Expert.objects.get(pk=self.experts[0].pk).nombre_expertises, 1)
+
+    def test_invalid_parameters(self):
+        url = '/api/doctorants/assign-experts/'
+        self.assertEqual(self.client.post(url, {'reviewers': 5}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'capacity': 'many'}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'doctorants': ['not-an-id']}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'doctorants': 'not-a-list'}, format='json').status_code, 400)
+
+    def test_unknown_doctorants_are_reported(self):
+        unknown = '00000000-0000-0000-0000-000000000000'
+        response = self.client.post('/api/doctorants/assign-experts/',
+                                    {'doctorants': [str(self.doctorant.pk), unknown, 'not-an-id']}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['unknown'], ['not-an-id', unknown])
+
+
+class ListPerformanceTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        etablissement = Etablissement.objects.create(nom='USTHB')
+        keywords = MotCle.objects.bulk_create([MotCle(mot_cle=f'Keyword {i}') for i in range(5)])
+        experts = Expert.objects.bulk_create([
+            Expert(nom=f'Expert {i}', prenom='X', grade='PR', etablissement=etablissement) for i in range(30)
+        ])
+        through = Expert.mots_cles.through
+        through.objects.bulk_create([
+            through(expert_id=expert.pk, motcle_id=keyword.pk) for expert in experts for keyword in keywords[:3]
+        ])
+        laboratoire = Laboratoire.objects.create(nom='LRIA')
+        for i in range(3):
+            Doctorant.objects.create(nom=f'Doc {i}', prenom='Y', type_doctorat='LMD').laboratoires.add(laboratoire)
+
+    def test_experts_are_paginated_in_constant_queries(self):
+        # One query for the page and one for the keywords of all its experts
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/experts/', {'page_size': 10})
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(response.data['results'][0]['mots_cles']), 3)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/experts/', {'page_size': 25})
+        self.assertEqual(len(response.data['results']), 25)
+
+    def test_cursor_walks_every_expert_once(self):
+        seen, url = [], '/api/experts/?page_size=7'
+        while url:
+            response = self.client.get(url)
+            seen.extend(expert['id'] for expert in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+
+    def test_sparse_fieldsets(self):
+        # Without mots_cles, the keywords are not prefetched
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/experts/', {'fields': 'id,nom,etablissement'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'nom', 'etablissement'})
+
+    def test_doctorants_prefetch_laboratoires(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/doctorants/')
+        self.assertEqual(len(response.data['results'][0]['laboratoires']), 1)
+
+    def test_fields_do_not_restrict_writes(self):
+        response = self.client.post('/api/pays/?fields=id', {'pays': 'Algérie'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['pays'], 'Algérie')
+
+
+class ExpertProfileTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        etablissement = Etablissement.objects.create(nom='ESI', pays=Pays.objects.create(pays='Algérie'))
+        self.experts = [Expert.objects.create(nom=f'Expert {i}', prenom='X', grade='PR', etablissement=etablissement) for i in range(4)]
+        self.expert = self.experts[0]
+        self.expert.mots_cles.add(MotCle.objects.create(mot_cle='Machine Learning'), MotCle.objects.create(mot_cle='Databases'))
+        for i, source in enumerate(['DBLP', 'DBLP', 'Google Scholar']):
+            Publication.objects.create(titre=f'Paper {i}', expert=self.expert, source=source)
+        for situation in ('Inscrit', 'Soutenu'):
+            doctorant = Doctorant.objects.create(nom='Doc', prenom=situation, type_doctorat='LMD', situation=situation)
+            Expertise.objects.create(doctorant=doctorant, expert_1=self.experts[1], expert_2=self.expert,
+                                     avis_expert_1='Favorable', avis_expert_2='Favorable', date_expertise='2024-01-10')
+
+    def test_profile(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/experts/{self.expert.pk}/profile/')
+        self.assertEqual(response.status_code, 200)
+        profile = response.data
+        self.assertEqual(profile['etablissement']['pays']['pays'], 'Algérie')
+        self.assertEqual([mot_cle['mot_cle'] for mot_cle in profile['mots_cles']], ['Databases', 'Machine Learning'])
+        self.assertEqual(profile['publications'], 3)
+        self.assertEqual(profile['publications_par_source'], {'DBLP': 2, 'Google Scholar': 1})
+        self.assertEqual(profile['charge_expertises'], 1)
+
+    def test_unknown_profile(self):
+        self.assertEqual(self.client.get('/api/experts/not-an-id/profile/').status_code, 404)
+
+    def test_profiles_in_constant_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/experts/profiles/', {'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        with self.assertNumQueries(2):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        by_id = {profile['id']: profile for profile in self.client.get('/api/experts/profiles/').data['results']}
+        self.assertEqual(by_id[str(self.experts[1].pk)]['charge_expertises'], 1)
+        self.assertEqual(by_id[str(self.experts[2].pk)]['publications'], 0)
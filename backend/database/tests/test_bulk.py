@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from database.models import Doctorant, Etablissement, Evaluation, Expert, Laboratoire, Pays
+
+
+class BulkWriteTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        pays = Pays.objects.create(pays='Algérie')
+        self.etablissements = [Etablissement.objects.create(nom=f'Univ {i}', pays=pays) for i in range(2)]
+        self.laboratoires = [Laboratoire.objects.create(nom=f'Lab {i}') for i in range(2)]
+        self.expert = Expert.objects.create(nom='Doe', prenom='John', grade='PR')
+
+    def doctorant(self, i):
+        return {
+            'nom': f'Doc {i}',
+            'prenom': 'Y',
+            'type_doctorat': 'LMD',
+            'etablissement_exercice': str(self.etablissements[i % 2].pk),
+            'etablissement_origine': str(self.etablissements[0].pk),
+            'directeur_these': str(self.expert.pk),
+            'laboratoires': [str(self.laboratoires[i % 2].pk)],
+        }
+
+    def post(self, items):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/doctorants/bulk/', items, format='json')
+        return response, len(queries)
+
+    def test_create(self):
+        response, _ = self.post([self.doctorant(i) for i in range(3)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['nom'] for item in response.data], ['Doc 0', 'Doc 1', 'Doc 2'])
+        doctorant = Doctorant.objects.get(nom='Doc 1')
+        self.assertEqual(doctorant.etablissement_exercice, self.etablissements[1])
+        self.assertEqual(list(doctorant.laboratoires.all()), [self.laboratoires[1]])
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        _, small = self.post([self.doctorant(i) for i in range(2)])
+        _, large = self.post([self.doctorant(i) for i in range(40)])
+        self.assertEqual(small, large)
+        self.assertEqual(Doctorant.objects.count(), 42)
+
+    def test_errors_per_item(self):
+        items = [self.doctorant(0), dict(self.doctorant(1), type_doctorat='X'), dict(self.doctorant(2), laboratoires=['nope'])]
+        response, _ = self.post(items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('type_doctorat', response.data[1])
+        self.assertIn('laboratoires', response.data[2])
+        # Nothing is written
+        self.assertFalse(Doctorant.objects.exists())
+
+    def test_update(self):
+        first, second = [Doctorant.objects.create(nom=f'Doc {i}', prenom='Y', type_doctorat='LMD') for i in range(2)]
+        first.laboratoires.add(self.laboratoires[0])
+        self.client.get('/api/doctorants/')
+        response = self.client.patch('/api/doctorants/bulk/', [
+            {'id': str(first.pk), 'situation': 'Soutenu', 'laboratoires': [str(self.laboratoires[1].pk)]},
+            {'id': str(second.pk), 'titre_these': 'Graph mining'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.situation, 'Soutenu')
+        self.assertEqual(list(first.laboratoires.all()), [self.laboratoires[1]])
+        self.assertEqual(second.titre_these, 'Graph mining')
+        self.assertEqual(second.situation, 'Inscrit')
+        # The cached list is invalidated
+        situations = {item['id']: item['situation'] for item in self.client.get('/api/doctorants/').data['results']}
+        self.assertEqual(situations[str(first.pk)], 'Soutenu')
+
+    def test_update_unknown_id(self):
+        doctorant = Doctorant.objects.create(nom='Doc', prenom='Y', type_doctorat='LMD')
+        response = self.client.patch('/api/doctorants/bulk/', [
+            {'id': str(doctorant.pk), 'situation': 'Soutenu'},
+            {'id': 'b9a8fd59-5f8e-4d1c-8a9b-1c7bd6a8b2f0', 'situation': 'Soutenu'},
+            {'situation': 'Soutenu'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(set(response.data[1]), {'id'})
+        self.assertEqual(set(response.data[2]), {'id'})
+        doctorant.refresh_from_db()
+        self.assertEqual(doctorant.situation, 'Inscrit')
+
+    def test_evaluations(self):
+        doctorant = Doctorant.objects.create(nom='Doc', prenom='Y', type_doctorat='LMD')
+        response = self.client.post('/api/evaluations/bulk/', [
+            {'doctorant': str(doctorant.pk), 'date_evaluation': '2024-10-15', 'statut': 'Admis'},
+            {'doctorant': str(doctorant.pk), 'date_evaluation': '2025-03-15'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Evaluation.objects.filter(doctorant=doctorant).count(), 2)
+
+    def test_not_a_list(self):
+        response = self.client.post('/api/pvs/bulk/', {'annee': 2024}, format='json')
+        self.assertEqual(response.status_code, 400)
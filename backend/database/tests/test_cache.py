@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from database.cache import bump_model_versions, model_versions
+from database.models import Doctorant, Expert, Laboratoire, MotCle, Pays
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        Pays.objects.create(pays='Algérie')
+
+    def test_versions(self):
+        before, = model_versions([Pays])
+        self.assertEqual(model_versions([Pays]), [before])
+        bump_model_versions(Pays)
+        self.assertGreater(model_versions([Pays])[0], before)
+
+    def test_cached_list_skips_the_database(self):
+        first = self.client.get('/api/pays/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/pays/')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_if_none_match(self):
+        etag = self.client.get('/api/pays/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/pays/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        # Other query parameters are another response
+        self.assertEqual(self.client.get('/api/pays/', {'fields': 'pays'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_save_and_delete_invalidate(self):
+        etag = self.client.get('/api/pays/')['ETag']
+        france = Pays.objects.create(pays='France')
+        response = self.client.get('/api/pays/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        france.delete()
+        self.assertEqual(len(self.client.get('/api/pays/').data['results']), 1)
+
+    def test_m2m_changes_invalidate_experts(self):
+        expert = Expert.objects.create(nom='Doe', prenom='John', grade='PR')
+        url = f'/api/experts/{expert.pk}/'
+        self.assertEqual(self.client.get(url).data['mots_cles'], [])
+        expert.mots_cles.add(MotCle.objects.create(mot_cle='Databases'))
+        self.assertEqual(len(self.client.get(url).data['mots_cles']), 1)
+
+    def test_cascade_deletes_invalidate_both_sides(self):
+        expert = Expert.objects.create(nom='Doe', prenom='John', grade='PR')
+        keyword = MotCle.objects.create(mot_cle='Databases')
+        expert.mots_cles.add(keyword)
+        doctorant = Doctorant.objects.create(nom='Doe', prenom='Jane', type_doctorat='LMD')
+        laboratory = Laboratoire.objects.create(nom='LRIA')
+        doctorant.laboratoires.add(laboratory)
+        self.assertEqual(len(self.client.get('/api/experts/').data['results'][0]['mots_cles']), 1)
+        self.assertEqual(len(self.client.get('/api/doctorants/').data['results'][0]['laboratoires']), 1)
+
+        keyword.delete()
+        laboratory.delete()
+        self.assertEqual(self.client.get('/api/experts/').data['results'][0]['mots_cles'], [])
+        self.assertEqual(self.client.get('/api/doctorants/').data['results'][0]['laboratoires'], [])
+
+    @override_settings(ALLOWED_HOSTS=['api.example.org', 'proxy.example.org'])
+    def test_pagination_links_follow_the_host(self):
+        Pays.objects.bulk_create([Pays(pays=f'Pays {i}') for i in range(settings.REST_FRAMEWORK['PAGE_SIZE'])])
+        first = self.client.get('/api/pays/', HTTP_HOST='api.example.org')
+        second = self.client.get('/api/pays/', HTTP_HOST='proxy.example.org', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(first.data['next'].startswith('http://api.example.org/'))
+        self.assertTrue(second.data['next'].startswith('http://proxy.example.org/'))
+
+    def test_errors_are_not_cached(self):
+        self.assertEqual(self.client.get('/api/pays/00000000-0000-0000-0000-000000000000/').status_code, 404)
+        self.assertNotIn('ETag', self.client.get('/api/pays/00000000-0000-0000-0000-000000000000/'))
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from database.export import stream_export
+from database.models import Expert, Laboratoire, MotCle, Doctorant
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+        self.experts = [Expert.objects.create(nom=f'Expert {i}', prenom='X', grade='PR') for i in range(5)]
+        self.experts[0].mots_cles.add(MotCle.objects.create(mot_cle='graphes'), MotCle.objects.create(mot_cle='réseaux'))
+        laboratoire = Laboratoire.objects.create(nom='LRIA')
+        Doctorant.objects.create(nom='Doc', prenom='Y', type_doctorat='LMD').laboratoires.add(laboratoire)
+
+    def test_csv(self):
+        chunks = list(stream_export('experts', 'csv', chunk_size=2))
+        # The header, then one chunk per 2 experts
+        self.assertEqual(len(chunks), 4)
+        rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        self.assertEqual(sorted(row['nom'] for row in rows), [f'Expert {i}' for i in range(5)])
+        row = next(row for row in rows if row['id'] == str(self.experts[0].pk))
+        self.assertEqual(sorted(json.loads(row['mots_cles'])), ['graphes', 'réseaux'])
+
+    def test_jsonl(self):
+        lines = b''.join(stream_export('doctorants', 'jsonl')).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['nom'], 'Doc')
+        self.assertEqual(row['laboratoires'], ['LRIA'])
+
+    @unittest.skipUnless(pq, 'pyarrow is not installed')
+    def test_parquet(self):
+        parquet_file = pq.ParquetFile(io.BytesIO(b''.join(stream_export('experts', 'parquet', chunk_size=2))))
+        self.assertEqual(parquet_file.metadata.num_rows, 5)
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        table = parquet_file.read()
+        self.assertIn('mots_cles', table.column_names)
+
+    def test_streaming_response(self):
+        response = self.client.get('/api/export/experts.csv', {'chunk_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="experts.csv"')
+        self.assertEqual(len(b''.join(response.streaming_content).decode('utf-8').splitlines()), 6)
+
+    def test_staff_only(self):
+        client = APIClient()
+        self.assertEqual(client.get('/api/export/experts.csv').status_code, 403)
+        client.force_authenticate(User.objects.create_user('user'))
+        self.assertEqual(client.get('/api/export/experts.csv').status_code, 403)
+
+    def test_unknown_export(self):
+        self.assertEqual(self.client.get('/api/export/pays.csv').status_code, 404)
+        self.assertEqual(self.client.get('/api/export/experts.xlsx').status_code, 404)
+        self.assertEqual(self.client.get('/api/export/experts.csv', {'chunk_size': 'x'}).status_code, 400)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'experts.jsonl')
+            call_command('export_data', 'experts', '--format', 'jsonl', '--output', output, stdout=io.StringIO())
+            with open(output, encoding='utf-8') as file:
+                self.assertEqual(len(file.readlines()), 5)
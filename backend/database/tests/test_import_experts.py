@@ -0,0 +1,112 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import AsyncMock, patch
+import pandas as pd
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from data_collection.cache import is_offline
+from database.models import Expert, MotCle, MotCleAlias
+
+class ImportExpertsTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.file_path = os.path.join(self.directory.name, 'experts.xlsx')
+        pd.DataFrame([
+            {'nom': 'Doe', 'prenom': 'John', 'grade': 'PR', 'etablissement': 'ESI', 'ville': 'Alger', 'pays': 'Algeria'},
+            {'nom': 'Roe', 'prenom': 'Jane', 'grade': 'MCA', 'etablissement': 'ESI', 'ville': 'Alger', 'pays': 'Algeria'},
+        ]).to_excel(self.file_path, index=False)
+
+    def read_report(self):
+        with open(f'{self.file_path}.report.csv', encoding='utf-8') as report:
+            return list(csv.DictReader(report))
+
+    @patch('data_classification.fetch.FetchOrchestrator.fetch', new_callable=AsyncMock)
+    def test_import_with_workers_writes_journal_and_report(self, mock_fetch):
+        mock_fetch.return_value = ([('A paper title', 'DBLP', ['DBLP'])], [('Machine Learning', 'Google Scholar', ['Google Scholar'])])
+
+        call_command('import_experts', self.file_path, workers=2, stdout=StringIO())
+
+        self.assertEqual(Expert.objects.count(), 2)
+        self.assertEqual({row['status'] for row in self.read_report()}, {'imported'})
+        with open(f'{self.file_path}.journal', encoding='utf-8') as journal:
+            self.assertEqual(len([json.loads(line) for line in journal]), 2)
+
+    @patch('data_classification.fetch.FetchOrchestrator.fetch', new_callable=AsyncMock)
+    def test_resume_skips_imported_rows(self, mock_fetch):
+        mock_fetch.side_effect = [([], []), RuntimeError('network down')]
+        call_command('import_experts', self.file_path, workers=1, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual([row['status'] for row in self.read_report()], ['imported', 'failed'])
+
+        mock_fetch.reset_mock(side_effect=True)
+        mock_fetch.return_value = ([], [])
+        call_command('import_experts', self.file_path, resume=True, stdout=StringIO())
+
+        mock_fetch.assert_called_once_with('Jane', 'Roe')
+        self.assertEqual([row['status'] for row in self.read_report()], ['imported', 'failed', 'imported'])
+
+    @patch('data_classification.fetch.FetchOrchestrator.fetch', new_callable=AsyncMock)
+    def test_reimport_upserts_keywords_and_publications(self, mock_fetch):
+        mock_fetch.return_value = (
+            [('A paper title', 'DBLP', ['DBLP']), ('Another paper', 'Google Scholar', ['Google Scholar'])],
+            [('Machine Learning', 'Google Scholar', ['Google Scholar']), ('Graphs', 'Classified', ['Classified'])],
+        )
+        call_command('import_experts', self.file_path, stdout=StringIO())
+        mock_fetch.return_value = (
+            [('A paper title', 'ResearchGate', ['ResearchGate', 'DBLP'])],
+            [('Machine Learning', 'ResearchGate', ['ResearchGate'])],
+        )
+        call_command('import_experts', self.file_path, stdout=StringIO())
+
+        self.assertEqual(MotCle.objects.count(), 2)
+        self.assertEqual(MotCle.objects.get(mot_cle='Machine Learning').source, 'ResearchGate')
+        expert = Expert.objects.get(nom='Doe')
+        self.assertEqual(expert.publications.count(), 2)
+        publication = expert.publications.get(titre='A paper title')
+        self.assertEqual((publication.source, publication.sources), ('ResearchGate', ['ResearchGate', 'DBLP']))
+        self.assertEqual([m.mot_cle for m in expert.mots_cles.all()], ['Machine Learning'])
+
+    @patch('data_classification.fetch.FetchOrchestrator.fetch', new_callable=AsyncMock)
+    def test_offline_replays_stored_responses(self, mock_fetch):
+        offline_during_fetch = []
+
+        async def fetch(first_name, last_name):
+            offline_during_fetch.append(is_offline())
+            return [], []
+        mock_fetch.side_effect = fetch
+
+        with override_settings(COLLECTOR_CACHE_PATH=os.path.join(self.directory.name, 'responses.sqlite3')):
+            call_command('import_experts', self.file_path, offline=True, stdout=StringIO())
+
+        self.assertEqual(offline_during_fetch, [True, True])
+        self.assertFalse(is_offline())
+
+    @patch('data_classification.fetch.FetchOrchestrator.fetch', new_callable=AsyncMock)
+    def test_interests_are_canonicalized(self, mock_fetch):
+        mock_fetch.return_value = ([], [
+            ('Machine Learning', 'Google Scholar', ['Google Scholar']),
+            ('Ml', 'ResearchGate', ['ResearchGate']),
+            ('Neural Networks', 'Classified', ['Classified']),
+        ])
+        call_command('import_experts', self.file_path, stdout=StringIO())
+
+        # Keywords keep the spelling they were found with; the other spellings are aliases
+        self.assertEqual(sorted(MotCle.objects.values_list('mot_cle', flat=True)), ['Machine Learning', 'Neural Networks'])
+        self.assertEqual(
+            dict(MotCleAlias.objects.values_list('alias', 'mot_cle__mot_cle')),
+            {
+                'machine learning': 'Machine Learning',
+                'ml': 'Machine Learning',
+                'neural networks': 'Neural Networks',
+                'neural network': 'Neural Networks',
+            },
+        )
+
+        mock_fetch.return_value = ([], [('neural network', 'Classified', ['Classified'])])
+        call_command('import_experts', self.file_path, stdout=StringIO())
+        self.assertEqual(MotCle.objects.count(), 2)
+
@@ -0,0 +1,48 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from database.models import Expert, MotCle, MotCleAlias
+
+class MergeMotsClesTests(TestCase):
+
+    def setUp(self):
+        self.first = Expert.objects.create(nom='Doe', prenom='John', grade='PR')
+        self.second = Expert.objects.create(nom='Roe', prenom='Jane', grade='MCA')
+        names = ['machine learning', 'Machine Learning', 'ML', 'Neural Networks', 'Neural Network', 'Databases']
+        self.mots_cles = {name: MotCle.objects.create(mot_cle=name, source='Google Scholar') for name in names}
+        self.first.mots_cles.set([self.mots_cles[n] for n in ['machine learning', 'ML', 'Neural Network']])
+        self.second.mots_cles.set([self.mots_cles[n] for n in ['Machine Learning', 'Neural Networks', 'Databases']])
+
+    def test_dry_run_changes_nothing(self):
+        call_command('merge_mots_cles', dry_run=True, stdout=StringIO())
+        self.assertEqual(MotCle.objects.count(), 6)
+
+    def test_duplicates_are_merged_into_their_most_used_spelling(self):
+        self.first.mots_cles.add(self.mots_cles['ML'])
+        MotCle.objects.create(mot_cle='GPU computing', source='Google Scholar')
+        Expert.objects.create(nom='Poe', prenom='Ann', grade='MCB').mots_cles.add(self.mots_cles['ML'])
+        call_command('merge_mots_cles', stdout=StringIO())
+
+        # Keywords alone in their group keep their spelling
+        self.assertEqual(
+            sorted(MotCle.objects.values_list('mot_cle', flat=True)),
+            ['Databases', 'GPU computing', 'ML', 'Neural Networks'],
+        )
+        for expert in (self.first, self.second):
+            self.assertEqual(
+                sorted(expert.mots_cles.values_list('mot_cle', flat=True)),
+                ['ML', 'Neural Networks'] if expert is self.first else ['Databases', 'ML', 'Neural Networks'],
+            )
+        aliases = dict(MotCleAlias.objects.values_list('alias', 'mot_cle__mot_cle'))
+        self.assertEqual(aliases, {
+            'machine learning': 'ML',
+            'ml': 'ML',
+            'neural networks': 'Neural Networks',
+            'neural network': 'Neural Networks',
+        })
+
+    def test_merging_twice_is_stable(self):
+        call_command('merge_mots_cles', stdout=StringIO())
+        out = StringIO()
+        call_command('merge_mots_cles', stdout=out)
+        self.assertIn('0 keywords to merge', out.getvalue())
@@ -2,7 +2,7 @@ from rest_framework.routers import DefaultRouter
 from django.urls import path, include
 from .views import (
     PaysViewSet, EtablissementViewSet, DoctorantViewSet, ExpertViewSet, PVViewSet,
-    PublicationViewSet, EvaluationViewSet, MotCleViewSet, ExpertiseViewSet, LaboratoireViewSet
+    PublicationViewSet, EvaluationViewSet, MotCleViewSet, ExpertiseViewSet, LaboratoireViewSet, export_table
 )
 
 router = DefaultRouter()
@@ -18,5 +18,6 @@ router.register(r'expertise', ExpertiseViewSet)
 router.register(r'laboratoire', LaboratoireViewSet)
 
 urlpatterns = [
+    path('export/<str:name>.<str:export_format>', export_table, name='export'),
     path('', include(router.urls)),
 ]
@@ -1,56 +1,198 @@
-from rest_framework import viewsets
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from rest_framework import status, viewsets
+from rest_framework.generics import get_object_or_404
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from data_classification.assign import (
+    EXPERT_SLOTS, UnknownDoctorants, assign_experts, find_doctorants, pending_doctorants, save_assignment,
+)
+from data_classification.lexical import get_lexical_index
+from .bulk import BulkWriteMixin
+from .cache import CachedResponseMixin
+from .export import CONTENT_TYPES, EXPORT_FORMATS, EXPORT_MODELS, stream_export
 from .models import Pays, Etablissement, Doctorant, Expert, PV, Publication, Evaluation, MotCle, Expertise, Laboratoire
+from .profiles import profile_queryset
 from .serializers import (
-    PaysSerializer, EtablissementSerializer, DoctorantSerializer, ExpertSerializer, PVSerializer,
+    requested_fields, ExpertProfileSerializer, PaysSerializer, EtablissementSerializer, DoctorantSerializer, ExpertSerializer, PVSerializer,
     PublicationSerializer, EvaluationSerializer, MotCleSerializer, ExpertiseSerializer, LaboratoireSerializer,
 )
 
 
-class ExpertiseViewSet(viewsets.ModelViewSet):
+class EagerLoadingMixin:
+    """
+    Viewset mixin fetching a page in a fixed number of queries: the many-to-many fields of the
+    serializer are prefetched (`prefetch_fields`), and with `?fields=` only the requested columns
+    and relations are loaded. Foreign keys are serialized from their `<name>_id` column, so they need no join.
+    """
+    prefetch_fields = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = requested_fields(self.request)
+        prefetches = [prefetch for name, prefetch in self.prefetch_fields.items() if fields is None or name in fields]
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if fields is not None:
+            columns = [field.name for field in queryset.model._meta.concrete_fields if field.name in fields]
+            queryset = queryset.only(*(columns or ['pk']))
+        return queryset
+
+
+class ExpertiseViewSet(CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Expertise.objects.all()
     serializer_class = ExpertiseSerializer
 
 
-class LaboratoireViewSet(viewsets.ModelViewSet):
+class LaboratoireViewSet(CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Laboratoire.objects.all()
     serializer_class = LaboratoireSerializer
 
 
-class PaysViewSet(viewsets.ModelViewSet):
+class PaysViewSet(CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Pays.objects.all()
     serializer_class = PaysSerializer
 
 
-class EtablissementViewSet(viewsets.ModelViewSet):
+class EtablissementViewSet(CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Etablissement.objects.all()
     serializer_class = EtablissementSerializer
 
 
-class DoctorantViewSet(viewsets.ModelViewSet):
+class DoctorantViewSet(BulkWriteMixin, CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Doctorant.objects.all()
     serializer_class = DoctorantSerializer
-
-
-class ExpertViewSet(viewsets.ModelViewSet):
+    prefetch_fields = {'laboratoires': Prefetch('laboratoires', queryset=Laboratoire.objects.only('id'))}
+
+    @action(detail=False, methods=['post'], url_path='assign-experts')
+    def assign_experts(self, request):
+        """
+        Propose reviewers for several theses at once, balancing the load of the experts.
+        Body: `doctorants` (ids, default: enrolled doctorants with a thesis title and no expertise),
+        `reviewers`, `capacity`, `max_expertises` (see assign_experts) and `commit` (save the expertises).
+        """
+        options = {}
+        for name in ('reviewers', 'capacity', 'max_expertises'):
+            value = request.data.get(name)
+            if value is not None:
+                try:
+                    options[name] = int(value)
+                except (TypeError, ValueError):
+                    return Response({name: 'A valid integer is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        doctorants = pending_doctorants()
+        if request.data.get('doctorants'):
+            if not isinstance(request.data['doctorants'], list):
+                return Response({'doctorants': 'A list of valid ids is required.'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                doctorants = find_doctorants(request.data['doctorants'])
+            except UnknownDoctorants as e:
+                return Response({'doctorants': str(e), 'unknown': e.ids}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = assign_experts(doctorants, **options)
+        except ValueError as e:
+            return Response({'reviewers': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        committed = str(request.data.get('commit', '')).lower() in ('1', 'true')
+        drafts = save_assignment(result.drafts) if committed else result.drafts
+        return Response({
+            'committed': committed,
+            'expertises': [
+                {
+                    'id': str(draft.pk) if committed else None,
+                    'doctorant': str(draft.doctorant_id),
+                    'experts': [str(getattr(draft, slot + '_id')) for slot in EXPERT_SLOTS if getattr(draft, slot + '_id')],
+                    'scores': scores,
+                }
+                for draft, scores in zip(drafts, result.scores)
+            ],
+            'unassigned': [str(doctorant.pk) for doctorant in result.unassigned],
+        })
+
+
+class ExpertViewSet(CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Expert.objects.all()
     serializer_class = ExpertSerializer
-
-
-class PVViewSet(viewsets.ModelViewSet):
+    prefetch_fields = {'mots_cles': Prefetch('mots_cles', queryset=MotCle.objects.only('id'))}
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Rank experts by BM25 relevance of their keywords and publication titles.
+        Query parameters: `q` (e.g. a thesis title) and `k` (number of experts, 10 by default, at most 100).
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'q': 'This parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            k = min(max(int(request.query_params.get('k', 10)), 1), 100)
+        except ValueError:
+            return Response({'k': 'A valid integer is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits = get_lexical_index().search(query, k)
+        experts = {str(expert.pk): expert for expert in self.get_queryset().filter(pk__in=[expert_id for expert_id, _ in hits])}
+        results = [
+            dict(self.get_serializer(experts[expert_id]).data, score=round(score, 4))
+            for expert_id, score in hits if expert_id in experts
+        ]
+        return Response(results)
+
+    @action(detail=True, methods=['get'])
+    def profile(self, request, pk=None):
+        """
+        Expert card: the expert with its establishment, country, keywords, publication counts by source
+        and current reviewing load, read in two queries.
+        """
+        expert = get_object_or_404(profile_queryset(), pk=pk)
+        return Response(ExpertProfileSerializer(expert).data)
+
+    @action(detail=False, methods=['get'])
+    def profiles(self, request):
+        """
+        Paginated list of expert cards (see `profile`), read in two queries per page.
+        """
+        page = self.paginate_queryset(profile_queryset())
+        return self.get_paginated_response(ExpertProfileSerializer(page, many=True).data)
+
+
+class PVViewSet(BulkWriteMixin, CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = PV.objects.all()
     serializer_class = PVSerializer
 
 
-class PublicationViewSet(viewsets.ModelViewSet):
+class PublicationViewSet(CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Publication.objects.all()
     serializer_class = PublicationSerializer
 
 
-class EvaluationViewSet(viewsets.ModelViewSet):
+class EvaluationViewSet(BulkWriteMixin, CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Evaluation.objects.all()
     serializer_class = EvaluationSerializer
 
 
-class MotCleViewSet(viewsets.ModelViewSet):
+class MotCleViewSet(CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = MotCle.objects.all()
     serializer_class = MotCleSerializer
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_table(request, name, export_format):
+    """
+    Stream a whole table (experts, publications or doctorants) as CSV, JSON Lines or Parquet, for staff users only.
+    Rows are read with a server-side cursor, so the first bytes are sent at once and memory stays constant.
+    The optional `chunk_size` query parameter sets the rows read and encoded at once.
+    """
+    if name not in EXPORT_MODELS or export_format not in EXPORT_FORMATS:
+        raise Http404('Unknown export.')
+    chunk_size = request.query_params.get('chunk_size')
+    if chunk_size is not None and (not chunk_size.isdigit() or int(chunk_size) == 0):
+        return HttpResponse('chunk_size must be a positive integer.', status=400, content_type='text/plain')
+    try:
+        content = stream_export(name, export_format, int(chunk_size) if chunk_size else None)
+    except ImportError as e:
+        return HttpResponse(str(e), status=501, content_type='text/plain')
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{name}.{export_format}"'
+    return response
@@ -1,7 +1,8 @@
 import os
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+from backend.registry import registry
+
+# matplotlib is imported on first use, with the Agg backend
+plt = registry.lazy("pyplot")
 
 
 def ensure_directory_exists(directory):